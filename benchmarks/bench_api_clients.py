@@ -0,0 +1,157 @@
+# bench_api_clients.py
+# Per-request latency of a new API client per request (how transcribe_api used to work) vs the shared pooled client,
+# against a local HTTPS stand-in for the OpenAI transcription and Groq chat endpoints.
+#
+#   python benchmarks/bench_api_clients.py --requests 30 --rtt-ms 40 --fail-rate 0.1
+#
+# The server uses a throwaway self-signed certificate (made with the openssl command line tool), so each new
+# connection pays for a real TLS handshake. --rtt-ms adds the round trips of connection setup on top (two round
+# trips per new connection, for TCP and TLS), as a remote API would; reused connections do not pay it.
+# --fail-rate makes the server answer that fraction of requests with a 503, which the pooled client retries.
+
+import argparse
+import json
+import os
+import random
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+
+def make_certificate(directory):
+    cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-keyout', key, '-out', cert,
+                    '-days', '1', '-subj', '/CN=localhost', '-addext', 'subjectAltName=IP:127.0.0.1,DNS:localhost'],
+                   check=True, capture_output=True)
+    return cert, key
+
+def start_server(cert, key, rtt, fail_rate, server_seconds):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive
+
+        def do_GET(self):  # GET /models, used by the pre-warm
+            body = b'{"object": "list", "data": []}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(server_seconds)
+            if random.random() < fail_rate:
+                body, status = b'{"error": {"message": "overloaded"}}', 503
+            elif self.path.endswith('/audio/transcriptions'):
+                body, status = b'{"text": "hello world"}', 200
+            else:
+                body, status = json.dumps({
+                    'id': 'bench', 'object': 'chat.completion', 'created': 0, 'model': 'bench',
+                    'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': 'Hi.'}}],
+                }).encode(), 200
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def process_request(self, request, client_address):
+            time.sleep(2 * rtt)  # TCP and TLS handshakes to a remote host
+            super().process_request(request, client_address)
+
+    server = Server(('127.0.0.1', 0), Handler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def transcribe_with_new_client(base_url, wav):
+    from openai import OpenAI
+    client = OpenAI(api_key='bench', base_url=base_url)
+    with open(wav, 'rb') as audio_file:
+        return client.audio.transcriptions.create(model='whisper-1', file=audio_file).text
+
+def transcribe_with_pooled_client(wav):
+    import api_clients
+    client = api_clients.get_client('openai')
+    with open(wav, 'rb') as audio_file:
+        def request():
+            audio_file.seek(0)
+            return client.audio.transcriptions.create(model='whisper-1', file=audio_file)
+        return api_clients.call('openai', 'transcription', request).text
+
+def chat_with_pooled_client():
+    import api_clients
+    client = api_clients.get_client('groq')
+    return api_clients.call('groq', 'chat', lambda: client.chat.completions.create(
+        messages=[{'role': 'user', 'content': 'Hi'}], model='bench', max_tokens=10))
+
+def measure(label, request, count):
+    latencies, failures = [], 0
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            request()
+        except Exception:
+            failures += 1
+        latencies.append(time.perf_counter() - started)
+    print(f'{label:<24} median {statistics.median(latencies) * 1000:8.1f} ms  '
+          f'max {max(latencies) * 1000:8.1f} ms  failed {failures:3d}/{count}')
+    return statistics.median(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-request clients with the pooled keep-alive clients.')
+    parser.add_argument('--requests', type=int, default=30, help='Requests per measurement')
+    parser.add_argument('--rtt-ms', type=float, default=40.0, help='Simulated round trip time to the API')
+    parser.add_argument('--server-ms', type=float, default=20.0, help='Server processing time per request')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of requests answered with a 503')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = make_certificate(directory)
+        server = start_server(cert, key, args.rtt_ms / 1000, args.fail_rate, args.server_ms / 1000)
+        base = f'https://127.0.0.1:{server.server_port}'
+        os.environ['SSL_CERT_FILE'] = cert  # Trust the throwaway certificate
+        os.environ['OPENAI_BASE_URL'] = base + '/v1'
+        os.environ['OPENAI_API_KEY'] = os.environ['GROQ_API_KEY'] = 'bench'
+        os.environ['GROQ_BASE_URL'] = base
+
+        wav = os.path.join(directory, 'audio.wav')
+        from transcription import to_wav_buffer
+        with open(wav, 'wb') as file:
+            file.write(to_wav_buffer(np.zeros(16000 * 5, dtype=np.int16), 16000).getvalue())  # 5s clip, 160 kB
+
+        import api_clients
+        api_clients.get_options(dict(api_timeout_seconds=30, api_connect_timeout_seconds=5, api_max_retries=3,
+                                     api_retry_base_delay=0.05, api_max_connections=10, api_keepalive_seconds=60))
+        started = time.perf_counter()
+        api_clients.prewarm('openai')
+        api_clients.prewarm('groq')
+        print(f'Pre-warmed both connections in {(time.perf_counter() - started) * 1000:.1f} ms (including SDK imports)')
+
+        per_request = measure('transcribe, new client', lambda: transcribe_with_new_client(base + '/v1', wav), args.requests)
+        pooled = measure('transcribe, pooled', lambda: transcribe_with_pooled_client(wav), args.requests)
+        measure('groq chat, pooled', chat_with_pooled_client, args.requests)
+        print(f'Saved per transcription: {(per_request - pooled) * 1000:.1f} ms ({per_request / pooled:.1f}x faster)')
+        for (backend, operation), stats in sorted(api_clients.latency_stats().items()):
+            print(f'  {backend}/{operation}: {stats["requests"]} requests, {stats["retries"]} retries, '
+                  f'{stats["errors"]} errors, p50 {stats["p50"] * 1000:.1f} ms, p95 {stats["p95"] * 1000:.1f} ms')
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
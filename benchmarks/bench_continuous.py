@@ -0,0 +1,169 @@
+# bench_continuous.py
+# Hands-free mode with a recording per request (the stream is reopened after every answer) vs continuous listening
+# (one stream for the session), against a fake microphone that plays in real time: how much of each utterance is
+# heard, how long the microphone is deaf between utterances, and the CPU used while listening to silence.
+#
+#   python benchmarks/bench_continuous.py --utterances 5 --gap 1.2 --speak-ms 600 --open-ms 60
+#
+# The speaker says --utterances phrases of --phrase-seconds with --gap seconds of room noise between them. Each is
+# transcribed by the stub model and answered by speaking for --speak-ms through the speech worker with a stub engine.
+# Opening the fake stream takes --open-ms. "continuous" ignores the microphone while the answer is spoken
+# (suppress_while_speaking), "barge-in" lets speech interrupt it.
+
+import argparse
+import contextlib
+import io
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_audio import FakeInputStream, install_fake_sounddevice, synthetic_speech
+install_fake_sounddevice()
+
+import numpy as np
+import speech
+import transcription
+from audio_trim import frame_levels
+from config_utils import load_config_with_defaults
+from jobs import Job, JobScheduler
+from listener import ContinuousListener
+from stub_models import StubTTS, StubWhisperModel
+
+ANSWER = 'Okay, I have noted that down for you.'
+
+def noise(seconds, seed):
+    return (np.random.default_rng(seed).standard_normal(int(seconds * 16000)) * 20).astype(np.int16)
+
+def conversation(args):
+    """
+    The audio and the (start, end) seconds of every phrase in it.
+    """
+    parts, phrases, position = [noise(1.0, 100)], [], 1.0
+    for index in range(args.utterances):
+        parts.append(synthetic_speech(args.phrase_seconds, seed=index))
+        phrases.append((position, position + args.phrase_seconds))
+        position += args.phrase_seconds
+        parts.append(noise(args.gap, 101 + index))
+        position += args.gap
+    parts.append(noise(2.0, 99))
+    return np.concatenate(parts), phrases
+
+def heard(phrases, utterances):
+    # Fraction of the speech that reached the transcriber: frames far above the room noise
+    total = sum(end - start for start, end in phrases)
+    return sum(int((frame_levels(audio, 16000) > -40).sum()) for audio in utterances) * 0.03 / total
+
+def start_speech_worker(args):
+    speech._speech_worker = worker = speech.SpeechWorker(
+        lambda: StubTTS(init_seconds=0, seconds_per_char=args.speak_ms / 1000 / len(ANSWER)))
+    worker.start()
+    worker.ready.wait()
+    return worker
+
+def per_request(config, source, args, model):
+    # What the hands-free loop did before: record until a pause, answer, then open a new stream
+    start_speech_worker(args)
+    FakeInputStream.source, FakeInputStream.live_since = source, time.perf_counter()
+    session_end = source.size / 16000
+    past_end = lambda: time.perf_counter() - FakeInputStream.live_since > session_end
+    windows, utterances = [], []
+    while not past_end():
+        audio = transcription.record(queue.Queue(), past_end, config)
+        windows.append((FakeInputStream.last.started_at - FakeInputStream.live_since,
+                        time.perf_counter() - FakeInputStream.live_since))
+        if audio is None or len(audio) == 0:
+            continue
+        utterances.append(audio)
+        transcription.transcribe(queue.Queue(), lambda: False, config, audio, model)
+        speech.get_speech_worker().speak_stream([ANSWER])
+    return windows, utterances
+
+def continuous(config, source, args, model):
+    start_speech_worker(args)
+    scheduler = JobScheduler()
+    steps = {'transcribe': lambda job, audio: transcription.transcribe(queue.Queue(), job.cancel_flag, config, audio, model) or None,
+             'output': lambda job, text: speech.get_speech_worker().speak_stream([ANSWER], job.cancel_flag)}
+    utterances = []
+
+    def on_utterance(audio):
+        utterances.append(audio)
+        scheduler.submit(Job('hands-free', steps, value=audio))
+
+    FakeInputStream.source, FakeInputStream.live_since = source, time.perf_counter()
+    listener = ContinuousListener(config, on_utterance)
+    listener.start()
+    while FakeInputStream.last is None or FakeInputStream.last.started_at is None:
+        time.sleep(0.01)
+    opened = FakeInputStream.last.started_at - FakeInputStream.live_since
+    time.sleep(source.size / 16000 - opened)
+    listener.stop()
+    listener.join()
+    return utterances, listener.suppressed_frames
+
+def idle_cpu(config, seconds, listen):
+    FakeInputStream.source, FakeInputStream.live_since = noise(seconds + 1, 5), time.perf_counter()
+    stop = threading.Event()
+    thread = threading.Thread(target=listen, args=(stop,), daemon=True)
+    started = time.process_time()
+    thread.start()
+    time.sleep(seconds)
+    used = time.process_time() - started
+    stop.set()
+    thread.join()
+    return used / seconds
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-request and continuous hands-free listening.')
+    parser.add_argument('--utterances', type=int, default=5, help='Phrases the speaker says')
+    parser.add_argument('--phrase-seconds', type=float, default=2.0, help='Length of each phrase')
+    parser.add_argument('--gap', type=float, default=1.2, help='Silence between phrases')
+    parser.add_argument('--speak-ms', type=float, default=600.0, help='Time spent speaking each answer')
+    parser.add_argument('--open-ms', type=float, default=60.0, help='Time to open the input stream')
+    parser.add_argument('--rtf', type=float, default=0.1, help='Stub model seconds per second of audio')
+    parser.add_argument('--idle-seconds', type=float, default=5.0, help='Silence listened to for the CPU figure')
+    args = parser.parse_args()
+
+    config = load_config_with_defaults()
+    config.update(recording_mode='voice_activity_detection', sound_device=None, sample_rate=16000, use_api=False,
+                  spill_audio_to_disk=False, streaming_transcription=False, print_to_terminal=False,
+                  long_form_workers=1)
+    FakeInputStream.speed, FakeInputStream.open_seconds = 1.0, args.open_ms / 1000
+    source, phrases = conversation(args)
+    model = StubWhisperModel(real_time_factor=args.rtf, overhead=0.05)
+    print(f'{args.utterances} phrases of {args.phrase_seconds:.1f}s, {args.gap:.1f}s apart; answers spoken for '
+          f'{args.speak_ms:.0f} ms; stream open {args.open_ms:.0f} ms')
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        windows, utterances = per_request(config, source, args, model)
+    gaps = [next_start - end for (_, end), (next_start, _) in zip(windows, windows[1:])]
+    print(f'per request  heard {heard(phrases, utterances):6.1%} of the speech in {len(utterances)} utterances, '
+          f'{len(windows)} stream opens, deaf for {np.median(gaps) * 1000:.0f} ms between recordings '
+          f'(max {max(gaps) * 1000:.0f} ms)')
+
+    for label, suppress in (('continuous', True), ('barge-in', False)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            utterances, suppressed = continuous(dict(config, suppress_while_speaking=suppress), source, args, model)
+        print(f'{label:<12} heard {heard(phrases, utterances):6.1%} of the speech in {len(utterances)} utterances, '
+              f'1 stream open, deaf only while answers were spoken: {suppressed * 30} ms in all')
+
+    def listen_per_request(stop):
+        while not stop.is_set():
+            transcription.record(queue.Queue(), stop.is_set, config)
+
+    def listen_continuous(stop):
+        listener = ContinuousListener(config, lambda audio: None)
+        listener.start()
+        stop.wait()
+        listener.stop()
+        listener.join()
+
+    for label, listen in (('per request', listen_per_request), ('continuous', listen_continuous)):
+        print(f'{label:<12} idle cpu {idle_cpu(config, args.idle_seconds, listen) * 1000:5.1f} ms/s while listening to silence')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# bench_data_store.py
+# Concurrent data.json updates: the old read-modify-write of the whole file vs the DataStore's journal, plus the cost
+# of reading the data when a prompt is built (parsing the file vs copying the in-memory dict).
+#
+#   python benchmarks/bench_data_store.py --threads 8 --updates 200 --entries 200
+#
+# Each thread sets its own keys, so every key should be present afterwards; keys missing from the file are lost updates.
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from data_store import DataStore, export_load
+
+# What update_json did before the DataStore
+def old_update_json(file_path, key, value):
+    try:
+        with open(file_path, 'r') as file:
+            data = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        data = {}
+    data[key] = value
+    with open(file_path, 'w') as file:
+        json.dump(data, file, indent=2)
+
+def run_threads(threads, updates, update):
+    latencies, lock = [], threading.Lock()
+
+    def worker(thread):
+        for n in range(updates):
+            started = time.perf_counter()
+            update(f'thread{thread}_key{n}', f'value {n} from thread {thread}, ' * 4)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(thread,)) for thread in range(threads)]
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    return time.perf_counter() - started, sorted(latencies)
+
+def report(label, elapsed, latencies, path, expected):
+    lost = expected - len(export_load(path))
+    print(f'{label:<12} {len(latencies) / elapsed:8.0f} updates/s  median {statistics.median(latencies) * 1000:7.2f} ms  '
+          f'p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:7.2f} ms  lost {lost}/{expected}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare data.json rewrites with the journaled DataStore.')
+    parser.add_argument('--threads', type=int, default=8, help='Threads updating at the same time')
+    parser.add_argument('--updates', type=int, default=200, help='Updates per thread')
+    parser.add_argument('--entries', type=int, default=200, help='Entries already in data.json')
+    parser.add_argument('--reads', type=int, default=1000, help='Reads for the prompt-building measurement')
+    args = parser.parse_args()
+    initial = {f'existing_{n}': f'some saved clipboard content number {n} ' * 8 for n in range(args.entries)}
+    expected = args.entries + args.threads * args.updates
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'data.json')
+        with open(path, 'w') as file:
+            json.dump(initial, file)
+        elapsed, latencies = run_threads(args.threads, args.updates, lambda key, value: old_update_json(path, key, value))
+        report('rewrite', elapsed, latencies, path, expected)
+
+        path = os.path.join(directory, 'store.json')
+        with open(path, 'w') as file:
+            json.dump(initial, file)
+        store = DataStore(path)
+        elapsed, latencies = run_threads(args.threads, args.updates, store.set)
+        store.close()  # Compact, so the JSON export is current
+        report('DataStore', elapsed, latencies, path, expected)
+
+        started = time.perf_counter()
+        for _ in range(args.reads):
+            export_load(path)  # What build_messages did: parse data.json for every prompt
+        file_read = (time.perf_counter() - started) / args.reads
+        started = time.perf_counter()
+        for _ in range(args.reads):
+            store.snapshot()
+        snapshot = (time.perf_counter() - started) / args.reads
+        print(f'Read for a prompt: parse file {file_read * 1e6:.0f} us, in-memory snapshot {snapshot * 1e6:.1f} us '
+              f'({len(store.data)} entries)')
+
+        reopened = DataStore(path)  # Recovery: the snapshot plus an unfinished journal
+        reopened.set('after_restart', 'value')
+        reopened.journal.write('{"op": "set", "key": "torn')  # A crash in the middle of a write
+        reopened.journal.flush()
+        reopened.timer.cancel()  # Leave the journal as the crash did
+        recovered = DataStore(path)
+        print(f'Reopened after a torn write: {len(recovered.data)} entries, '
+              f'after_restart={recovered.get("after_restart")!r}')
+        recovered.close()
+
+if __name__ == '__main__':
+    main()
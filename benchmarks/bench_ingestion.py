@@ -0,0 +1,125 @@
+# bench_ingestion.py
+# Sequential vs concurrent document ingestion against a local HTTP stand-in server and a folder of generated PDFs.
+#
+#   python benchmarks/bench_ingestion.py --pages 16 --pdfs 8 --latency 0.3 --embed-ms 20
+#
+# The embedding step is replaced by a sleep per document (--embed-ms) so the benchmark measures how well fetching,
+# parsing and embedding overlap, not the speed of the embedding model.
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import ingestion
+
+PARAGRAPH = ('WhisperWriter records speech, transcribes it with Whisper and answers questions about the user '
+             'with context retrieved from their documents. ')
+
+def make_pdf(path, pages, words_per_page=300):
+    """
+    Write a minimal multi-page PDF with one text stream per page (no dependencies needed).
+    """
+    text = (PARAGRAPH * (words_per_page // 16 + 1)).split()[:words_per_page]
+    lines = [' '.join(text[i:i + 12]) for i in range(0, len(text), 12)]
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None, '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for _ in range(pages):
+        content = 'BT /F1 10 Tf 12 TL 40 780 Td ' + ' '.join(f'({line}) Tj T*' for line in lines) + ' ET'
+        objects.append(f'<< /Length {len(content)} >>\nstream\n{content}\nendstream')
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objects)} 0 R '
+                       f'/Resources << /Font << /F1 3 0 R >> >> >>')
+        kids.append(f'{len(objects)} 0 R')
+    objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {pages} >>'
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1')
+    xref = len(output)
+    output += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        output += f'{offset:010d} 00000 n \n'.encode()
+    output += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    with open(path, 'wb') as file:
+        file.write(output)
+
+def start_server(latency):
+    """
+    Serve generated HTML pages on localhost, each after `latency` seconds, like a slow remote site.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            body = f'<html><body><h1>{self.path}</h1><p>{PARAGRAPH * 40}</p></body></html>'.encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def embed_stub(docs, embed_ms):
+    time.sleep(len(docs) * embed_ms / 1000)
+
+def run_sequential(urls, pdfs, embed_ms):
+    docs_list = []
+    for url in urls:
+        docs_list.extend(ingestion.fetch_url(url))
+    for pdf in pdfs:
+        docs_list.extend(ingestion.parse_file(pdf))
+    embed_stub(docs_list, embed_ms)
+    return len(docs_list)
+
+def run_pipeline(urls, pdfs, embed_ms, use_processes):
+    count = 0
+    for result in ingestion.ingest(urls, pdfs, file_hash=lambda path: path, url_hash=lambda docs: '',
+                                   use_processes=use_processes):
+        if result.docs:
+            embed_stub(result.docs, embed_ms)
+            count += len(result.docs)
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark document ingestion.')
+    parser.add_argument('--pages', type=int, default=16, help='Number of URLs served by the stand-in server')
+    parser.add_argument('--pdfs', type=int, default=8, help='Number of generated PDFs')
+    parser.add_argument('--pdf-pages', type=int, default=20, help='Pages per generated PDF')
+    parser.add_argument('--latency', type=float, default=0.3, help='Server response delay in seconds')
+    parser.add_argument('--embed-ms', type=float, default=20.0, help='Simulated embedding cost per document')
+    args = parser.parse_args()
+
+    server = start_server(args.latency)
+    urls = [f'http://127.0.0.1:{server.server_port}/page{i}' for i in range(args.pages)]
+    with tempfile.TemporaryDirectory() as folder:
+        pdfs = []
+        for i in range(args.pdfs):
+            pdfs.append(os.path.join(folder, f'doc{i}.pdf'))
+            make_pdf(pdfs[-1], args.pdf_pages)
+
+        runs = [('sequential', lambda: run_sequential(urls, pdfs, args.embed_ms)),
+                ('threads', lambda: run_pipeline(urls, pdfs, args.embed_ms, use_processes=False)),
+                ('processes', lambda: run_pipeline(urls, pdfs, args.embed_ms, use_processes=True))]
+        baseline = None
+        for label, run in runs:
+            started = time.perf_counter()
+            docs = run()
+            seconds = time.perf_counter() - started
+            baseline = baseline or seconds
+            print(f'{label:<11} {docs:5d} documents in {seconds:6.2f}s  ({baseline / seconds:.2f}x)')
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# bench_jobs.py
+# Hotkey responsiveness and throughput of the job pipeline, with sleeps standing in for each stage.
+#
+#   python benchmarks/bench_jobs.py --jobs 4 --record 1.0 --transcribe 0.3 --generate 0.4 --output 0.3
+#
+# 'inline' runs every stage on the calling thread, as the hotkey handlers used to; 'pipeline' submits jobs to the
+# JobScheduler. Reported: how long the hotkey callback blocks, when the last job finishes, and how quickly a
+# preempting job cancels the one in progress.
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from jobs import Job, JobScheduler, STAGES
+
+def make_steps(durations):
+    def step_for(seconds):
+        def step(job, value):
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline and not job.cancel_flag():
+                time.sleep(0.005)
+            return value
+        return step
+    return {stage: step_for(durations[stage]) for stage in STAGES if durations[stage]}
+
+def run_inline(jobs, durations):
+    steps = make_steps(durations)
+    started = time.perf_counter()
+    blocked = []
+    for _ in range(jobs):
+        call = time.perf_counter()
+        job = Job('inline', steps, value='query')
+        for stage in STAGES:
+            if stage in steps:
+                job.value = steps[stage](job, job.value)
+        blocked.append(time.perf_counter() - call)
+    return blocked, time.perf_counter() - started
+
+def run_pipeline(jobs, durations):
+    scheduler = JobScheduler(policy='queue', max_jobs=jobs)
+    steps = make_steps(durations)
+    started = time.perf_counter()
+    blocked, submitted = [], []
+    for _ in range(jobs):
+        call = time.perf_counter()
+        submitted.append(scheduler.submit(Job('pipeline', steps, value='query')))
+        blocked.append(time.perf_counter() - call)
+        time.sleep(durations['record'])  # The next hotkey press comes once the user has finished speaking
+    for job in submitted:
+        job.join()
+    assert all(job.state == 'done' for job in submitted)
+    return blocked, time.perf_counter() - started
+
+def run_preempt(durations):
+    scheduler = JobScheduler(policy='preempt')
+    steps = make_steps(durations)
+    first = scheduler.submit(Job('first', steps, value='query'))
+    time.sleep(durations['record'] / 2)
+    started = time.perf_counter()
+    second = scheduler.submit(Job('second', steps, value='query'))
+    first.join()
+    cancelled_after = time.perf_counter() - started
+    second.join()
+    return first.state, second.state, cancelled_after
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare inline hotkey handling with the job pipeline.')
+    parser.add_argument('--jobs', type=int, default=4, help='Requests made back to back')
+    for stage, default in (('record', 1.0), ('transcribe', 0.3), ('retrieve', 0.05), ('generate', 0.4), ('output', 0.3)):
+        parser.add_argument(f'--{stage}', type=float, default=default, help=f'Seconds spent in the {stage} stage')
+    args = parser.parse_args()
+    durations = {stage: getattr(args, stage) for stage in STAGES}
+
+    for label, run in (('inline', run_inline), ('pipeline', run_pipeline)):
+        blocked, total = run(args.jobs, durations)
+        print(f'{label:<9} hotkey callback blocks {statistics.median(blocked) * 1000:9.2f} ms (median)  '
+              f'{args.jobs} requests done after {total:6.2f} s')
+
+    first, second, cancelled_after = run_preempt(durations)
+    print(f'preempt   first job {first} {cancelled_after * 1000:.1f} ms after the second was submitted; second {second}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# bench_llm_streaming.py
+# Time to first keystroke of a batch vs a streamed LLM response, against a local stand-in for the Groq API.
+#
+#   python benchmarks/bench_llm_streaming.py --tokens 60 --token-ms 15 --first-token-ms 150
+#
+# The stand-in server waits --first-token-ms, then sends one token every --token-ms. Keystrokes go to a fake
+# controller that only records their timestamps; typing is per character with --key-delay between keys.
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_keyboard import FakeController, install_fake_pynput
+install_fake_pynput()
+
+import groq_integration
+import helpers
+import output_engine
+import response_cache
+from config_utils import load_config_with_defaults
+from jobs import Job
+
+WORDS = 'Sure, I can send the report over by Friday once the numbers from the last quarter are final.'.split()
+
+def start_server(tokens, first_token_delay, token_delay):
+    """
+    Serve /openai/v1/chat/completions like the Groq API: server-sent events when streaming, one JSON body otherwise.
+    """
+    words = [WORDS[i % len(WORDS)] + ' ' for i in range(tokens)]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            time.sleep(first_token_delay)
+            if not request.get('stream'):
+                time.sleep(token_delay * (tokens - 1))
+                body = json.dumps({
+                    'id': 'bench', 'object': 'chat.completion', 'created': 0, 'model': request['model'],
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': ''.join(words)}}],
+                }).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            try:
+                for index, word in enumerate(words):
+                    if index:
+                        time.sleep(token_delay)
+                    chunk = {'id': 'bench', 'object': 'chat.completion.chunk', 'created': 0, 'model': request['model'],
+                             'choices': [{'index': 0, 'delta': {'content': word}, 'finish_reason': None}]}
+                    self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode())
+                    self.wfile.flush()
+                self.wfile.write(b'data: [DONE]\n\n')
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # The client cancelled and closed the stream
+            self.close_connection = True
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run(label, config):
+    FakeController.reset()
+    started = time.perf_counter()
+    # The app's clipboard-question path, with the stages run inline rather than on the job scheduler
+    steps = helpers.response_steps(config, None, record=False)
+    job = Job(label, steps, value='When can you send the report?')
+    for stage in ('retrieve', 'generate', 'output'):
+        job.value = steps[stage](job, job.value)
+    done = time.perf_counter()
+    first = FakeController.presses[0][0] - started if FakeController.presses else float('nan')
+    print(f'{label:<10} first keystroke {first * 1000:8.1f} ms  done {(done - started) * 1000:8.1f} ms  '
+          f'typed {len(FakeController.typed()):4d} chars')
+    return first, done - started
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare time to first keystroke of batch and streamed responses.')
+    parser.add_argument('--tokens', type=int, default=60, help='Tokens in the response')
+    parser.add_argument('--token-ms', type=float, default=15.0, help='Delay between tokens')
+    parser.add_argument('--first-token-ms', type=float, default=150.0, help='Delay before the first token')
+    parser.add_argument('--key-delay', type=float, default=0.002, help='Seconds between typed characters')
+    args = parser.parse_args()
+
+    server = start_server(args.tokens, args.first_token_ms / 1000, args.token_ms / 1000)
+    from groq import Groq
+    groq_integration.client = Groq(base_url=f'http://127.0.0.1:{server.server_port}', api_key='bench')
+    # Answer from data.json alone; building the document index is not what is measured here
+    groq_integration.retriever, groq_integration.retriever_built = None, True
+    response_cache._response_cache = False  # Every run asks the same question; each must reach the server
+
+    config = load_config_with_defaults()
+    config.update(writing_key_press_delay=args.key_delay, stream_responses=False, print_to_terminal=False)
+    # Type one key at a time so only the response delivery differs between the two runs
+    output_engine._output_engine = output_engine.OutputEngine(mode='character', interval=args.key_delay)
+    run('warm-up', config)
+    batch_first, batch_total = run('batch', config)
+    stream_first, stream_total = run('streaming', dict(config, stream_responses=True))
+    print(f'Time to first keystroke: {batch_first * 1000:.1f} ms -> {stream_first * 1000:.1f} ms '
+          f'({batch_first / max(stream_first, 1e-9):.1f}x faster); '
+          f'total {batch_total * 1000:.1f} ms -> {stream_total * 1000:.1f} ms')
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
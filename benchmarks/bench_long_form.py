@@ -0,0 +1,102 @@
+# bench_long_form.py
+# Transcription latency of a long dictation in one model call vs split at pauses and transcribed in parallel chunks.
+#
+#   python benchmarks/bench_long_form.py --minutes 4 --workers 1 2 4 --rtf 0.1
+#
+# Uses the stub model, which costs --rtf seconds per second of audio and runs at most num_workers calls at once, the
+# way a WhisperModel created with num_workers does (CTranslate2 releases the GIL while it decodes). The speedup
+# shown is therefore what the chunking and scheduling allow given that many free cores; on a real model it is
+# bounded by the cores each worker gets (cpu_threads).
+#
+# It then times a --short-seconds request on the model a short request gets, before (every model was created with
+# long_form_workers workers and the cores split between them) and now (a single-worker model with CTranslate2's
+# default threads; long recordings get their own variant). WhisperModel is replaced by a stub whose decoding is
+# spread over its cpu_threads (4 when 0, as in CTranslate2) of --cores cores, at --thread-rtf seconds per second of
+# audio on one thread.
+
+import argparse
+import contextlib
+import io
+import os
+import queue
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_audio import synthetic_utterance
+from stub_models import StubWhisperModel
+import transcription
+from config_utils import load_config_with_defaults
+from model_manager import ModelManager
+
+def stub_whisper_class(args):
+    class StubWhisper(StubWhisperModel):
+        def __init__(self, model, device='cpu', compute_type='default', cpu_threads=0, num_workers=1):
+            self.cpu_threads, self.num_workers = cpu_threads, num_workers
+            threads = min(cpu_threads or 4, args.cores)
+            StubWhisperModel.__init__(self, real_time_factor=args.thread_rtf / threads, overhead=0.05,
+                                      num_workers=num_workers)
+    return StubWhisper
+
+def short_request(config, args):
+    """
+    Median latency of a short request on the model it got before and now, and the long-form variant now.
+    """
+    import faster_whisper
+    faster_whisper.WhisperModel = StubWhisper = stub_whisper_class(args)
+    os.cpu_count = lambda: args.cores  # create_local_model splits the cores between long-form workers
+    audio, _ = synthetic_utterance(1, args.short_seconds, 0.0, trailing_silence=0.0)
+    workers = config['long_form_workers']
+    manager = ModelManager(dict(config, model_warmup=False))
+    models = [('before', StubWhisper('base', cpu_threads=max(args.cores // workers, 1), num_workers=workers)),
+              ('now', manager.get(config)),
+              ('now, long form', manager.get(config, workers=workers))]
+    for label, model in models:
+        latencies = []
+        for _ in range(5):
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                transcription.transcribe(queue.Queue(), lambda: False, config, audio, model)
+            latencies.append(time.perf_counter() - started)
+        print(f'{label:<15} num_workers {model.num_workers}  cpu_threads {model.cpu_threads:2d}  '
+              f'{args.short_seconds:.0f}s request {statistics.median(latencies) * 1000:7.1f} ms')
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare single-call and parallel chunked transcription.')
+    parser.add_argument('--minutes', type=float, default=4.0, help='Length of the dictation')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Worker counts to compare')
+    parser.add_argument('--rtf', type=float, default=0.1, help='Stub model seconds per second of audio')
+    parser.add_argument('--short-seconds', type=float, default=5.0, help='Length of the short request')
+    parser.add_argument('--cores', type=int, default=4, help='Cores of the machine for the short request')
+    parser.add_argument('--thread-rtf', type=float, default=0.4, help='Short request cost per second of audio on one thread')
+    args = parser.parse_args()
+
+    config = load_config_with_defaults()
+    config.update(use_api=False, sample_rate=16000, print_to_terminal=True)
+    phrases = int(args.minutes * 60 / 5)  # 4.2s phrases with 0.8s pauses
+    audio, _ = synthetic_utterance(phrases, 4.2, 0.8, trailing_silence=0.0)
+    print(f'Dictation: {audio.size / 16000:.1f}s')
+
+    baseline = None
+    for workers in args.workers:
+        model = StubWhisperModel(real_time_factor=args.rtf, overhead=0.05, num_workers=workers)
+        settings = dict(config, long_form_workers=workers)
+        log = io.StringIO()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(log):
+            transcription.transcribe(queue.Queue(), lambda: False, settings, audio, model)
+        seconds = time.perf_counter() - started
+        baseline = baseline or seconds
+        prompted = sum(prompt is not None for prompt in model.prompts)
+        label = 'single call' if workers == 1 else f'{workers} workers'
+        print(f'{label:<12} {seconds:6.2f}s  {model.calls:2d} model calls ({prompted} with context)  '
+              f'speedup {baseline / seconds:4.2f}x')
+
+    print(f'Short request on {args.cores} cores:')
+    short_request(dict(config, print_to_terminal=False), args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# bench_output.py
+# Throughput of each output mode against a mocked keyboard controller and an in-memory clipboard.
+#
+#   python benchmarks/bench_output.py --chars 600 --key-delay 0.008 --key-cost-us 50
+#
+# --key-cost-us is the time the mocked controller spends on each press and release. The 'character' mode is the
+# original typewrite loop; the others are what the output engine adds.
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_keyboard import FakeController, install_fake_pynput
+install_fake_pynput()
+
+import pyperclip
+from output_engine import OutputEngine, OUTPUT_MODES
+
+clipboard = ['previous clipboard content']
+pyperclip.copy = lambda text: clipboard.__setitem__(0, text)
+pyperclip.paste = lambda: clipboard[0]
+
+SENTENCE = 'Thanks for the update, I will review the draft tonight and send comments in the morning. '
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare chars/sec of the output modes.')
+    parser.add_argument('--chars', type=int, default=600, help='Length of the text to write')
+    parser.add_argument('--key-delay', type=float, default=0.008, help='writing_key_press_delay')
+    parser.add_argument('--key-cost-us', type=float, default=50.0, help='Mocked cost of each key event')
+    parser.add_argument('--chunk-size', type=int, default=24, help='output_chunk_size')
+    args = parser.parse_args()
+
+    text = (SENTENCE * (args.chars // len(SENTENCE) + 1))[:args.chars]
+    FakeController.key_cost = args.key_cost_us / 1e6
+
+    results = {}
+    for mode in OUTPUT_MODES:
+        FakeController.reset()
+        engine = OutputEngine(mode=mode, interval=args.key_delay, chunk_size=args.chunk_size, controller=FakeController())
+        stats = engine.write(text)
+        if mode == 'paste':
+            assert clipboard[0] == 'previous clipboard content', 'clipboard was not restored'
+        else:
+            assert FakeController.typed() == text, f'{mode} typed the wrong text'
+        results[mode] = stats
+        print(f'{mode:<10} {stats.seconds * 1000:9.1f} ms  {stats.chars_per_second:10.0f} chars/sec  '
+              f'{len(FakeController.presses):5d} key presses')
+
+    baseline = results['character'].seconds
+    for mode in ('chunked', 'paste'):
+        print(f'{mode} is {baseline / max(results[mode].seconds, 1e-9):.0f}x faster than per-character typing')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# bench_record_capture.py
+# CPU cost of the capture loop in transcription.record(), fed by a fake input stream.
+#
+#   python benchmarks/bench_record_capture.py --seconds 10
+#
+# Reports CPU seconds per recorded second for the ring-buffer recorder and for the previous list-based loop.
+
+import argparse
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_audio import FakeInputStream, install_fake_sounddevice, synthetic_speech
+install_fake_sounddevice()
+
+import numpy as np
+import transcription
+from config_utils import load_config_with_defaults
+
+def legacy_capture(sample_rate, frame_duration, is_pressed):
+    """
+    The list-based busy loop record() used before the ring buffer, kept here for comparison.
+    """
+    buffer = []
+    recording = []
+    frame_size = sample_rate * frame_duration // 1000
+
+    def callback(indata, frames, time_info, status):
+        buffer.extend(indata[:, 0])
+
+    with FakeInputStream(samplerate=sample_rate, blocksize=frame_size, callback=callback):
+        while True:
+            if len(buffer) < frame_size:
+                continue
+            frame = buffer[:frame_size]
+            buffer = buffer[frame_size:]
+            if is_pressed():
+                recording.extend(frame)
+            else:
+                break
+    return np.array(recording, dtype=np.int16)
+
+def run(label, capture, seconds):
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    audio = capture()
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    recorded = (audio.size if hasattr(audio, 'size') else 0) / 16000
+    print(f'{label:<12} recorded {recorded:6.2f}s  wall {wall:6.2f}s  cpu {cpu:6.3f}s  '
+          f'cpu per recorded second {cpu / max(recorded, 1e-9):.4f}')
+    return cpu / max(recorded, 1e-9)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the record() capture loop.')
+    parser.add_argument('--seconds', type=float, default=10.0, help='Seconds of synthetic audio to record')
+    parser.add_argument('--speed', type=float, default=1.0, help='Feed rate as a multiple of real time')
+    parser.add_argument('--skip-legacy', action='store_true', help='Only benchmark the current recorder')
+    args = parser.parse_args()
+
+    sample_rate = 16000
+    FakeInputStream.source = synthetic_speech(args.seconds + 1, sample_rate)
+    FakeInputStream.speed = args.speed
+
+    def is_pressed(*_):
+        stream = FakeInputStream.last
+        return stream is not None and stream.fed_seconds < args.seconds
+
+    config = load_config_with_defaults()
+    config.update(sound_device=None, sample_rate=sample_rate, silence_duration=900, spill_audio_to_disk=False,
+                  recording_mode='hold_to_record', activation_key='ctrl+shift+space', print_to_terminal=False)
+    transcription.keyboard.is_pressed = is_pressed
+
+    ring = run('ring buffer', lambda: transcription.record(queue.Queue(), lambda: False, config), args.seconds)
+    if not args.skip_legacy:
+        legacy = run('legacy list', lambda: legacy_capture(sample_rate, 30, is_pressed), args.seconds)
+        print(f'CPU reduction: {legacy / max(ring, 1e-9):.1f}x')
+
+if __name__ == '__main__':
+    main()
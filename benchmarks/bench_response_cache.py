@@ -0,0 +1,72 @@
+# bench_response_cache.py
+# Latency of repeated questions with and without the response cache, against the local stand-in for the Groq API.
+#
+#   python benchmarks/bench_response_cache.py --questions 5 --repeats 4 --first-token-ms 150
+#
+# Every question is asked --repeats times. Without the cache each ask is a full API round trip; with it only the
+# first ask of each question is.
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_llm_streaming import start_server
+import groq_integration
+import response_cache
+from config_utils import load_config_with_defaults
+
+QUESTIONS = ['What is my email address?', 'When is my next meeting?', 'Summarize my last project.',
+             'Which languages do I speak?', 'Where did I study?', 'What is my phone number?']
+
+def run(label, cache, questions, repeats, config):
+    response_cache._response_cache = cache if cache else False
+    latencies = []
+    for _ in range(repeats):
+        for question in questions:
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):  # Hide the per-hit log lines
+                groq_integration.get_groq_response(question, config)
+            latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    stats = cache.stats() if cache else {'hits': 0, 'misses': len(latencies)}
+    print(f'{label:<10} median {statistics.median(latencies) * 1000:8.2f} ms  '
+          f'p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:8.2f} ms  '
+          f'total {sum(latencies):6.2f} s  hits {stats["hits"]:3d}  misses {stats["misses"]:3d}')
+    return sum(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare repeated-question latency with and without the cache.')
+    parser.add_argument('--questions', type=int, default=5, help='Distinct questions')
+    parser.add_argument('--repeats', type=int, default=4, help='Times each question is asked')
+    parser.add_argument('--first-token-ms', type=float, default=150.0, help='Stand-in server delay before the answer')
+    args = parser.parse_args()
+
+    server = start_server(40, args.first_token_ms / 1000, 0.002)
+    from groq import Groq
+    groq_integration.client = Groq(base_url=f'http://127.0.0.1:{server.server_port}', api_key='bench')
+    groq_integration.retriever, groq_integration.retriever_built = None, True
+    questions = QUESTIONS[:args.questions]
+    config = load_config_with_defaults()
+
+    uncached = run('no cache', None, questions, args.repeats, config)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cached = run('cache', response_cache.ResponseCache(path=os.path.join(cache_dir, 'cache.json')),
+                     questions, args.repeats, config)
+        # A new process starts from the saved cache, so even first asks are hits
+        reloaded = response_cache.ResponseCache(path=os.path.join(cache_dir, 'cache.json'))
+        run('reloaded', reloaded, questions, 1, config)
+        assert reloaded.stats()['misses'] == 0, f'Reloaded cache missed: {reloaded.stats()}'
+    print(f'Total time for {len(questions) * args.repeats} asks: {uncached:.2f} s -> {cached:.2f} s '
+          f'({uncached / max(cached, 1e-9):.1f}x faster)')
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
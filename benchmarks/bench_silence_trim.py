@@ -0,0 +1,110 @@
+# bench_silence_trim.py
+# What the pre-roll ring, the energy gate and silence trimming do to a recording, fed by a fake input stream, and
+# what the trimmed audio saves in transcription time with a stub model that costs --rtf seconds per audio second.
+#
+#   python benchmarks/bench_silence_trim.py --phrases 3 --pause 0.6 --lead 1.5
+#
+# The utterance is --lead seconds of microphone noise, then phrases separated by --pause seconds of noise.
+# "before" records with the previous settings (no pre-roll, no gate, no trimming), "after" with the defaults.
+
+import argparse
+import contextlib
+import io
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_audio import FakeInputStream, install_fake_sounddevice, synthetic_speech
+install_fake_sounddevice()
+
+import numpy as np
+import webrtcvad
+import transcription
+from audio_trim import trim_silence
+from config_utils import load_config_with_defaults
+from stub_models import StubWhisperModel
+
+RealVad = webrtcvad.Vad
+
+class CountingVad:
+    calls = 0
+
+    def __init__(self, mode):
+        self.vad = RealVad(mode)
+
+    def is_speech(self, frame, sample_rate):
+        CountingVad.calls += 1
+        return self.vad.is_speech(frame, sample_rate)
+
+def noise(seconds, level, seed, sample_rate=16000):
+    return (np.random.default_rng(seed).standard_normal(int(seconds * sample_rate)) * level).astype(np.int16)
+
+def utterance(phrases, phrase_seconds, pause, lead, trailing, noise_level):
+    parts = [noise(lead, noise_level, 100)]
+    for index in range(phrases):
+        if index:
+            parts.append(noise(pause, noise_level, 100 + index))
+        parts.append(synthetic_speech(phrase_seconds, seed=index))
+    parts.append(noise(trailing, noise_level, 99))
+    return np.concatenate(parts)
+
+def record(config, source):
+    FakeInputStream.source = source
+    FakeInputStream.speed = 20  # Faster than real time, but slow enough that the 5s capture ring never overflows
+    CountingVad.calls = 0
+    output = io.StringIO()
+    started = time.process_time()
+    with contextlib.redirect_stdout(output):
+        audio = transcription.record(queue.Queue(), lambda: False, config)
+    cpu = time.process_time() - started
+    return audio, cpu, CountingVad.calls, output.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pre-roll, energy gate and silence trimming.')
+    parser.add_argument('--phrases', type=int, default=3, help='Phrases in the utterance')
+    parser.add_argument('--phrase-seconds', type=float, default=2.0, help='Length of each phrase')
+    parser.add_argument('--pause', type=float, default=0.6, help='Silence between phrases')
+    parser.add_argument('--lead', type=float, default=1.5, help='Silence before the first phrase')
+    parser.add_argument('--noise', type=float, default=20.0, help='Microphone noise level (int16 standard deviation)')
+    parser.add_argument('--rtf', type=float, default=0.2, help='Stub model seconds per second of audio')
+    args = parser.parse_args()
+
+    webrtcvad.Vad = CountingVad
+    config = load_config_with_defaults()
+    config.update(recording_mode='voice_activity_detection', spill_audio_to_disk=False, sound_device=None,
+                  sample_rate=16000, print_to_terminal=True)
+    speech_seconds = args.phrases * args.phrase_seconds
+    source = utterance(args.phrases, args.phrase_seconds, args.pause, args.lead,
+                       config['silence_duration'] / 1000 + 0.5, args.noise)
+    print(f'Utterance: {source.size / 16000:.2f}s, {speech_seconds:.2f}s of it speech')
+
+    before = dict(config, pre_roll_duration=0, energy_gate_dbfs=-200, trim_silence=False)
+    for label, settings in (('before', before), ('after', config)):
+        audio, cpu, vad_calls, log = record(settings, source)
+        print(f'VAD mode, {label:<6} recorded {audio.size / 16000:5.2f}s  webrtcvad calls {vad_calls:4d}  '
+              f'cpu {cpu * 1000:6.1f} ms')
+        for line in log.splitlines():
+            if line.startswith('Trimmed'):
+                print(f'  {line}')
+
+    # press_to_toggle and hold_to_record keep everything between the key presses, silences included
+    model = StubWhisperModel(real_time_factor=args.rtf, overhead=0.0)
+    started = time.perf_counter()
+    trimmed, removed = trim_silence(source, 16000, threshold_dbfs=config['energy_gate_dbfs'],
+                                    max_gap_ms=config['max_silence_gap'])
+    trim_time = time.perf_counter() - started
+    timings = []
+    for audio in (source, trimmed):
+        started = time.perf_counter()
+        transcription.transcribe_local(config, audio, model)
+        timings.append(time.perf_counter() - started)
+    print(f'Key-held recording: {source.size / 16000:.2f}s -> {trimmed.size / 16000:.2f}s '
+          f'({removed:.2f}s removed in {trim_time * 1000:.2f} ms); '
+          f'stub transcription {timings[0]:.2f}s -> {timings[1]:.2f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# bench_startup.py
+# Startup cost of the app, broken down per module.
+#
+#   python benchmarks/bench_startup.py            # import cost of each app module, in a fresh interpreter each
+#   python benchmarks/bench_startup.py --init     # also run the background initializers and time each one
+#
+# Importing main is what stands between launch and live hotkeys, so its cumulative import time is reported as the
+# time-to-hotkeys estimate. Run from the repository root.
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SRC = os.path.join(ROOT, 'src')
+
+APP_MODULES = ['config_utils', 'audio_buffer', 'model_manager', 'transcription', 'ingestion', 'embedding_utils',
+               'groq_integration', 'helpers', 'hotkey', 'status_window', 'main']
+
+def import_profile(module):
+    """
+    Import module in a fresh interpreter with -X importtime.
+    Returns (cumulative seconds, [(seconds, name) of its heaviest direct imports]) or (None, error).
+    """
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+
+    total = None
+    children = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        level = (len(name) - len(name.lstrip()) - 1) // 2  # Nesting is shown as two spaces per level
+        name = name.strip()
+        if level == 0:
+            if name == module:
+                total = int(cumulative_us) / 1e6
+                break
+            children = []  # Children are listed before their parent; drop those of unrelated top-level imports
+        elif level == 1:
+            children.append((int(cumulative_us) / 1e6, name))
+    return total, sorted(children, reverse=True)[:5]
+
+def run_initializers():
+    sys.path.insert(0, SRC)
+    os.chdir(ROOT)
+    import startup
+    from config_utils import load_config_with_defaults
+    from model_manager import get_model_manager
+    from groq_integration import get_client, get_retriever
+
+    config = load_config_with_defaults()
+    tasks = {'groq client': get_client, 'document index': get_retriever}
+    if not config['use_api']:
+        tasks['whisper model'] = lambda: get_model_manager(config).get(config)
+    started = time.perf_counter()
+    for name, func in tasks.items():
+        startup.start(name, func, print_to_terminal=False)
+    for name in tasks:
+        startup.wait(name)
+    print(f'\nBackground initializers (run concurrently, {time.perf_counter() - started:.2f}s wall):')
+    for name, info in startup.readiness().items():
+        print(f'  {name:<16} {info["state"]:<7} {info["seconds"]:7.2f}s')
+
+def main():
+    parser = argparse.ArgumentParser(description='Break down startup cost per module.')
+    parser.add_argument('--init', action='store_true', help='Also time the background initializers')
+    args = parser.parse_args()
+
+    print(f'{"module":<18} {"import":>9}  heaviest imports')
+    for module in APP_MODULES:
+        total, detail = import_profile(module)
+        if total is None:
+            print(f'{module:<18} {"failed":>9}  {detail}')
+            continue
+        heaviest = ', '.join(f'{name} {seconds * 1000:.0f}ms' for seconds, name in detail)
+        print(f'{module:<18} {total * 1000:7.0f}ms  {heaviest}')
+        if module == 'main':
+            print(f'\nTime to hotkeys is roughly the main import: {total:.2f}s')
+
+    if args.init:
+        run_initializers()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# bench_status_bus.py
+# Delay between publishing a status update and the status window applying it, and how often the window's thread
+# wakes up while nothing happens: the old window polled the status queue every 100ms, the new one is woken by the
+# status bus.
+#
+#   python benchmarks/bench_status_bus.py --updates 50 --idle-seconds 3
+#
+# Tk needs a display, so a thread stands in for the window's event loop in both cases: "polling" checks a queue
+# every --poll-ms like window.after() did, "status bus" blocks until the subscriber hands it an update, as the
+# <<StatusChanged>> virtual event wakes the Tk loop.
+
+import argparse
+import os
+import queue
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from status_bus import StatusBus
+
+class PollingWindow:
+    def __init__(self, poll_seconds):
+        self.queue = queue.Queue()
+        self.poll_seconds = poll_seconds
+        self.latencies = []
+        self.wakeups = 0
+        self.running = True
+        threading.Thread(target=self.loop, daemon=True).start()
+
+    def put(self, update):
+        self.queue.put(update)
+
+    def loop(self):
+        while self.running:
+            self.wakeups += 1
+            try:
+                _, published_at = self.queue.get_nowait()
+                self.latencies.append(time.perf_counter() - published_at)
+            except queue.Empty:
+                pass
+            time.sleep(self.poll_seconds)
+
+class EventWindow:
+    def __init__(self, bus):
+        self.events = queue.Queue()
+        self.latencies = []
+        self.wakeups = 0
+        self.running = True
+        bus.subscribe(lambda status, text: self.events.put(text))
+        threading.Thread(target=self.loop, daemon=True).start()
+
+    def loop(self):
+        while self.running:
+            published_at = self.events.get()
+            self.wakeups += 1
+            if published_at is not None:
+                self.latencies.append(time.perf_counter() - published_at)
+
+def measure(label, publish, window, args):
+    rng = random.Random(0)
+    for _ in range(args.updates):
+        time.sleep(rng.uniform(0.05, 0.25))  # Updates come at arbitrary times relative to the poll
+        publish(time.perf_counter())
+    time.sleep(0.2)
+    window.wakeups = 0
+    started = time.process_time()
+    time.sleep(args.idle_seconds)
+    idle_cpu = time.process_time() - started
+    window.running = False
+    latencies = sorted(window.latencies)
+    print(f'{label:<11} delivery median {statistics.median(latencies) * 1000:6.2f} ms  '
+          f'max {latencies[-1] * 1000:6.2f} ms  idle wakeups {window.wakeups / args.idle_seconds:5.1f}/s  '
+          f'idle cpu {idle_cpu / args.idle_seconds * 1000:5.2f} ms/s')
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the polling status window with the status bus.')
+    parser.add_argument('--updates', type=int, default=50, help='Status updates to deliver')
+    parser.add_argument('--idle-seconds', type=float, default=3.0, help='Idle time measured after the updates')
+    parser.add_argument('--poll-ms', type=float, default=100.0, help='Poll interval of the old window')
+    args = parser.parse_args()
+
+    polling = PollingWindow(args.poll_ms / 1000)
+    measure('polling', lambda now: polling.put(('recording', now)), polling, args)
+
+    bus = StatusBus()
+    window = EventWindow(bus)
+    measure('status bus', lambda now: bus.publish('recording', now), window, args)
+
+if __name__ == '__main__':
+    main()
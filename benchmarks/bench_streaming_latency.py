@@ -0,0 +1,66 @@
+# bench_streaming_latency.py
+# Stop-to-text latency of batch vs streaming transcription, using a fake input stream and a stub model.
+#
+#   python benchmarks/bench_streaming_latency.py --phrases 4 --phrase-seconds 2 --rtf 0.3
+#
+# Latency is measured from the moment the synthetic speaker stops talking to the moment the text is returned.
+# Both modes still wait silence_duration before recording ends; the difference is the transcription left to do.
+
+import argparse
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_audio import FakeInputStream, install_fake_sounddevice, synthetic_utterance
+install_fake_sounddevice()
+
+from stub_models import StubWhisperModel
+import transcription
+from config_utils import load_config_with_defaults
+
+def run(label, config, model, speech_end):
+    status_queue = queue.Queue()
+    text = transcription.record_and_transcribe(status_queue, lambda: False, config, local_model=model)
+    done = time.perf_counter()
+    stream = FakeInputStream.last
+    stopped_speaking = stream.started_at + speech_end / FakeInputStream.speed
+    partials = 0
+    while not status_queue.empty():
+        partials += status_queue.get_nowait()[0] == 'partial'
+    latency = done - stopped_speaking
+    print(f'{label:<10} stop-to-text {latency * 1000:8.1f} ms  model calls {model.calls:3d}  '
+          f'partial updates {partials:3d}  text {text!r:.40}')
+    return latency
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare stop-to-text latency of batch and streaming transcription.')
+    parser.add_argument('--phrases', type=int, default=4, help='Number of phrases in the utterance')
+    parser.add_argument('--phrase-seconds', type=float, default=2.0, help='Length of each phrase')
+    parser.add_argument('--pause-seconds', type=float, default=0.5, help='Pause between phrases')
+    parser.add_argument('--rtf', type=float, default=0.3, help='Stub model seconds per second of audio')
+    parser.add_argument('--speed', type=float, default=1.0, help='Feed rate as a multiple of real time')
+    args = parser.parse_args()
+
+    audio, speech_end = synthetic_utterance(args.phrases, args.phrase_seconds, args.pause_seconds)
+    FakeInputStream.source = audio
+    FakeInputStream.speed = args.speed
+
+    config = load_config_with_defaults()
+    config.update(use_api=False, recording_mode='voice_activity_detection', activation_key='ctrl+shift+space',
+                  sound_device=None, sample_rate=16000, silence_duration=900, spill_audio_to_disk=False,
+                  streaming_transcription=False, streaming_pause_duration=300, remove_trailing_period=False,
+                  add_trailing_space=False, remove_capitalization=False, print_to_terminal=False)
+    config['local_model_options'] = dict(config['local_model_options'], language=None, temperature=0.0,
+                                         initial_prompt=None, condition_on_previous_text=True, vad_filter=False)
+    rtf = args.rtf / args.speed
+
+    batch = run('batch', config, StubWhisperModel(real_time_factor=rtf), speech_end)
+    streaming = run('streaming', dict(config, streaming_transcription=True), StubWhisperModel(real_time_factor=rtf), speech_end)
+    print(f'Latency reduction: {(batch - streaming) * 1000:.1f} ms ({batch / max(streaming, 1e-9):.2f}x)')
+
+if __name__ == '__main__':
+    main()
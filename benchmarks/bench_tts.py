@@ -0,0 +1,91 @@
+# bench_tts.py
+# Time to first audio of a spoken response: the old path (a new pyttsx3 engine per response, spoken once the whole
+# answer has arrived) vs the speech worker (one engine, sentences spoken as they stream in), plus how quickly a
+# barge-in silences a long answer.
+#
+#   python benchmarks/bench_tts.py --tokens 60 --token-ms 15 --first-token-ms 150 --init-ms 200
+#
+# A local stand-in for the Groq API produces the answer (its first sentence is 18 tokens long) and a stub backend
+# stands in for pyttsx3: creating it costs --init-ms, speaking costs --char-ms per character.
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_keyboard import install_fake_pynput
+install_fake_pynput()
+
+import groq_integration
+from config_utils import load_config_with_defaults
+import response_cache
+from bench_llm_streaming import start_server
+from speech import SpeechWorker
+from stub_models import StubTTS
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare time to first audio of spoken responses.')
+    parser.add_argument('--tokens', type=int, default=60, help='Tokens in each stand-in LLM response')
+    parser.add_argument('--token-ms', type=float, default=15.0, help='Delay between stand-in LLM tokens')
+    parser.add_argument('--first-token-ms', type=float, default=150.0, help='Delay before the first stand-in token')
+    parser.add_argument('--init-ms', type=float, default=200.0, help='Cost of creating a speech engine')
+    parser.add_argument('--char-ms', type=float, default=5.0, help='Speaking time per character')
+    parser.add_argument('--repeats', type=int, default=5, help='Responses per variant')
+    args = parser.parse_args()
+
+    server = start_server(args.tokens, args.first_token_ms / 1000, args.token_ms / 1000)
+    from groq import Groq
+    groq_integration.client = Groq(base_url=f'http://127.0.0.1:{server.server_port}', api_key='bench')
+    groq_integration.retriever, groq_integration.retriever_built = None, True
+    response_cache._response_cache = False
+    config = load_config_with_defaults()
+    make_backend = lambda: StubTTS(init_seconds=args.init_ms / 1000, seconds_per_char=args.char_ms / 1000)
+
+    def old_path():
+        started = time.perf_counter()
+        response = groq_integration.get_groq_response('What is the status of the report?', config)
+        backend = make_backend()
+        backend.speak(response)
+        return backend.started[0] - started, time.perf_counter() - started
+
+    worker = SpeechWorker(make_backend)
+    worker.start()
+    worker.ready.wait()
+
+    def new_path():
+        started = time.perf_counter()
+        spoken = len(worker.backend.started)
+        worker.speak_stream(groq_integration.stream_groq_response('What is the status of the report?', config))
+        return worker.backend.started[spoken] - started, time.perf_counter() - started
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        old_path(), new_path()  # Warm up the connection and the prompt builder
+        results = {label: [run() for _ in range(args.repeats)] for label, run in (('per response', old_path),
+                                                                                 ('worker', new_path))}
+    for label, timings in results.items():
+        print(f'{label:<13} first audio {statistics.median(t[0] for t in timings) * 1000:7.1f} ms  '
+              f'done speaking {statistics.median(t[1] for t in timings) * 1000:7.1f} ms')
+
+    # Barge-in half a second into a long answer: how long until the worker is silent and free again
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(args.repeats):
+            for sentence in ['This is a long answer that keeps going for quite a while.'] * 5:
+                last = worker.say(sentence)
+            time.sleep(0.5)
+            barged_in = time.perf_counter()
+            worker.cancel()
+            last.done.wait()
+            latencies.append(time.perf_counter() - barged_in)
+    print(f'barge-in      silent after {statistics.median(latencies) * 1000:7.1f} ms '
+          f'(max {max(latencies) * 1000:.1f} ms)')
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
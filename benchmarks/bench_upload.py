@@ -0,0 +1,107 @@
+# bench_upload.py
+# Upload size, encode time and request latency of API transcription per upload format, against a local stand-in for
+# the OpenAI transcription endpoint behind a simulated slow uplink.
+#
+#   python benchmarks/bench_upload.py --seconds 30 --sample-rate 48000 --uplink-kbps 2000
+#
+# "raw wav" is what transcribe_api sent before: a WAV file at the recording's sample rate. The other rows go through
+# encode_for_upload(), which resamples to 16kHz first. The audio is synthetic speech with pauses; real speech
+# compresses somewhat better with FLAC than the noisy synthetic signal does.
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from fake_audio import synthetic_utterance
+
+def start_server(uplink_bytes_per_second):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            remaining = int(self.headers.get('Content-Length', 0))
+            while remaining:
+                chunk = self.rfile.read(min(remaining, 16384))
+                remaining -= len(chunk)
+                time.sleep(len(chunk) / uplink_bytes_per_second)  # The client's uplink is the bottleneck
+            body = b'{"text": "hello world"}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+    server = Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def resample(audio, from_rate, to_rate):
+    positions = np.linspace(0, audio.size - 1, int(audio.size * to_rate / from_rate))
+    return np.interp(positions, np.arange(audio.size), audio).astype(np.int16)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare upload formats for API transcription.')
+    parser.add_argument('--seconds', type=float, default=30.0, help='Approximate length of the recording')
+    parser.add_argument('--sample-rate', type=int, default=48000, help='Recording sample rate')
+    parser.add_argument('--uplink-kbps', type=float, default=2000.0, help='Simulated upload bandwidth in kbit/s')
+    parser.add_argument('--repeats', type=int, default=3, help='Requests per format')
+    args = parser.parse_args()
+
+    server = start_server(args.uplink_kbps * 1000 / 8)
+    os.environ['OPENAI_BASE_URL'] = f'http://127.0.0.1:{server.server_port}/v1'
+    os.environ['OPENAI_API_KEY'] = 'bench'
+
+    import api_clients
+    import transcription
+    from config_utils import load_config_with_defaults
+    config = load_config_with_defaults()
+    config.update(sample_rate=args.sample_rate, print_to_terminal=False)
+    api_clients.get_client('openai', config)
+
+    phrases = max(int(args.seconds // 3), 1)
+    speech, _ = synthetic_utterance(phrases, 2.5, 0.5, trailing_silence=0.0)
+    audio = resample(speech, 16000, args.sample_rate)
+    print(f'{audio.size / args.sample_rate:.1f}s recorded at {args.sample_rate} Hz, uplink {args.uplink_kbps:.0f} kbit/s')
+
+    def upload_raw_wav():
+        client = api_clients.get_client('openai')
+        audio_file = transcription.to_wav_buffer(audio, args.sample_rate)
+        started = time.perf_counter()
+        client.audio.transcriptions.create(model='whisper-1', file=audio_file)
+        return audio_file.getbuffer().nbytes, 0.0, time.perf_counter() - started
+
+    def upload(codec):
+        def run():
+            before = dict(api_clients.counters[('openai', 'transcription')])
+            started = time.perf_counter()
+            transcription.transcribe_api(dict(config, api_upload_codec=codec), audio)
+            after = api_clients.counters[('openai', 'transcription')]
+            return (after['upload_bytes'] - before['upload_bytes'],
+                    after['encode_seconds'] - before['encode_seconds'], time.perf_counter() - started)
+        return run
+
+    for label, run in (('raw wav', upload_raw_wav), ('16 kHz wav', upload('wav')), ('16 kHz flac', upload('flac')),
+                       ('16 kHz opus', upload('opus'))):
+        results = [run() for _ in range(args.repeats)]
+        size = results[0][0]
+        print(f'{label:<12} {size / 1024:8.1f} kB  encode {statistics.median(r[1] for r in results) * 1000:6.1f} ms  '
+              f'request {statistics.median(r[2] for r in results) * 1000:8.1f} ms  '
+              f'({size * 8 / (audio.size / args.sample_rate) / 1000:6.1f} kbit/s of audio)')
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# bench_vector_index.py
+# Query latency and resident memory of the Chroma and NumPy vector stores at several corpus sizes.
+#
+#   python benchmarks/bench_vector_index.py --sizes 1000 10000 100000 --queries 300
+#
+# Each store is filled with random 768-dimensional embeddings (the size of bge-base) in one process and queried in
+# a fresh one, the way the app opens a persisted index. Queries go through retriever.invoke() with k=2, as in
+# groq_integration; the query embedding is precomputed so the embedding model is not part of the measurement.
+# Resident memory is the growth in RSS from before opening the store to after the queries. "add ms" is the time to
+# add one more page (--page-chunks chunks) to the built index, as add_url does: the median of 5 pages.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+DIM = 768
+BACKENDS = ('chroma', 'numpy', 'numpy-float16')
+
+class RandomEmbeddings:
+    """
+    Embedding function with the LangChain interface that returns a fixed pseudo-random vector per text.
+    """
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return np.random.default_rng(zlib.crc32(text.encode())).standard_normal(DIM, dtype=np.float32).tolist()
+
+def rss_mb():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+def open_store(backend, directory):
+    if backend == 'chroma':
+        from langchain_community.vectorstores import Chroma
+        return Chroma(collection_name='bench', embedding_function=RandomEmbeddings(), persist_directory=directory)
+    from numpy_index import NumpyVectorStore
+    return NumpyVectorStore(directory, RandomEmbeddings(), dtype='float16' if backend == 'numpy-float16' else 'float32')
+
+def add_chunks(backend, store, rng, start, count):
+    embeddings = rng.standard_normal((count, DIM), dtype=np.float32)
+    ids = [f'chunk-{index}' for index in range(start, start + count)]
+    texts = [f'Chunk {index} of the benchmark corpus.' for index in range(start, start + count)]
+    metadatas = [{'source': f'doc-{index // 50}'} for index in range(start, start + count)]
+    if backend == 'chroma':
+        store._collection.add(ids=ids, embeddings=embeddings.tolist(), documents=texts, metadatas=metadatas)
+    else:
+        store.add_embeddings(embeddings, texts, metadatas, ids)
+
+def build(backend, directory, size, page_chunks):
+    store = open_store(backend, directory)
+    rng = np.random.default_rng(0)
+    batch = 5000
+    for start in range(0, size, batch):
+        add_chunks(backend, store, rng, start, min(batch, size - start))
+    # More pages, as add_url adds them to an index that is already built
+    add_seconds = []
+    for page in range(5):
+        started = time.perf_counter()
+        add_chunks(backend, store, rng, size + page * page_chunks, page_chunks)
+        add_seconds.append(time.perf_counter() - started)
+    return {'add_seconds': sorted(add_seconds)[2]}
+
+def query(backend, directory, queries):
+    before = rss_mb()
+    started = time.perf_counter()
+    store = open_store(backend, directory)
+    retriever = store.as_retriever(search_kwargs={'k': 2})
+    retriever.invoke('warm-up question')
+    open_seconds = time.perf_counter() - started
+
+    latencies = []
+    for index in range(queries):
+        started = time.perf_counter()
+        retriever.invoke(f'question {index}')
+        latencies.append(time.perf_counter() - started)
+
+    batch_seconds = None
+    if hasattr(retriever, 'batch') and backend != 'chroma':
+        started = time.perf_counter()
+        retriever.batch([f'question {index}' for index in range(queries)])
+        batch_seconds = (time.perf_counter() - started) / queries
+    latencies.sort()
+    return {'p50': latencies[len(latencies) // 2], 'p99': latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)],
+            'rss_mb': rss_mb() - before, 'open_seconds': open_seconds, 'batch_per_query': batch_seconds}
+
+def run_in_subprocess(*args):
+    result = subprocess.run([sys.executable, __file__, '--worker', *map(str, args)], capture_output=True, text=True)
+    if result.returncode != 0:
+        return {'error': (result.stderr.strip().splitlines() or ['failed'])[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare Chroma and NumPy vector store query latency and memory.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='Chunks in the corpus')
+    parser.add_argument('--queries', type=int, default=300, help='Queries per measurement')
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--page-chunks', type=int, default=20, help='Chunks in the page added to the built index')
+    parser.add_argument('--worker', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        phase, backend, directory, count = args.worker
+        if phase == 'build':
+            size, page_chunks = map(int, count.split(','))
+            print(json.dumps(build(backend, directory, size, page_chunks)))
+        else:
+            print(json.dumps(query(backend, directory, int(count))))
+        return
+
+    print(f'{"chunks":>7} {"backend":<14} {"p50 ms":>8} {"p99 ms":>8} {"batch ms/q":>10} {"RSS MB":>8} {"open s":>7} '
+          f'{"add ms":>8}')
+    for size in args.sizes:
+        for backend in args.backends:
+            with tempfile.TemporaryDirectory() as directory:
+                built = run_in_subprocess('build', backend, directory, f'{size},{args.page_chunks}')
+                result = built
+                if 'error' not in built:
+                    result = dict(run_in_subprocess('query', backend, directory, args.queries), **built)
+            if 'error' in result:
+                print(f'{size:>7} {backend:<14} skipped: {result["error"]}')
+                continue
+            batch = f'{result["batch_per_query"] * 1000:10.3f}' if result['batch_per_query'] is not None else f'{"-":>10}'
+            print(f'{size:>7} {backend:<14} {result["p50"] * 1000:8.3f} {result["p99"] * 1000:8.3f} {batch} '
+                  f'{result["rss_mb"]:8.1f} {result["open_seconds"]:7.2f} {result["add_seconds"] * 1000:8.2f}')
+
+if __name__ == '__main__':
+    main()
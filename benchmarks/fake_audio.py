@@ -0,0 +1,150 @@
+# fake_audio.py
+# Offline stand-in for the sounddevice module so the recorder can be benchmarked without a microphone.
+
+import sys
+import os
+import threading
+import time
+import types
+import wave
+import numpy as np
+
+def synthetic_speech(seconds, sample_rate=16000, seed=0):
+    """
+    Deterministic speech-like signal: noise bursts shaped by a syllable-rate envelope.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+    carrier = np.sin(2 * np.pi * 220 * t) + 0.5 * rng.standard_normal(t.size)
+    return (carrier * envelope * 8000).astype(np.int16)
+
+def synthetic_utterance(num_phrases, phrase_seconds, pause_seconds, trailing_silence=2.0, sample_rate=16000):
+    """
+    Phrases of synthetic speech separated by pauses, followed by trailing silence.
+    Returns the samples and the offset in seconds at which the speaker stops.
+    """
+    pause = np.zeros(int(pause_seconds * sample_rate), dtype=np.int16)
+    parts = []
+    for index in range(num_phrases):
+        if index:
+            parts.append(pause)
+        parts.append(synthetic_speech(phrase_seconds, sample_rate, seed=index))
+    speech_end = sum(part.size for part in parts) / sample_rate
+    parts.append(np.zeros(int(trailing_silence * sample_rate), dtype=np.int16))
+    return np.concatenate(parts), speech_end
+
+def write_wav(path, samples, sample_rate=16000):
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(samples.astype(np.int16).tobytes())
+
+def read_wav(path):
+    """
+    Samples and sample rate of a 16-bit WAV file; stereo files are mixed down to mono.
+    """
+    with wave.open(path, 'rb') as wf:
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        if wf.getnchannels() > 1:
+            samples = samples.reshape(-1, wf.getnchannels()).mean(axis=1).astype(np.int16)
+        return samples, wf.getframerate()
+
+# name -> (phrases, phrase seconds, pause seconds, trailing silence); a short command and a longer dictation
+FIXTURES = {
+    'command': (1, 1.5, 0.0, 1.2),
+    'dictation': (4, 2.5, 0.5, 1.2),
+}
+
+def make_fixtures(directory):
+    """
+    Write the synthetic WAV fixtures to directory, unless they are there already, and return their paths by name.
+    Each starts with half a second of low microphone noise.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, (phrases, phrase_seconds, pause_seconds, trailing) in FIXTURES.items():
+        paths[name] = os.path.join(directory, f'{name}.wav')
+        if not os.path.exists(paths[name]):
+            speech, _ = synthetic_utterance(phrases, phrase_seconds, pause_seconds, trailing)
+            lead = (np.random.default_rng(7).standard_normal(8000) * 20).astype(np.int16)
+            write_wav(paths[name], np.concatenate([lead, speech]))
+    return paths
+
+class FakeInputStream:
+    """
+    Replays `source` into the callback in blocks of `blocksize` samples, paced at `speed` times real time
+    (speed=0 feeds as fast as possible). Mirrors the subset of sd.InputStream used by transcription.record().
+    With `live_since` set (a perf_counter time), the source plays like a live microphone from that moment on: a
+    stream starts at the audio of the moment it is opened, and what plays while no stream is open is lost. Opening a
+    stream takes `open_seconds`, like PortAudio opening a device.
+    """
+    source = np.zeros(0, dtype=np.int16)
+    speed = 1.0
+    live_since = None
+    open_seconds = 0.0
+    last = None
+
+    def __init__(self, samplerate=16000, channels=1, dtype='int16', blocksize=480, device=None, callback=None):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.callback = callback
+        self.fed_samples = 0
+        self.started_at = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._feed, daemon=True)
+        FakeInputStream.last = self
+
+    def _feed(self):
+        source = FakeInputStream.source
+        start = self.started_at = time.perf_counter()
+        first = 0
+        if FakeInputStream.live_since is not None:
+            first = int((start - FakeInputStream.live_since) * FakeInputStream.speed * self.samplerate)
+            first -= first % self.blocksize
+            start -= first / self.samplerate / FakeInputStream.speed
+        for offset in range(first, source.size - self.blocksize + 1, self.blocksize):
+            if self.stopped.is_set():
+                return
+            block = source[offset:offset + self.blocksize].reshape(-1, 1)
+            self.callback(block, self.blocksize, None, None)
+            self.fed_samples += self.blocksize
+            if FakeInputStream.speed:
+                delay = start + (offset + self.blocksize) / self.samplerate / FakeInputStream.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    @property
+    def fed_seconds(self):
+        return self.fed_samples / self.samplerate
+
+    def start(self):
+        time.sleep(FakeInputStream.open_seconds)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def close(self):
+        self.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+def install_fake_sounddevice():
+    """
+    Register a fake `sounddevice` module before the recorder is imported.
+    """
+    module = types.ModuleType('sounddevice')
+    module.InputStream = FakeInputStream
+    module.query_devices = lambda *args, **kwargs: []
+    sys.modules['sounddevice'] = module
+    return module
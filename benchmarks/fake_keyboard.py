@@ -0,0 +1,54 @@
+# fake_keyboard.py
+# An offline stand-in for pynput's keyboard Controller that records when each key is pressed instead of typing.
+
+import sys
+import time
+import types
+
+class FakeController:
+    presses = []  # (time.perf_counter(), key) of every press, shared by all controllers
+    created = 0
+    key_cost = 0.0  # Seconds each press and release takes, like the round trip to a real input system
+
+    def __init__(self):
+        FakeController.created += 1
+
+    def press(self, key):
+        FakeController.presses.append((time.perf_counter(), key))
+        self._spend()
+
+    def release(self, key):
+        self._spend()
+
+    def _spend(self):
+        if self.key_cost:
+            deadline = time.perf_counter() + self.key_cost
+            while time.perf_counter() < deadline:
+                pass
+
+    def type(self, text):
+        for key in text:
+            self.press(key)
+            self.release(key)
+
+    @classmethod
+    def reset(cls):
+        cls.presses = []
+        cls.created = 0
+
+    @classmethod
+    def typed(cls):
+        return ''.join(key for _, key in cls.presses if isinstance(key, str))
+
+def install_fake_pynput():
+    """
+    Register a fake `pynput` package whose keyboard.Controller is FakeController. Call before importing helpers.
+    """
+    keyboard_module = types.ModuleType('pynput.keyboard')
+    keyboard_module.Controller = FakeController
+    keyboard_module.Key = types.SimpleNamespace(ctrl='ctrl', shift='shift', alt='alt', cmd='cmd', enter='enter')
+    keyboard_module.Listener = None
+    pynput = types.ModuleType('pynput')
+    pynput.keyboard = keyboard_module
+    sys.modules['pynput'] = pynput
+    sys.modules['pynput.keyboard'] = keyboard_module
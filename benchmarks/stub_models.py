@@ -0,0 +1,54 @@
+# stub_models.py
+# Offline stand-ins for the transcription model, with a configurable cost per second of audio, and for the
+# text-to-speech engine.
+
+import threading
+import time
+from types import SimpleNamespace
+
+class StubWhisperModel:
+    """
+    Mimics WhisperModel.transcribe(): sleeps for `real_time_factor` seconds per second of input audio plus a fixed
+    `overhead`, then returns one segment. Input can be a float32 array (16kHz) or a WAV path. Like a model created
+    with num_workers, at most `num_workers` calls run at once; the sleep releases the GIL as CTranslate2 does.
+    """
+    def __init__(self, real_time_factor=0.2, overhead=0.05, text='hello world', num_workers=1):
+        self.real_time_factor = real_time_factor
+        self.overhead = overhead
+        self.text = text
+        self.calls = 0
+        self.prompts = []
+        self.workers = threading.Semaphore(num_workers)
+
+    def transcribe(self, audio=None, initial_prompt=None, **kwargs):
+        self.calls += 1
+        self.prompts.append(initial_prompt)
+        if isinstance(audio, str):
+            import wave
+            with wave.open(audio, 'rb') as wf:
+                seconds = wf.getnframes() / wf.getframerate()
+        else:
+            seconds = len(audio) / 16000
+        with self.workers:
+            time.sleep(self.overhead + seconds * self.real_time_factor)
+        return iter([SimpleNamespace(text=' ' + self.text)]), SimpleNamespace(duration=seconds)
+
+class StubTTS:
+    """
+    Mimics a pyttsx3-backed speech backend: creating it costs `init_seconds` (pyttsx3.init() loads the platform
+    driver), speaking costs `seconds_per_char`, spent word by word so should_stop() is checked between words as the
+    'started-word' callback does. The start time of every utterance is recorded in `started`.
+    """
+    def __init__(self, init_seconds=0.2, seconds_per_char=0.06):
+        time.sleep(init_seconds)
+        self.seconds_per_char = seconds_per_char
+        self.started = []
+        self.spoken = []
+
+    def speak(self, text, should_stop=lambda: False):
+        self.started.append(time.perf_counter())
+        for word in text.split():
+            if should_stop():
+                return
+            time.sleep((len(word) + 1) * self.seconds_per_char)
+            self.spoken.append(word)
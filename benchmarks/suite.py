@@ -0,0 +1,241 @@
+# suite.py
+# End-to-end benchmark of the voice-to-text path, offline: every stage of a hotkey request is timed separately, the
+# results are written as JSON and compared with a stored baseline.
+#
+#   python benchmarks/suite.py                      # run, write benchmarks/results/latest.json, compare
+#   python benchmarks/suite.py --update-baseline    # run and store the results as benchmarks/baseline.json
+#   python benchmarks/suite.py --repeats 10 --threshold 0.2 --wav my_recording.wav
+#
+# Run from the repository root. Stand-ins replace everything outside the process:
+#   capture     record() reading a WAV fixture through a fake sounddevice stream (CPU seconds of the recording loop,
+#               since the wall time is set by the replay speed)
+#   transcribe  transcribe() with the stub model; 'transcribe_tiny' with faster_whisper's tiny.en as well, when it
+#               is in the local Hugging Face cache
+#   retrieve    groq_integration.retrieve() over a NumPy index of --chunks chunks with hashed bag-of-words embeddings
+#   prompt      build_messages() with the user's data held in a temporary DataStore
+#   generate    get_groq_response() against a local stand-in for the Groq API (--first-token-ms, --tokens)
+#   output      typewrite() in the configured output mode through a fake pynput controller
+# A stage regresses when its median is more than --threshold slower than the baseline and by more than --min-delta-ms;
+# the exit code is 1 if any stage regressed.
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import queue
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_audio import FakeInputStream, install_fake_sounddevice, make_fixtures, read_wav
+from fake_keyboard import FakeController, install_fake_pynput
+install_fake_sounddevice()
+install_fake_pynput()
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+# Arguments left out of the recorded settings: actions and file paths, which say nothing about the measurement and
+# would tie the results to one checkout
+UNRECORDED_ARGS = ('update_baseline', 'baseline', 'wav')
+STAGES = ('capture', 'transcribe', 'transcribe_tiny', 'retrieve', 'prompt', 'generate', 'output')
+QUESTIONS = ['When is the quarterly report due?', 'What is my email address?', 'Summarize the project plan.']
+DIM = 256
+
+class HashEmbeddings:
+    """
+    Deterministic bag-of-words embeddings with the LangChain interface: texts that share words are close.
+    """
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        vector = np.zeros(DIM, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.strip('.,?!').encode()) % DIM] += 1.0
+        return vector.tolist()
+
+def build_retriever(directory, chunks):
+    from langchain_core.documents import Document
+    from numpy_index import NumpyVectorStore
+    topics = ['quarterly report', 'project plan', 'travel budget', 'team meeting', 'email address', 'release notes']
+    documents = [Document(page_content=f'Note {index} about the {topics[index % len(topics)]}: '
+                                       f'{"details and figures " * (index % 5 + 3)}',
+                          metadata={'source': f'doc-{index // 20}', 'tokens': 30})
+                 for index in range(chunks)]
+    store = NumpyVectorStore(directory, HashEmbeddings())
+    for start in range(0, chunks, 500):
+        batch = documents[start:start + 500]
+        store.add_documents(batch, ids=[f'chunk-{index}' for index in range(start, start + len(batch))])
+    return store.as_retriever(search_kwargs={'k': 2})
+
+def load_tiny_model():
+    # Only from the local cache: the suite never downloads anything
+    try:
+        from faster_whisper import WhisperModel
+        return WhisperModel('tiny.en', device='cpu', compute_type='int8', local_files_only=True)
+    except Exception:
+        return None
+
+def timed(function, *args, cpu=False, **kwargs):
+    clock = time.process_time if cpu else time.perf_counter
+    started = clock()
+    result = function(*args, **kwargs)
+    return result, clock() - started
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {'median': statistics.median(ordered), 'p95': ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)],
+            'runs': len(ordered)}
+
+def run_suite(args):
+    import data_store
+    from config_utils import load_config_with_defaults
+    from stub_models import StubWhisperModel
+    from bench_llm_streaming import start_server
+
+    workdir = tempfile.mkdtemp(prefix='whisper-bench-')
+    # The user's data goes to a temporary store, not src/data.json; set before groq_integration subscribes to it
+    data_store._data_store = data_store.DataStore(os.path.join(workdir, 'data.json'))
+    import groq_integration
+    import helpers
+    import output_engine
+    import response_cache
+    import transcription
+
+    config = load_config_with_defaults()
+    config.update(recording_mode='voice_activity_detection', sound_device=None, sample_rate=16000, use_api=False,
+                  spill_audio_to_disk=False, streaming_transcription=False, print_to_terminal=False)
+    server = start_server(args.tokens, args.first_token_ms / 1000, args.token_ms / 1000)
+    from groq import Groq
+    groq_integration.client = Groq(base_url=f'http://127.0.0.1:{server.server_port}', api_key='bench')
+    groq_integration.retriever, groq_integration.retriever_built = build_retriever(os.path.join(workdir, 'index'), args.chunks), True
+    response_cache._response_cache = False  # Every repeat must reach the stand-in server
+    for key, value in {'email': 'me@example.com', 'report_due': 'Friday', 'project_plan': 'Ship in May ' * 20}.items():
+        data_store.get_data_store().set(key, value)
+    FakeController.key_cost = args.key_cost_us / 1e6
+    output_engine._output_engine = output_engine.OutputEngine(mode=config['output_mode'], interval=args.key_delay,
+                                                              chunk_size=config['output_chunk_size'])
+    stub_model = StubWhisperModel(real_time_factor=args.rtf, overhead=0.02)
+    tiny_model = load_tiny_model() if not args.no_real_model else None
+
+    fixtures = make_fixtures(os.path.join(BENCH_DIR, 'fixtures'))
+    for path in args.wav:
+        fixtures[os.path.splitext(os.path.basename(path))[0]] = path
+
+    samples = {}
+    for name, path in fixtures.items():
+        source, sample_rate = read_wav(path)
+        fixture_config = dict(config, sample_rate=sample_rate)
+        for repeat in range(args.repeats + 1):  # The first round warms up and is not counted
+            times = {}
+            FakeInputStream.source, FakeInputStream.speed = source, args.replay_speed
+            with contextlib.redirect_stdout(io.StringIO()):
+                audio, times['capture'] = timed(transcription.record, queue.Queue(), lambda: False, fixture_config, cpu=True)
+                text, times['transcribe'] = timed(transcription.transcribe, queue.Queue(), lambda: False,
+                                                  fixture_config, audio, stub_model)
+                if tiny_model is not None:
+                    _, times['transcribe_tiny'] = timed(transcription.transcribe, queue.Queue(), lambda: False,
+                                                        fixture_config, audio, tiny_model)
+                query = QUESTIONS[repeat % len(QUESTIONS)]  # The stub model's text is always the same
+                docs, times['retrieve'] = timed(groq_integration.retrieve, query)
+                _, times['prompt'] = timed(groq_integration.build_messages, query, config, docs)
+                response, times['generate'] = timed(groq_integration.get_groq_response, query, config, docs)
+                _, times['output'] = timed(helpers.typewrite, response, config['writing_key_press_delay'])
+            if repeat:
+                for stage, seconds in times.items():
+                    samples.setdefault(f'{name}/{stage}', []).append(seconds)
+                samples.setdefault(f'{name}/total', []).append(sum(times.values()))
+    server.shutdown()
+
+    return {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'machine': {'platform': platform.platform(), 'python': platform.python_version(), 'cpus': os.cpu_count()},
+        'settings': {key: value for key, value in vars(args).items() if key not in UNRECORDED_ARGS},
+        'tiny_model': tiny_model is not None,
+        'stages': {key: summarize(values) for key, values in sorted(samples.items())},
+    }
+
+def compare(results, baseline, threshold, min_delta):
+    """
+    Print each stage next to its baseline and return the names of the stages that regressed.
+    """
+    thresholds = baseline.get('thresholds', {})
+    regressions = []
+    print(f'{"stage":<24} {"median":>10} {"baseline":>10} {"change":>8}')
+    for key, stats in results['stages'].items():
+        base = baseline['stages'].get(key)
+        if base is None:
+            print(f'{key:<24} {stats["median"] * 1000:8.2f}ms {"-":>10} {"new":>8}')
+            continue
+        change = stats['median'] / base['median'] - 1 if base['median'] else 0.0
+        limit = thresholds.get(key.split('/')[-1], threshold)
+        regressed = change > limit and (stats['median'] - base['median']) * 1000 > min_delta
+        if regressed:
+            regressions.append(key)
+        print(f'{key:<24} {stats["median"] * 1000:8.2f}ms {base["median"] * 1000:8.2f}ms {change:+7.1%}'
+              f'{"  REGRESSED" if regressed else ""}')
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Time every stage of the voice-to-text path and compare with a baseline.')
+    parser.add_argument('--repeats', type=int, default=5, help='Measured runs per fixture')
+    parser.add_argument('--wav', nargs='*', default=[], help='Extra 16-bit WAV recordings to replay')
+    parser.add_argument('--replay-speed', type=float, default=20.0, help='Replay speed of the fake microphone')
+    parser.add_argument('--rtf', type=float, default=0.1, help='Stub model seconds per second of audio')
+    parser.add_argument('--chunks', type=int, default=2000, help='Chunks in the document index')
+    parser.add_argument('--tokens', type=int, default=30, help='Tokens in each stand-in LLM response')
+    parser.add_argument('--token-ms', type=float, default=5.0, help='Delay between stand-in LLM tokens')
+    parser.add_argument('--first-token-ms', type=float, default=100.0, help='Delay before the first stand-in token')
+    parser.add_argument('--key-delay', type=float, default=0.002, help='Seconds between typed keys')
+    parser.add_argument('--key-cost-us', type=float, default=20.0, help='Time the fake controller spends per key event')
+    parser.add_argument('--no-real-model', action='store_true', help='Skip the tiny model even if it is cached')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown of a stage median, 0.25 = 25%%')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0, help='Slowdowns smaller than this never count')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline JSON to compare with')
+    parser.add_argument('--update-baseline', action='store_true', help='Store the results as the baseline')
+    args = parser.parse_args()
+
+    results = run_suite(args)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = results['created'].replace(':', '-')
+    for path in (os.path.join(RESULTS_DIR, f'{stamp}.json'), os.path.join(RESULTS_DIR, 'latest.json')):
+        with open(path, 'w') as file:
+            json.dump(results, file, indent=2)
+    print(f'Results written to {os.path.relpath(os.path.join(RESULTS_DIR, "latest.json"))}')
+
+    if args.update_baseline:
+        previous = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                previous = json.load(file)
+        results['thresholds'] = previous.get('thresholds', {})  # Per-stage thresholds are kept
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f'Baseline updated: {os.path.relpath(args.baseline)}')
+        return 0
+    if not os.path.exists(args.baseline):
+        print('No baseline to compare with; run with --update-baseline to store one.')
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f'{len(regressions)} stages regressed: {", ".join(regressions)}')
+        return 1
+    print('No regressions.')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+# api_clients.py
+#
+# One long-lived client per API backend ('openai' for transcription, 'groq' for chat), each over its own httpx
+# connection pool with keep-alive, so requests after the first reuse an open TLS connection. Calls made through
+# call() are retried on connection errors, timeouts, 429 and 5xx responses with exponential backoff and full jitter,
+# and their latency is recorded per backend and operation.
+
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+
+import tracing
+
+BACKENDS = ('openai', 'groq')
+RETRY_STATUS_CODES = {408, 409, 429}  # Plus every 5xx
+LATENCY_SAMPLES = 500  # Latencies kept per backend and operation
+
+clients = {}
+clients_lock = threading.Lock()
+metrics_lock = threading.Lock()
+latencies = defaultdict(lambda: deque(maxlen=LATENCY_SAMPLES))  # (backend, operation) -> recent seconds
+counters = defaultdict(lambda: {'requests': 0, 'errors': 0, 'retries': 0, 'upload_bytes': 0, 'encode_seconds': 0.0})
+options = None
+
+def get_options(config=None):
+    global options
+    if options is None or config is not None:
+        if config is None:
+            from config_utils import load_config_with_defaults
+            config = load_config_with_defaults()
+        options = {key: config[key] for key in ('api_timeout_seconds', 'api_connect_timeout_seconds', 'api_max_retries',
+                                                'api_retry_base_delay', 'api_max_connections', 'api_keepalive_seconds')}
+    return options
+
+"""
+Create an httpx client with the pool and timeout settings from the config.
+"""
+def create_http_client(opts):
+    import httpx
+    return httpx.Client(
+        timeout=httpx.Timeout(opts['api_timeout_seconds'], connect=opts['api_connect_timeout_seconds']),
+        limits=httpx.Limits(max_connections=opts['api_max_connections'],
+                            max_keepalive_connections=opts['api_max_connections'],
+                            keepalive_expiry=opts['api_keepalive_seconds']),
+    )
+
+"""
+Create the SDK client for a backend. Retries are done by call(), so the SDK's own are turned off.
+"""
+def create_client(backend, opts, base_url=None, api_key=None):
+    from dotenv import load_dotenv
+    load_dotenv()
+    http_client = create_http_client(opts)
+    if backend == 'openai':
+        from openai import OpenAI
+        return OpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY') or None,
+                      base_url=base_url or os.getenv('OPENAI_BASE_URL') or 'https://api.openai.com/v1',
+                      http_client=http_client, max_retries=0)
+    if backend == 'groq':
+        from groq import Groq
+        return Groq(api_key=api_key or os.environ.get("GROQ_API_KEY"), base_url=base_url,
+                    http_client=http_client, max_retries=0)
+    raise ValueError(f'Unknown API backend {backend!r}, expected one of {BACKENDS}')
+
+"""
+Return the shared client for a backend, creating it on first use.
+"""
+def get_client(backend, config=None):
+    with clients_lock:
+        if backend not in clients:
+            clients[backend] = create_client(backend, get_options(config))
+        return clients[backend]
+
+def is_retryable(error):
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status in RETRY_STATUS_CODES or status >= 500
+    # Connection errors and timeouts have no status code in either SDK
+    return type(error).__name__ in ('APIConnectionError', 'APITimeoutError')
+
+"""
+Run request() (a call on a backend's client) with retries, and record its latency under (backend, operation).
+"""
+def call(backend, operation, request, retries=None, base_delay=None):
+    opts = get_options()
+    retries = opts['api_max_retries'] if retries is None else retries
+    base_delay = opts['api_retry_base_delay'] if base_delay is None else base_delay
+    started = time.perf_counter()
+    for attempt in range(retries + 1):
+        try:
+            result = request()
+            break
+        except Exception as e:
+            if attempt == retries or not is_retryable(e):
+                record(backend, operation, time.perf_counter() - started, attempt, error=True)
+                tracing.record_span(f'{backend}.{operation}', started, time.perf_counter(), retries=attempt, error=True)
+                raise
+            # Full jitter: a random wait up to the exponential backoff, so clients that failed together spread out
+            time.sleep(random.uniform(0, base_delay * 2 ** attempt))
+    record(backend, operation, time.perf_counter() - started, attempt)
+    tracing.record_span(f'{backend}.{operation}', started, time.perf_counter(), retries=attempt)
+    return result
+
+def record(backend, operation, seconds, retries=0, error=False):
+    with metrics_lock:
+        latencies[(backend, operation)].append(seconds)
+        counter = counters[(backend, operation)]
+        counter['requests'] += 1
+        counter['retries'] += retries
+        counter['errors'] += error
+
+# Bytes uploaded by a request and the time spent encoding them, e.g. compressed audio for a transcription
+def record_upload(backend, operation, size, encode_seconds):
+    with metrics_lock:
+        counter = counters[(backend, operation)]
+        counter['upload_bytes'] += size
+        counter['encode_seconds'] += encode_seconds
+
+"""
+Per (backend, operation): request, error and retry counts, upload bytes and encode seconds, and p50/p95 latency in
+seconds over recent requests.
+"""
+def latency_stats():
+    with metrics_lock:
+        stats = {}
+        for key, samples in latencies.items():
+            ordered = sorted(samples)
+            stats[key] = dict(counters[key],
+                              p50=ordered[len(ordered) // 2] if ordered else None,
+                              p95=ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] if ordered else None)
+        return stats
+
+"""
+Open a connection to a backend ahead of the first real request by listing its models, which is free.
+"""
+def prewarm(backend, config=None):
+    client = get_client(backend, config)
+    call(backend, 'prewarm', lambda: client.models.list(), retries=0)
+    return client
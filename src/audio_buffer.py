@@ -0,0 +1,99 @@
+# audio_buffer.py
+
+import threading
+import numpy as np
+
+class RingBuffer:
+    """
+    Preallocated int16 ring buffer filled by the sounddevice callback and drained one frame at a time.
+    read() blocks until a full frame is available, so the recording loop sleeps instead of spinning.
+    If the reader falls behind by more than the capacity, the oldest samples are overwritten.
+    """
+    def __init__(self, capacity, dtype=np.int16):
+        self.capacity = int(capacity)
+        self.data = np.zeros(self.capacity, dtype=dtype)
+        self.read_pos = 0
+        self.size = 0
+        self.overruns = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def write(self, samples):
+        samples = np.asarray(samples).reshape(-1)
+        count = samples.size
+        if count == 0:
+            return
+        with self.condition:
+            if count >= self.capacity:
+                # Only the newest `capacity` samples can be kept
+                self.overruns += count - self.capacity + self.size
+                samples = samples[-self.capacity:]
+                count = self.capacity
+                self.read_pos = 0
+                self.size = 0
+            elif self.size + count > self.capacity:
+                dropped = self.size + count - self.capacity
+                self.overruns += dropped
+                self.read_pos = (self.read_pos + dropped) % self.capacity
+                self.size -= dropped
+
+            write_pos = (self.read_pos + self.size) % self.capacity
+            first = min(count, self.capacity - write_pos)
+            self.data[write_pos:write_pos + first] = samples[:first]
+            if first < count:
+                self.data[:count - first] = samples[first:]
+            self.size += count
+            self.condition.notify()
+
+    def read(self, num_samples, timeout=None):
+        """
+        Return the next num_samples samples as a new array, or None if they did not arrive within timeout
+        (or the buffer was closed).
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.size >= num_samples or self.closed, timeout):
+                return None
+            if self.size < num_samples:
+                return None
+            first = min(num_samples, self.capacity - self.read_pos)
+            frame = np.empty(num_samples, dtype=self.data.dtype)
+            frame[:first] = self.data[self.read_pos:self.read_pos + first]
+            if first < num_samples:
+                frame[first:] = self.data[:num_samples - first]
+            self.read_pos = (self.read_pos + num_samples) % self.capacity
+            self.size -= num_samples
+            return frame
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def __len__(self):
+        with self.condition:
+            return self.size
+
+class SampleAccumulator:
+    """
+    Growable int16 array for the recorded utterance. Storage is allocated in large blocks and doubled when full,
+    so appending a 30ms frame is a slice assignment rather than a list extend of Python ints.
+    """
+    def __init__(self, initial_samples, dtype=np.int16):
+        self.data = np.zeros(max(int(initial_samples), 1), dtype=dtype)
+        self.length = 0
+
+    def append(self, frame):
+        count = len(frame)
+        if self.length + count > self.data.size:
+            new_size = max(self.data.size * 2, self.length + count)
+            grown = np.zeros(new_size, dtype=self.data.dtype)
+            grown[:self.length] = self.data[:self.length]
+            self.data = grown
+        self.data[self.length:self.length + count] = frame
+        self.length += count
+
+    def to_array(self, start=0):
+        return self.data[start:self.length].copy()
+
+    def __len__(self):
+        return self.length
@@ -0,0 +1,97 @@
+# audio_trim.py
+#
+# Energy-based silence handling for recorded int16 audio, computed on whole arrays with NumPy. frame_levels() gives
+# the level of every 30ms frame at once; is_silent() is the cheap per-frame check the recorder runs before asking
+# webrtcvad; trim_silence() cuts leading and trailing silence and shortens long pauses before the audio is sent to
+# Whisper, which costs time in proportion to the audio it gets; split_at_silences() picks pauses to cut long
+# recordings at.
+
+import numpy as np
+
+FRAME_DURATION = 30  # ms, the recorder's frame length
+SILENCE_FLOOR = -100.0  # dBFS reported for digital silence
+
+"""
+Level in dBFS (0 is full scale) of each FRAME_DURATION frame of audio; a trailing partial frame is ignored.
+"""
+def frame_levels(audio, sample_rate):
+    frame_size = sample_rate * FRAME_DURATION // 1000
+    num_frames = len(audio) // frame_size
+    if num_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:num_frames * frame_size].reshape(num_frames, frame_size).astype(np.float32)
+    if not np.issubdtype(audio.dtype, np.floating):
+        frames /= 32768.0
+    power = np.einsum('ij,ij->i', frames, frames) / frame_size
+    return np.maximum(10 * np.log10(power + 1e-12), SILENCE_FLOOR)
+
+# True if a frame is quieter than threshold_dbfs, i.e. obviously not speech
+def is_silent(frame, threshold_dbfs):
+    samples = frame.astype(np.float32) / 32768.0
+    return 10 * np.log10(np.dot(samples, samples) / max(samples.size, 1) + 1e-12) < threshold_dbfs
+
+"""
+Cut audio below threshold_dbfs at the start and end, keeping padding_ms around the speech, and shorten pauses inside
+it to at most max_gap_ms. Returns (trimmed audio, seconds removed); the audio is empty if it was all silence.
+"""
+def trim_silence(audio, sample_rate, threshold_dbfs=-55, padding_ms=150, max_gap_ms=400):
+    frame_size = sample_rate * FRAME_DURATION // 1000
+    levels = frame_levels(audio, sample_rate)
+    voiced = levels >= threshold_dbfs
+    if not voiced.any():
+        return audio[:0], len(audio) / sample_rate
+
+    # Widen every voiced stretch by the padding, so word onsets and tails stay in
+    padding = padding_ms // FRAME_DURATION
+    keep = np.convolve(voiced, np.ones(2 * padding + 1))[padding:padding + voiced.size] > 0
+
+    # Silent runs are where keep goes False; inner ones longer than the maximum keep that much, half at each end
+    max_gap = max_gap_ms // FRAME_DURATION
+    edges = np.diff(np.concatenate(([True], keep, [True])).astype(np.int8))
+    starts, ends = np.flatnonzero(edges == -1), np.flatnonzero(edges == 1)
+    inner = (starts > 0) & (ends < keep.size)
+    for start, end in zip(starts[inner], ends[inner]):
+        keep[start:start + max_gap // 2] = True
+        keep[max(end - (max_gap - max_gap // 2), start):end] = True
+
+    mask = np.repeat(keep, frame_size)
+    mask = np.concatenate((mask, np.full(len(audio) - mask.size, keep[-1])))  # The partial frame follows the last one
+    trimmed = audio[mask]
+    return trimmed, (len(audio) - len(trimmed)) / sample_rate
+
+"""
+Pick where to cut a long recording into chunks of at most chunk_seconds: in the last search_seconds before each
+limit, at the middle of the longest pause (a run of frames that speech, one bool per frame, marks as not speech),
+or at the limit if there is no pause. Returns the sample offsets of the chunk boundaries, from 0 to the end.
+"""
+def split_at_silences(speech, num_samples, sample_rate, chunk_seconds=30, search_seconds=5):
+    frame_size = sample_rate * FRAME_DURATION // 1000
+    chunk_frames = max(int(chunk_seconds * 1000) // FRAME_DURATION, 1)
+    search_frames = min(int(search_seconds * 1000) // FRAME_DURATION, chunk_frames - 1)
+
+    # For every frame, the length and middle of the pause it is part of (0 for speech)
+    silent = ~np.asarray(speech, dtype=bool)
+    edges = np.diff(np.concatenate(([False], silent, [False])).astype(np.int8))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    run_length = np.zeros(silent.size, dtype=np.int64)
+    run_middle = np.arange(silent.size)
+    for start, end in zip(starts, ends):
+        run_length[start:end] = end - start
+        run_middle[start:end] = (start + end) // 2
+
+    boundaries = [0]
+    position = 0
+    total_frames = num_samples // frame_size
+    while total_frames - position > chunk_frames:
+        limit = position + chunk_frames
+        window = slice(max(limit - search_frames, position + 1), limit)
+        lengths = run_length[window]
+        if lengths.size and lengths.max() > 0:
+            best = window.start + lengths.size - 1 - int(np.argmax(lengths[::-1]))  # The latest of the longest
+            cut = min(max(int(run_middle[best]), window.start), limit)
+        else:
+            cut = limit
+        boundaries.append(cut * frame_size)
+        position = cut
+    boundaries.append(num_samples)
+    return boundaries
@@ -0,0 +1,164 @@
+# batch_transcribe.py
+#
+# Headless transcription of recorded audio files, e.g.
+#
+#   python src/batch_transcribe.py recordings/ --output transcripts.jsonl --workers 4 --cpu-threads 2
+#
+# Files are spread over a pool of worker processes, each holding its own local model. Every result is appended to the
+# JSONL output as soon as it is ready, and files already transcribed in that output are skipped on the next run.
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config_utils import load_config_with_defaults
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.flac', '.ogg', '.opus', '.webm', '.mp4', '.aac', '.wma')
+
+# Per-process state set up by init_worker()
+worker_config = None
+
+"""
+List the audio files to transcribe: every audio file below a directory, or the paths listed in a manifest file
+(one per line, relative to the manifest, '#' starts a comment).
+"""
+def collect_audio_files(source):
+    if os.path.isdir(source):
+        paths = []
+        for root, _, filenames in os.walk(source):
+            for filename in filenames:
+                if filename.lower().endswith(AUDIO_EXTENSIONS):
+                    paths.append(os.path.join(root, filename))
+        return sorted(paths)
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, 'r') as manifest:
+        for line in manifest:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                paths.append(line if os.path.isabs(line) else os.path.join(base_dir, line))
+    return paths
+
+"""
+Return the set of files that already have a successful result in the output file.
+"""
+def load_completed(output_path):
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, 'r') as output_file:
+        for line in output_file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A partial line left by an interrupted run
+            if 'error' not in record:
+                completed.add(record['path'])
+    return completed
+
+def init_worker(config):
+    global worker_config
+    worker_config = config
+    # Load the model up front so the first file does not pay for it
+    from model_manager import get_model_manager
+    get_model_manager(config).get(config)
+
+def transcribe_file(path, post_process):
+    from faster_whisper import decode_audio
+    from transcription import WHISPER_SAMPLE_RATE, transcribe_local, post_process_transcription
+
+    started = time.perf_counter()
+    try:
+        audio = decode_audio(path, sampling_rate=WHISPER_SAMPLE_RATE)
+        text = transcribe_local(worker_config, audio)
+        if post_process:
+            text = post_process_transcription(text, worker_config)
+    except Exception as e:
+        return {'path': path, 'error': f'{type(e).__name__}: {e}', 'elapsed': time.perf_counter() - started, 'worker': os.getpid()}
+    return {
+        'path': path,
+        'text': text,
+        'duration': audio.size / WHISPER_SAMPLE_RATE,
+        'elapsed': time.perf_counter() - started,
+        'worker': os.getpid(),
+    }
+
+"""
+Transcribe every file not yet in the output, appending one JSON line per file. Returns the run statistics.
+"""
+def run_batch(paths, output_path, config, workers, post_process=True):
+    completed = load_completed(output_path)
+    pending = [path for path in paths if path not in completed]
+    print(f'{len(paths)} files, {len(paths) - len(pending)} already done, {len(pending)} to transcribe '
+          f'on {workers} workers.')
+
+    stats = {'files': 0, 'errors': 0, 'audio_seconds': 0.0, 'wall_seconds': 0.0}
+    if not pending:
+        return stats
+
+    started = time.perf_counter()
+    with open(output_path, 'a') as output_file, \
+            ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(config,)) as executor:
+        futures = [executor.submit(transcribe_file, path, post_process) for path in pending]
+        for future in as_completed(futures):
+            record = future.result()
+            output_file.write(json.dumps(record) + '\n')
+            output_file.flush()
+            if 'error' in record:
+                stats['errors'] += 1
+                print(f'Error: {record["path"]}: {record["error"]}')
+            else:
+                stats['files'] += 1
+                stats['audio_seconds'] += record['duration']
+                if config['print_to_terminal']:
+                    print(f'[{stats["files"] + stats["errors"]}/{len(pending)}] {record["path"]} '
+                          f'({record["duration"]:.1f}s audio in {record["elapsed"]:.1f}s)')
+    stats['wall_seconds'] = time.perf_counter() - started
+    return stats
+
+def print_stats(stats):
+    wall = max(stats['wall_seconds'], 1e-9)
+    audio = stats['audio_seconds']
+    print(f'Transcribed {stats["files"]} files ({audio:.1f}s of audio) in {wall:.1f}s, {stats["errors"]} errors.')
+    print(f'Throughput: {stats["files"] / wall:.2f} files/sec')
+    if audio:
+        # Real-time factor: processing seconds per second of audio (lower is faster)
+        print(f'Real-time factor: {wall / audio:.3f} ({audio / wall:.1f}x real time)')
+
+def main():
+    parser = argparse.ArgumentParser(description='Transcribe a directory or manifest of audio files to JSONL.')
+    parser.add_argument('source', help='Directory of audio files, or a manifest listing one path per line')
+    parser.add_argument('--output', default='transcriptions.jsonl', help='JSONL file to append results to')
+    parser.add_argument('--workers', type=int, default=0, help='Worker processes (default: cores / cpu-threads)')
+    parser.add_argument('--cpu-threads', type=int, default=0, help='CPU threads per model (default: cores / workers)')
+    parser.add_argument('--model', help='Override local_model_options.model')
+    parser.add_argument('--compute-type', help='Override local_model_options.compute_type')
+    parser.add_argument('--language', help='Override local_model_options.language')
+    parser.add_argument('--raw', action='store_true', help='Skip post-processing of the transcriptions')
+    args = parser.parse_args()
+
+    config = load_config_with_defaults()
+    cores = os.cpu_count() or 1
+    workers = args.workers or (max(cores // args.cpu_threads, 1) if args.cpu_threads else min(cores, 4))
+    cpu_threads = args.cpu_threads or max(cores // workers, 1)
+
+    model_options = dict(config['local_model_options'], cpu_threads=cpu_threads)
+    for option, value in (('model', args.model), ('compute_type', args.compute_type), ('language', args.language)):
+        if value:
+            model_options[option] = value
+    # Workers keep their model for the whole run and never need a warm-up clip
+    config = dict(config, local_model_options=model_options, use_api=False, sample_rate=16000,
+                  model_idle_unload_seconds=0, model_warmup=False)
+
+    paths = collect_audio_files(args.source)
+    if not paths:
+        print(f'No audio files found in {args.source}.')
+        sys.exit(1)
+    stats = run_batch(paths, args.output, config, workers, post_process=not args.raw)
+    print_stats(stats)
+
+if __name__ == '__main__':
+    main()
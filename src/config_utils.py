@@ -0,0 +1,92 @@
+# config_utils.py
+
+import os
+import json
+
+UPLOAD_CODECS = ('flac', 'opus', 'wav')  # What encode_for_upload can produce
+
+def load_config_with_defaults():
+    default_config = {
+        'use_api': False,
+        'api_options': {
+            'model': 'whisper',
+            'language': None,
+            'temperature': 0.0,
+            'initial_prompt': None
+        },
+        'local_model_options': {
+            'model': 'small',
+            'device': 'auto',
+            'compute_type': 'auto',
+            'language': None,
+            'temperature': 0.0,
+            'initial_prompt': None,
+            'condition_on_previous_text': True,
+            'vad_filter': False,
+            'cpu_threads': 0, # CTranslate2 threads per model on CPU, 0 for its default
+        },
+        'activation_key': 'ctrl+shift+space',
+        'recording_mode': 'voice_activity_detection', # 'voice_activity_detection', 'press_to_toggle', or 'hold_to_record'
+        'sound_device': None,
+        'sample_rate': 16000,
+        'silence_duration': 900,
+        'spill_audio_to_disk': False, # Write each recording to a temporary WAV file instead of passing it in memory
+        'streaming_transcription': False, # Transcribe each phrase while the user is still speaking
+        'long_form_threshold': 60, # Recordings longer than this (seconds) are transcribed in chunks, in parallel
+        'long_form_chunk_seconds': 30, # Longest chunk; chunks are cut at pauses
+        'long_form_workers': 2, # Chunks transcribed at once (workers of the long-form model variant), 1 to transcribe in one call
+        'streaming_pause_duration': 300, # Pause (ms) that ends a phrase in streaming mode
+        'pre_roll_duration': 300, # Audio (ms) before the VAD detects speech that is kept, so word onsets are not cut
+        'energy_gate_dbfs': -55, # Frames quieter than this are silence without running the VAD
+        'trim_silence': True, # Cut leading/trailing silence and shorten long pauses before transcribing
+        'max_silence_gap': 400, # Longest pause (ms) kept inside the audio when trimming
+        'model_memory_budget_mb': 4000, # Loaded local model variants are unloaded (least recently used first) above this
+        'model_idle_unload_seconds': 1800, # Unload a local model after this long unused, 0 to keep it loaded
+        'model_warmup': True, # Run a short silent clip through a freshly loaded model
+        'writing_key_press_delay': 0.008,
+        'output_mode': 'paste', # 'paste', 'chunked', or 'character'
+        'output_chunk_size': 24, # Characters per burst in chunked mode
+        'noise_on_completion': False,
+        'remove_trailing_period': True,
+        'add_trailing_space': False,
+        'remove_capitalization': False,
+        'print_to_terminal': True,
+        'hide_status_window': False,
+        'speak_responses': False,
+        'stream_responses': True, # Start typing the LLM response as soon as its first token arrives
+        'response_cache': True, # Answer repeated questions from a cache of earlier responses
+        'response_cache_size': 256, # Cached responses kept, least recently used are dropped first
+        'response_cache_ttl_seconds': 86400, # Cached responses older than this are not used, 0 to never expire
+        'response_cache_persist': True, # Keep the cache in src/response_cache.json across restarts
+        'vector_index_backend': 'chroma', # 'chroma', or 'numpy' for an in-process memory-mapped matrix
+        'vector_index_dtype': 'float32', # Matrix dtype of the numpy backend; 'float16' halves its size but single queries are slower
+        'prompt_token_budgets': {'default': 2000}, # Prompt tokens per model name, 'default' for the rest
+        'job_policy': 'queue', # A hotkey pressed while a request is unfinished: 'reject', 'queue', or 'preempt' it
+        'max_jobs': 4, # Unfinished requests allowed with the 'queue' policy
+        'hotkey_debounce_seconds': 0.3, # A hotkey triggered again within this time is ignored (key repeat, double press)
+        'api_timeout_seconds': 30, # Read/write timeout of OpenAI and Groq requests
+        'api_connect_timeout_seconds': 5,
+        'api_max_retries': 2, # Retries on connection errors, timeouts, 429 and 5xx, with jittered backoff
+        'api_retry_base_delay': 0.25, # Seconds; the backoff doubles with every retry
+        'api_max_connections': 10, # Connections kept open per API
+        'api_keepalive_seconds': 60, # Idle connections are closed after this long
+        'api_upload_codec': 'flac', # Audio uploaded for API transcription, at 16kHz: 'flac', 'opus' (lossy) or 'wav'
+        'trace_log': os.path.join('src', 'traces.jsonl'), # Every finished request's trace is appended here, '' for none
+        'metrics_port': 0, # Serve latency percentiles at http://127.0.0.1:<port>/metrics (Prometheus format), 0 for none
+        'continuous_listening': True, # Hands-free mode keeps one input stream open and answers every utterance until stopped
+        'suppress_while_speaking': True, # Ignore the microphone while a response is spoken; False lets speech interrupt it
+        'min_utterance_duration': 200 # ms of speech an utterance needs; shorter sounds (clicks, coughs) are ignored
+    }
+
+    config_path = os.path.join('src', 'config.json')
+    if os.path.isfile(config_path):
+        with open(config_path, 'r') as config_file:
+            user_config = json.load(config_file)
+            for key, value in user_config.items():
+                if key in default_config and value is not None:
+                    default_config[key] = value
+
+    if default_config['api_upload_codec'] not in UPLOAD_CODECS:
+        raise ValueError(f"Unknown api_upload_codec {default_config['api_upload_codec']!r}, expected one of {UPLOAD_CODECS}")
+
+    return default_config
@@ -0,0 +1,221 @@
+# data_store.py
+#
+# The user's data (the "update <keyword>" entries and json-type hotkey results) lives in one in-memory dict, guarded
+# by a lock. Every change is committed as one line appended to a journal and fsynced, so an update is either fully
+# on disk or not at all, and nothing is lost to two handlers rewriting the file at once. The journal is compacted
+# into data.json (written to a temporary file and renamed over it) shortly after changes stop, or once it gets long;
+# on startup data.json is loaded and the journal replayed on top. data.json therefore stays a plain JSON export of
+# the data. Subscribers are called after each committed change, so caches built from the data can stay current.
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+DATA_PATH = os.path.join('src', 'data.json')
+COMPACT_AFTER_OPS = 200  # Journal lines that force a compaction
+COMPACT_DELAY = 2.0  # Seconds without changes before the journal is compacted
+
+class DataStore:
+    def __init__(self, path=DATA_PATH, compact_after_ops=COMPACT_AFTER_OPS, compact_delay=COMPACT_DELAY):
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + '.journal'
+        self.compact_after_ops = compact_after_ops
+        self.compact_delay = compact_delay
+        self.lock = threading.RLock()
+        self.data = {}
+        self.version = 0  # Incremented by every committed change
+        self.journal = None
+        self.journal_ops = 0
+        self.subscribers = []
+        self.pending = None  # Operations of the open transaction
+        self.timer = None
+        self._digest = None
+        self._open()
+
+    def _open(self):
+        self.data = export_load(self.path)
+        try:
+            with open(self.journal_path, 'r') as journal:
+                for line in journal:
+                    try:
+                        op = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # A torn last line from a crash mid-write; that change was never committed
+                    self._apply(op)
+                    self.journal_ops += 1
+        except FileNotFoundError:
+            pass
+        self.journal = open(self.journal_path, 'a')
+        if self.journal_ops:
+            self.compact()
+
+    def _apply(self, op):
+        kind = op['op']
+        if kind == 'set':
+            self.data[op['key']] = op['value']
+        elif kind == 'delete':
+            self.data.pop(op['key'], None)
+        elif kind == 'clear':
+            self.data.clear()
+        elif kind == 'batch':
+            for inner in op['ops']:
+                self._apply(inner)
+
+    def _commit(self, op):
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append(op)
+                return
+            self.journal.write(json.dumps(op) + '\n')
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+            self.journal_ops += 1
+            self._apply(op)
+            self.version += 1
+            self._digest = None
+            self._schedule_compaction()
+        self._notify(op)
+
+    def _notify(self, op):
+        for inner in op['ops'] if op['op'] == 'batch' else [op]:
+            for callback in list(self.subscribers):
+                callback(inner['op'], inner.get('key'), inner.get('value'))
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self.data.get(key, default)
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.data)
+
+    def set(self, key, value):
+        self._commit({'op': 'set', 'key': key, 'value': value})
+
+    def delete(self, key):
+        self._commit({'op': 'delete', 'key': key})
+
+    def clear(self):
+        self._commit({'op': 'clear'})
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group changes into one commit: other threads see all of them or none, and so does a restart.
+        """
+        with self.lock:
+            if self.pending is not None:  # Nested: part of the outer transaction
+                yield self
+                return
+            self.pending = []
+            try:
+                yield self
+            except BaseException:
+                self.pending = None
+                raise
+            ops, self.pending = self.pending, None
+            if ops:
+                self._commit({'op': 'batch', 'ops': ops})
+
+    def subscribe(self, callback):
+        """
+        Call callback(op, key, value) after every committed change; op is 'set', 'delete' or 'clear'.
+        """
+        self.subscribers.append(callback)
+
+    def digest(self):
+        # Hash of the current content, e.g. for cache keys; recomputed only after a change
+        with self.lock:
+            if self._digest is None:
+                self._digest = hashlib.sha256(json.dumps(self.data, sort_keys=True).encode('utf-8')).hexdigest()
+            return self._digest
+
+    def _schedule_compaction(self):
+        # Called with self.lock held
+        if self.journal_ops >= self.compact_after_ops:
+            self.compact()
+            return
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = threading.Timer(self.compact_delay, self.compact)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def compact(self):
+        """
+        Write the data to the JSON file atomically and empty the journal.
+        """
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            export_save(self.path, self.data)
+            self.journal.close()
+            self.journal = open(self.journal_path, 'w')
+            self.journal_ops = 0
+
+    def close(self):
+        with self.lock:
+            if self.journal_ops:
+                self.compact()
+            if self.timer is not None:
+                self.timer.cancel()
+
+def export_load(file_path):
+    try:
+        with open(file_path, 'r') as file:
+            data = json.load(file)
+        return data if isinstance(data, dict) else {}
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+# Write JSON to a temporary file and rename it over file_path, so readers never see a half-written file
+def export_save(file_path, data):
+    temp_path = file_path + '.tmp'
+    with open(temp_path, 'w') as file:
+        json.dump(data, file, indent=2)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, file_path)
+
+_data_store = None
+_data_store_lock = threading.Lock()
+_file_lock = threading.Lock()
+_subscribers = []  # Subscribed through subscribe(), attached when the store is opened
+
+"""
+Return the process-wide DataStore for src/data.json, opening it on first use.
+"""
+def get_data_store():
+    global _data_store
+    with _data_store_lock:
+        if _data_store is None:
+            _data_store = DataStore()
+            for callback in _subscribers:
+                _data_store.subscribe(callback)
+            atexit.register(_data_store.close)
+        return _data_store
+
+"""
+Subscribe callback to the process-wide DataStore without opening it: it is attached when the store is first used.
+"""
+def subscribe(callback):
+    with _data_store_lock:
+        _subscribers.append(callback)
+        if _data_store is not None:
+            _data_store.subscribe(callback)
+
+"""
+Set key in a JSON file. data.json goes through the DataStore; any other file is rewritten atomically.
+"""
+def update_json(file_path, key, value):
+    if os.path.abspath(file_path) == os.path.abspath(DATA_PATH):
+        get_data_store().set(key, value)
+        return
+    with _file_lock:
+        data = export_load(file_path)
+        data[key] = value
+        export_save(file_path, data)
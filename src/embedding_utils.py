@@ -1,59 +1,207 @@
 import os
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import WebBaseLoader, PyMuPDFLoader, TextLoader
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
+import json
+import hashlib
+import threading
+from ingestion import ingest, fetch_url, parse_file
+from prompt_builder import count_tokens
 
-# Instantiate the Embedding Model
-embed_model = FastEmbedEmbeddings(model_name="BAAI/bge-base-en-v1.5")
+# LangChain, Chroma and the embedding model are imported and loaded on first use, so importing this module is cheap
+EMBED_MODEL_NAME = "BAAI/bge-base-en-v1.5"
+embed_model = None
+
+# The vector store is persisted here and updated incrementally: chunks are keyed by a hash of their source and
+# content, and the manifest records a content hash per source so unchanged sources are skipped entirely.
+# The 'chroma' backend keeps its collection in VECTORSTORE_PATH; the 'numpy' backend (numpy_index.py) keeps its
+# matrix in NUMPY_INDEX_PATH with its own manifest, so switching backends re-embeds everything once.
+VECTORSTORE_PATH = os.path.join('src', 'vectorstore')
+MANIFEST_PATH = os.path.join(VECTORSTORE_PATH, 'index_manifest.json')
+NUMPY_INDEX_PATH = os.path.join(VECTORSTORE_PATH, 'numpy')
+COLLECTION_NAME = "local-rag"
+VECTOR_BACKENDS = ('chroma', 'numpy')
+
+vectorstore = None
+backend_options = None  # (backend, dtype), see get_backend_options()
+index_lock = threading.RLock()
+
+# Function to load the embedding model once
+def get_embed_model():
+    global embed_model
+    with index_lock:
+        if embed_model is None:
+            from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
+            embed_model = FastEmbedEmbeddings(model_name=EMBED_MODEL_NAME)
+        return embed_model
+
+# Hash a sequence of strings into a stable hex key
+def content_hash(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+# Hash a file's bytes without parsing it
+def file_hash(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Hash the text of a loaded source
+def docs_hash(docs):
+    return content_hash(*(doc.page_content for doc in docs))
+
+# Backend and matrix dtype from the config, read once
+def get_backend_options():
+    global backend_options
+    if backend_options is None:
+        from config_utils import load_config_with_defaults
+        config = load_config_with_defaults()
+        if config['vector_index_backend'] not in VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector_index_backend {config['vector_index_backend']!r}, expected one of {VECTOR_BACKENDS}")
+        backend_options = (config['vector_index_backend'], config['vector_index_dtype'])
+    return backend_options
+
+def manifest_path():
+    if get_backend_options()[0] == 'numpy':
+        return os.path.join(NUMPY_INDEX_PATH, 'index_manifest.json')
+    return MANIFEST_PATH
+
+def load_manifest():
+    try:
+        with open(manifest_path(), 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_manifest(manifest):
+    path = manifest_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(temp_path, path)
 
 # Function to load documents from the "upload" folder
 def load_local_documents(folder_path):
     docs = []
     for filename in os.listdir(folder_path):
-        file_path = os.path.join(folder_path, filename)
-        if filename.endswith(".pdf"):
-            loader = PyMuPDFLoader(file_path)
-            docs.extend(loader.load())
-        elif filename.endswith(".txt"):
-            loader = TextLoader(file_path)
-            docs.extend(loader.load())
+        docs.extend(parse_file(os.path.join(folder_path, filename)))
     return docs
 
-# Function to download and process documents
-def process_documents(urls, folder_path):
-    docs = []
-    for url in urls:
-        try:
-            docs.append(WebBaseLoader(url).load())
-        except Exception as e:
-            print(f"Error loading {url}: {e}")
-    docs_list = [item for sublist in docs for item in sublist]
-    
-    # Load local documents from the "upload" folder
-    local_docs = load_local_documents(folder_path)
-    docs_list.extend(local_docs)
-    
-    return docs_list
-
 # Function to chunk documents
 def chunk_documents(docs_list):
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
     text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
         chunk_size=512, chunk_overlap=0
     )
     doc_splits = text_splitter.split_documents(docs_list)
     return doc_splits
 
-# Function to load documents into vectorstore
-def load_to_vectorstore(doc_splits):
-    try:
-        vectorstore = Chroma.from_documents(documents=doc_splits,
-                                            embedding=embed_model,
-                                            collection_name="local-rag")
+# Function to open the persistent vectorstore of the configured backend
+def get_vectorstore():
+    global vectorstore
+    with index_lock:
+        if vectorstore is None:
+            backend, dtype = get_backend_options()
+            if backend == 'numpy':
+                from numpy_index import NumpyVectorStore
+                vectorstore = NumpyVectorStore(NUMPY_INDEX_PATH, get_embed_model(), dtype=dtype)
+            else:
+                from langchain_community.vectorstores import Chroma
+                vectorstore = Chroma(collection_name=COLLECTION_NAME,
+                                     embedding_function=get_embed_model(),
+                                     persist_directory=VECTORSTORE_PATH)
         return vectorstore
+
+# Replace the chunks of one source, embedding only chunks that are not in the store yet
+def upsert_source(source, source_hash, docs):
+    store = get_vectorstore()
+    chunks = {}
+    for split in chunk_documents(docs):
+        split.metadata['source'] = source
+        split.metadata['tokens'] = count_tokens(split.page_content)  # Used by the prompt builder's token budget
+        chunks.setdefault(content_hash(source, split.page_content), split)
+
+    with index_lock:
+        existing = set(store.get(where={"source": source}, include=[])['ids'])
+        stale = [chunk_id for chunk_id in existing if chunk_id not in chunks]
+        new_ids = [chunk_id for chunk_id in chunks if chunk_id not in existing]
+        if stale:
+            store.delete(ids=stale)
+        if new_ids:
+            store.add_documents([chunks[chunk_id] for chunk_id in new_ids], ids=new_ids)
+        manifest = load_manifest()
+        manifest[source] = source_hash
+        save_manifest(manifest)
+    return len(new_ids), len(stale)
+
+# Remove every chunk of a source from the store
+def remove_source(source):
+    store = get_vectorstore()
+    with index_lock:
+        ids = store.get(where={"source": source}, include=[])['ids']
+        if ids:
+            store.delete(ids=ids)
+        manifest = load_manifest()
+        manifest.pop(source, None)
+        save_manifest(manifest)
+    return len(ids)
+
+# Fetch a URL and index it if its content changed since it was last indexed
+def index_url(url):
+    try:
+        docs = fetch_url(url)
+    except Exception as e:
+        print(f"Error loading {url}: {e}")
+        return None
+    source_hash = docs_hash(docs)
+    if load_manifest().get(url) == source_hash:
+        return 0, 0
+    return upsert_source(url, source_hash, docs)
+
+# Index a PDF or text file if its bytes changed since it was last indexed
+def index_file(file_path, source=None):
+    source = source or file_path
+    source_hash = file_hash(file_path)
+    if load_manifest().get(source) == source_hash:
+        return 0, 0
+    try:
+        docs = parse_file(file_path)
     except Exception as e:
-        print(f"Error loading documents into vectorstore: {e}")
+        print(f"Error loading {file_path}: {e}")
         return None
+    return upsert_source(source, source_hash, docs)
+
+# Bring the store up to date with the given URLs and upload folder; only changed sources are re-embedded.
+# Sources are fetched and parsed concurrently, and each one is chunked and embedded as soon as it arrives.
+def index_sources(urls, folder_path):
+    stats = {'added': 0, 'removed': 0, 'skipped': 0, 'failed': 0}
+    manifest = load_manifest()
+    local_files = [os.path.join(folder_path, filename) for filename in sorted(os.listdir(folder_path))
+                   if filename.endswith((".pdf", ".txt"))]
+
+    for result in ingest(urls, local_files, file_hash, docs_hash,
+                         is_unchanged=lambda source, source_hash: manifest.get(source) == source_hash):
+        if result.error:
+            print(f"Error loading {result.source}: {result.error}")
+            stats['failed'] += 1
+        elif result.docs is None:
+            stats['skipped'] += 1
+        else:
+            added, removed = upsert_source(result.source, result.source_hash, result.docs)
+            stats['added'] += added
+            stats['removed'] += removed
+
+    # Drop files that were deleted from the upload folder since the last run
+    for source in list(manifest):
+        if os.path.dirname(source) == folder_path and source not in local_files:
+            stats['removed'] += remove_source(source)
+
+    print(f"Index updated: {stats['added']} chunks embedded, {stats['removed']} removed, "
+          f"{stats['skipped']} sources unchanged, {stats['failed']} failed.")
+    return stats
 
 # Function to instantiate the retriever
 def get_retriever(vectorstore):
@@ -64,18 +212,14 @@ def get_retriever(vectorstore):
         print(f"Error creating retriever: {e}")
         return None
 
-# Main function to handle embedding process
+# Main function to handle embedding process. The retriever searches the persistent store, so chunks added later by
+# index_url or index_file are found without rebuilding it; an empty store just returns no chunks.
 def setup_embedding(urls, folder_path):
-    docs_list = process_documents(urls, folder_path)
-    if not docs_list:
-        print("No documents were loaded.")
-        return None
-    doc_splits = chunk_documents(docs_list)
-    vectorstore = load_to_vectorstore(doc_splits)
-    if not vectorstore:
-        print("Vectorstore creation failed.")
-        return None
-    retriever = get_retriever(vectorstore)
+    index_sources(urls, folder_path)
+    store = get_vectorstore()
+    if not store.get(limit=1, include=[])['ids']:
+        print("No documents were loaded yet.")
+    retriever = get_retriever(store)
     if not retriever:
         print("Retriever creation failed.")
     return retriever
@@ -1,18 +1,32 @@
 import os
 import json
-from groq import Groq
+import threading
+import time
 from dotenv import load_dotenv
 import pyperclip
-from embedding_utils import setup_embedding
+import api_clients
+import tracing
+from response_cache import get_response_cache, make_key
+from prompt_builder import build_prompt, on_data_change
+from data_store import get_data_store, subscribe, update_json
 
 load_dotenv()
 
 # Global variable for selected model
 selected_model = "llama3-8b-8192"
 
-client = Groq(
-    api_key=os.environ.get("GROQ_API_KEY")
-)
+# The Groq client and the retriever are created on first use (or by a startup initializer), not at import time
+client = None
+retriever = None
+retriever_built = False
+retriever_lock = threading.Lock()
+
+# Function to get the shared Groq client (pooled, keep-alive; see api_clients.py)
+def get_client():
+    global client
+    if client is None:
+        client = api_clients.get_client('groq')
+    return client
 
 # Function to set the model
 def set_model(model_name):
@@ -32,12 +46,6 @@ def save_json(file_path, data):
     with open(file_path, 'w') as file:
         json.dump(data, file, indent=2)
 
-# Update JSON data with a key-value pair
-def update_json(file_path, key, value):
-    data = load_json(file_path)
-    data[key] = value
-    save_json(file_path, data)
-
 # Load resume content from resume.json (read-only)
 def load_resume_json(file_path):
     with open(file_path, 'r') as file:
@@ -45,14 +53,16 @@ def load_resume_json(file_path):
 
 resume_json = load_resume_json(os.path.join('src', 'resume.json'))
 
-# JSON file paths
+# JSON file paths; data.json is kept by the DataStore (see data_store.py), update_json goes through it
 data_path = os.path.join('src', 'data.json')
 
-# Clear data.json at the start of the code
-save_json(data_path, {})
+# Keep the prompt builder's token counts in step with the data, counting new entries as they are set. The store
+# itself (and its journal) is only opened when it is first used.
+subscribe(on_data_change)
 
-# Load JSON data
-data = load_json(data_path)
+# Clear data.json; called once when the app starts
+def reset_data():
+    get_data_store().clear()
 
 # URLs for documents
 urls = [
@@ -64,53 +74,134 @@ urls = [
 # Path to the folder containing PDFs and text files
 folder_path = os.path.join('src', 'upload')
 
-# Setup embedding and retriever
-retriever = setup_embedding(urls, folder_path)
-if not retriever:
-    print("Failed to setup embedding and retriever.")
-    exit(1)
-
-def get_groq_response(query):
-    # Check if the query contains 'update <KEYWORD>'
+# Setup embedding and retriever once; concurrent callers wait for the first build
+def get_retriever():
+    global retriever, retriever_built
+    with retriever_lock:
+        if not retriever_built:
+            from embedding_utils import setup_embedding
+            retriever = setup_embedding(urls, folder_path)
+            retriever_built = True
+            if not retriever:
+                print("Failed to setup embedding and retriever.")
+        return retriever
+
+# Handle 'update <KEYWORD>' queries; returns the reply, or None if the query is not an update
+def handle_update_command(query):
     if 'update' in query.lower():
         keyword = query.lower().split('update')[1].strip()
         clipboard_content = pyperclip.paste()
         update_json(data_path, keyword, clipboard_content)
         return f"Updated {keyword} in data.json with the content from the clipboard."
+    return None
+
+# Retrieve the document chunks relevant to a query
+def retrieve(query):
+    with tracing.span('retrieve') as span:
+        retriever = get_retriever()
+        docs = retriever.invoke(query) if retriever else []
+        span['chunks'] = len(docs)
+    return docs
+
+# Cache key for a query: changes whenever the model, the retrieved chunks or data.json change
+def response_cache_key(query, docs):
+    from embedding_utils import content_hash  # Chunk IDs in the index are content_hash(source, text)
+    chunk_ids = [content_hash(doc.metadata.get('source', ''), doc.page_content) for doc in docs]
+    return make_key(query, selected_model, chunk_ids, get_data_store().digest())
+
+# Build the chat messages for a query from the relevant data.json entries and retrieved context, within the
+# model's token budget
+def build_messages(query, config, docs=None):
+    # The data.json entries, from memory
+    json_data = get_data_store().snapshot()
+    
+    # Retrieve relevant documents
+    docs = retrieve(query) if docs is None else docs
     
-    # Load JSON data
-    json_data = load_json(data_path)
+    with tracing.span('build_prompt'):
+        messages, _ = build_prompt(query, json_data, docs, selected_model, config)
+    return messages
+
+# docs are the retrieved chunks when the caller already has them
+def get_groq_response(query, config, docs=None):
+    # Check if the query contains 'update <KEYWORD>'
+    update_reply = handle_update_command(query)
+    if update_reply is not None:
+        return update_reply
     
-    # Retrieve documents
-    docs = retriever.invoke(query)
-    context = "\n\n".join(doc.page_content for doc in docs)
+    docs = retrieve(query) if docs is None else docs
+    cache = get_response_cache()
+    key = response_cache_key(query, docs) if cache else None
+    cached = cache.get(key) if cache else None
+    if cached is not None:
+        print(f"Cached response ({cache.hits} hits, {cache.misses} misses).") if config['print_to_terminal'] else ''
+        return cached
     
-    chat_completion = client.chat.completions.create(
-        messages=[
-            {
-                "role": "system",
-                "content": "You are an AI assistant that helps the user with any tasks. YOU will answer any question as If I was answering it myself. Make sure that none of your response have any buffer text and shouldn't sound AI generated. Answer directly and to the point, as if you were the user. Here is the user's data " + json.dumps(json_data) + "Here is the context: " + context,
-            },
-            {
-                "role": "user",
-                "content": query,
-            }
-        ],
+    messages = build_messages(query, config, docs)
+    chat_completion = api_clients.call('groq', 'chat', lambda: get_client().chat.completions.create(
+        messages=messages,
         model=selected_model,
         max_tokens=100  # Limit the response to a maximum of 100 tokens
-    )
-    return chat_completion.choices[0].message.content
+    ))
+    response = chat_completion.choices[0].message.content
+    if cache:
+        cache.put(key, response)
+    return response
 
-def send_latest_text_to_groq():
+# Stream the response token by token. Stops reading (and closes the connection) as soon as cancel_flag() is true
+# or the consumer closes the generator. A cached response is yielded in one piece.
+def stream_groq_response(query, config, cancel_flag=lambda: False, docs=None):
+    update_reply = handle_update_command(query)
+    if update_reply is not None:
+        yield update_reply
+        return
+
+    docs = retrieve(query) if docs is None else docs
+    cache = get_response_cache()
+    key = response_cache_key(query, docs) if cache else None
+    cached = cache.get(key) if cache else None
+    if cached is not None:
+        print(f"Cached response ({cache.hits} hits, {cache.misses} misses).") if config['print_to_terminal'] else ''
+        yield cached
+        return
+
+    messages = build_messages(query, config, docs)
+    started = time.perf_counter()
+    # Retries cover opening the stream; the latency recorded is the time to the response headers
+    stream = api_clients.call('groq', 'chat_stream', lambda: get_client().chat.completions.create(
+        messages=messages,
+        model=selected_model,
+        max_tokens=100,  # Limit the response to a maximum of 100 tokens
+        stream=True
+    ))
+    tokens = []
+    try:
+        for chunk in stream:
+            if cancel_flag():
+                return
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            if token:
+                if not tokens:
+                    tracing.record_span('llm_first_token', started, time.perf_counter())
+                tokens.append(token)
+                yield token
+    finally:
+        stream.close()
+    # Only a response that was read to the end is cached
+    if cache:
+        cache.put(key, ''.join(tokens))
+
+def send_latest_text_to_groq(config):
     clipboard_content = pyperclip.paste()
-    response = get_groq_response(clipboard_content)
+    response = get_groq_response(clipboard_content, config)
     print(response)
     return response
 
 # Main function to run the bot
 def main():
+    from config_utils import load_config_with_defaults
     query = "Your query here"
-    response = get_groq_response(query)
+    response = get_groq_response(query, load_config_with_defaults())
     print(response)
 
 # Run the main function
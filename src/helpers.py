@@ -6,15 +6,16 @@ import queue
 import threading
 import time
 import pyperclip
-import pyttsx3
 from pynput import keyboard as pynput_keyboard
-from audioplayer import AudioPlayer
-from transcription import create_local_model, record_and_transcribe
-from groq_integration import get_groq_response, send_latest_text_to_groq, update_json, set_model, setup_embedding
-import gradio as gr
-from pynput.keyboard import Controller
+from config_utils import load_config_with_defaults
+from transcription import record as record_audio, transcribe, record_and_transcribe_streaming
+from groq_integration import get_groq_response, stream_groq_response, retrieve, update_json, set_model
+from jobs import Job, get_scheduler
+from output_engine import get_output_engine
+from speech import get_speech_worker, stop_speaking
+from listener import start_listening, stop_listening
+import tracing
 import keyboard  # Ensure keyboard is imported
-from langchain_community.document_loaders import WebBaseLoader, PyMuPDFLoader, TextLoader
 
 # Global variables for chat history, selected model, and dynamic URLs
 chat_history = []
@@ -34,195 +35,196 @@ class ResultThread(threading.Thread):
     def stop(self):
         self.stop_transcription = True
 
-def load_config_with_defaults():
-    default_config = {
-        'use_api': False,
-        'api_options': {
-            'model': 'whisper',
-            'language': None,
-            'temperature': 0.0,
-            'initial_prompt': None
-        },
-        'local_model_options': {
-            'model': 'small',
-            'device': 'auto',
-            'compute_type': 'auto',
-            'language': None,
-            'temperature': 0.0,
-            'initial_prompt': None,
-            'condition_on_previous_text': True,
-            'vad_filter': False,
-        },
-        'activation_key': 'ctrl+shift+space',
-        'recording_mode': 'voice_activity_detection', # 'voice_activity_detection', 'press_to_toggle', or 'hold_to_record'
-        'sound_device': None,
-        'sample_rate': 16000,
-        'silence_duration': 900,
-        'writing_key_press_delay': 0.008,
-        'noise_on_completion': False,
-        'remove_trailing_period': True,
-        'add_trailing_space': False,
-        'remove_capitalization': False,
-        'print_to_terminal': True,
-        'hide_status_window': False,
-        'speak_responses': False
-    }
-
-    config_path = os.path.join('src', 'config.json')
-    if os.path.isfile(config_path):
-        with open(config_path, 'r') as config_file:
-            user_config = json.load(config_file)
-            for key, value in user_config.items():
-                if key in default_config and value is not None:
-                    default_config[key] = value
-
-    return default_config
-
 def clear_status_queue(status_queue):
+    # Only a plain queue holds old updates; the status bus delivers them as they happen
+    if not isinstance(status_queue, queue.Queue):
+        return
     while not status_queue.empty():
         try:
             status_queue.get_nowait()
         except queue.Empty:
             break
 
-def speak(text):
-    engine = pyttsx3.init()
-    engine.say(text)
-    engine.runAndWait()
-
-def stop_recording(recording_thread):
-    if recording_thread and recording_thread.is_alive():
-        recording_thread.stop()
-        recording_thread.join()
+# Speak a response (a string or a token stream) on the shared speech worker and return what was spoken
+def speak(response, recording_thread=None):
+    cancel_flag = (lambda: recording_thread.stop_transcription) if recording_thread else (lambda: False)
+    tokens = [response] if isinstance(response, str) else response
+    return get_speech_worker().speak_stream(tokens, cancel_flag)
+
+def stop_recording(recording_thread=None):
+    # Cancels every unfinished job: recording stops, and a response still being generated, typed or spoken is dropped
+    stop_listening()
+    stop_speaking()
+    jobs = get_scheduler().cancel_all() if recording_thread is None else [recording_thread]
+    for job in jobs:
+        job.stop()
+    if any(job.is_alive() for job in jobs):
         print("Recording stopped.")
 
-def on_shortcut(config, status_queue, local_model, recording_thread):
+# Replace the words 'clipboard' / 'clip board' in a dictated query with the clipboard's content
+def expand_clipboard(text):
+    if 'clipboard' in text.lower() or 'clip board' in text.lower():
+        clipboard_content = pyperclip.paste()
+        text = text.replace('clipboard', clipboard_content).replace('clip board', clipboard_content)
+    return text
+
+class PrimedStream:
+    """
+    A token stream whose first token has already been read, so the wait for it is spent in the generate stage.
+    """
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.first = next(tokens, None)
+
+    def __iter__(self):
+        if self.first is not None:
+            yield self.first
+        yield from self.tokens
+
+    def close(self):
+        self.tokens.close()
+
+"""
+Steps that answer a query: retrieve the context, generate the response (as a token stream if stream_responses is
+set) and speak or type it. With record=True the query is dictated first.
+"""
+def response_steps(config, status_queue, record=True, speak_response=False):
+    steps = {}
+
+    # Recording is announced when it starts, not when the hotkey queues the job behind another one
+    def record_step(job, _):
+        status_queue.put(('recording', 'Recording...'))
+        if config['streaming_transcription']:
+            return record_and_transcribe_streaming(status_queue, job.cancel_flag, config) or None
+        return record_audio(status_queue, job.cancel_flag, config)
+
+    if record:
+        steps['record'] = record_step
+    if record and not config['streaming_transcription']:
+        steps['transcribe'] = lambda job, audio: transcribe(status_queue, job.cancel_flag, config, audio) or None
+
+    def retrieve_step(job, query):
+        query = expand_clipboard(query) if record else query
+        return query, retrieve(query)
+
+    def generate_step(job, query_and_docs):
+        query, docs = query_and_docs
+        if status_queue is not None:
+            status_queue.put(('answering', 'Answering...'))
+        if config['stream_responses']:
+            return PrimedStream(stream_groq_response(query, config, job.cancel_flag, docs))
+        return get_groq_response(query, config, docs)
+
+    def output_step(job, response):
+        if speak_response:
+            response = speak(response, recording_thread=job)
+        elif isinstance(response, str):
+            typewrite(response, interval=config['writing_key_press_delay'], recording_thread=job)
+        else:
+            response = typewrite_stream(response, interval=config['writing_key_press_delay'], recording_thread=job)
+        if config['noise_on_completion']:
+            from audioplayer import AudioPlayer
+            AudioPlayer(os.path.join('assets', 'beep.wav')).play(block=True)
+        return response
+
+    steps.update(retrieve=retrieve_step, generate=generate_step, output=output_step)
+    return steps
+
+def is_recording(config):
+    return any(job.state == 'record' for job in get_scheduler(config).active_jobs())
+
+def on_shortcut(config, status_queue, recording_thread=None):
+    # In these modes the activation key also ends the recording; record() sees the press itself
+    if config['recording_mode'] in ('press_to_toggle', 'hold_to_record') and is_recording(config):
+        return None
+    stop_speaking()  # Barge-in: a new request interrupts the answer being spoken
     clear_status_queue(status_queue)
+    return get_scheduler(config).submit(Job('dictation', response_steps(config, status_queue)))
 
-    status_queue.put(('recording', 'Recording...'))
-    recording_thread = ResultThread(target=record_and_transcribe, 
-                                    args=(status_queue,),
-                                    kwargs={'config': config,
-                                            'local_model': local_model if local_model and not config['use_api'] else None},)
-    
-    recording_thread.start()
-    recording_thread.join()
-    
-    transcribed_text = recording_thread.result
-
-    if transcribed_text:
-        # Check if the transcribed text contains 'clipboard' or 'clip board'
-        if 'clipboard' in transcribed_text.lower() or 'clip board' in transcribed_text.lower():
-            clipboard_content = pyperclip.paste()
-            transcribed_text = transcribed_text.replace('clipboard', clipboard_content).replace('clip board', clipboard_content)
-        
-        groq_response = get_groq_response(transcribed_text)  # Get response from Groq API
-        typewrite(groq_response, interval=config['writing_key_press_delay'], recording_thread=recording_thread)
-
-    if config['noise_on_completion']:
-        AudioPlayer(os.path.join('assets', 'beep.wav')).play(block=True)
-
-    # Ensure the recording stops and re-enable the shortcut after Groq response
-    keyboard.remove_hotkey(config['activation_key'])
-    keyboard.add_hotkey(config['activation_key'], lambda: on_shortcut(config, status_queue, local_model, recording_thread))
-
-def on_hands_free_shortcut(config, status_queue, local_model, recording_thread):
-    # Clear the status queue
+def on_hands_free_shortcut(config, status_queue, recording_thread=None):
+    stop_speaking()
     clear_status_queue(status_queue)
-    
-    # Start recording and transcribing
-    recording_thread = ResultThread(target=record_and_transcribe, 
-                                        args=(status_queue,),
-                                        kwargs={'config': config,
-                                                'local_model': local_model if local_model and not config['use_api'] else None},)
-    
-    recording_thread.start()
-    recording_thread.join()
-    
-    # Process the transcribed text with the LLM
-    transcribed_text = recording_thread.result
-    if transcribed_text:
-        # Check if the transcribed text contains 'clipboard' or 'clip board'
-        if 'clipboard' in transcribed_text.lower() or 'clip board' in transcribed_text.lower():
-            clipboard_content = pyperclip.paste()
-            transcribed_text = transcribed_text.replace('clipboard', clipboard_content).replace('clip board', clipboard_content)
-        
-        # Get response from Groq API
-        groq_response = get_groq_response(transcribed_text)
-        
-        # Speak the response if desired
-        if config['speak_responses']:
-            speak(groq_response)
-        
-        # Typewrite the response if not speaking
-        else:
-            typewrite(groq_response, interval=config['writing_key_press_delay'], recording_thread=recording_thread)
-    
-    # Resume recording after speaking
-    recording_thread = ResultThread(target=record_and_transcribe, 
-                                        args=(status_queue,),
-                                        kwargs={'config': config,
-                                                'local_model': local_model if local_model and not config['use_api'] else None},)
-    recording_thread.start()
-    
-    # Ensure the recording stops and re-enable the shortcut after Groq response
-    keyboard.remove_hotkey('ctrl+alt+f')
-    keyboard.add_hotkey('ctrl+alt+f', lambda: on_hands_free_shortcut(config, status_queue, local_model, recording_thread))
+
+    # One input stream stays open; every utterance becomes a job that starts at transcription
+    if config['continuous_listening']:
+        steps = response_steps(config, status_queue, speak_response=config['speak_responses'])
+        steps.pop('record')
+        steps['transcribe'] = lambda job, audio: transcribe(status_queue, job.cancel_flag, config, audio) or None
+        submit = lambda audio: get_scheduler(config).submit(Job('hands-free', steps, value=audio))
+        return start_listening(config, submit, status_queue)
+
+    # Keep listening: each answered request queues the next one until a request is cancelled or fails
+    def listen_again(job):
+        if job.state == 'done' and 'output' in job.timings:
+            on_hands_free_shortcut(config, status_queue)
+
+    steps = response_steps(config, status_queue, speak_response=config['speak_responses'])
+    return get_scheduler(config).submit(Job('hands-free', steps, on_finish=listen_again))
 
 def typewrite(text, interval, recording_thread=None):
-    pyinput_keyboard = Controller()  # Define pyinput_keyboard here
-    for letter in text:
-        if recording_thread and recording_thread.stop_transcription:  # Check if the transcription was stopped
-            break
-        pyinput_keyboard.press(letter)
-        pyinput_keyboard.release(letter)
-        time.sleep(interval)
+    cancel_flag = (lambda: recording_thread.stop_transcription) if recording_thread else (lambda: False)
+    with tracing.span('typewrite', chars=len(text)):
+        return get_output_engine().write(text, cancel_flag, interval=interval)
+
+def typewrite_stream(tokens, interval, recording_thread=None):
+    """
+    Write tokens as they arrive, starting with the first one. Stopping the recording thread ends the output and
+    closes the token stream, which aborts the request. Returns the text that was written.
+    """
+    cancel_flag = (lambda: recording_thread.stop_transcription) if recording_thread else (lambda: False)
+    with tracing.span('typewrite_stream'):
+        return get_output_engine().write_stream(tokens, cancel_flag, interval=interval)
 
 def format_keystrokes(key_string):
     return '+'.join(word.capitalize() for word in key_string.split('+'))
 
 def on_groq_shortcut(config):
-    response = send_latest_text_to_groq()
-    typewrite(response, interval=config['writing_key_press_delay'])
+    # Answer the clipboard's content
+    steps = response_steps(config, None, record=False)
+    return get_scheduler(config).submit(Job('clipboard', steps, value=pyperclip.paste()))
 
-def generate_answer(query):
-    return get_groq_response(query)
+def generate_answer(query, config):
+    return get_groq_response(query, config)
 
 def chat_with_bot(query, config):
     global chat_history
-    response = generate_answer(query)
+    with tracing.trace('chat'):
+        response = generate_answer(query, config)
     chat_history.append((query, response))
     return chat_history, f"Model: {selected_model}\nURLs: {', '.join(dynamic_urls)}"
 
 def add_url(url, config):
-    global dynamic_urls, retriever
+    global dynamic_urls
+    from embedding_utils import index_url
+    # Only the new page is fetched and embedded; the persistent index already holds everything else
+    result = index_url(url)
+    if result is None:
+        return f"Error loading URL '{url}'."
     dynamic_urls.append(url)
-    retriever = setup_embedding(dynamic_urls, folder_path)
-    return f"URL '{url}' added successfully."
+    return f"URL '{url}' added successfully ({result[0]} new chunks)."
 
 def upload_pdf(pdf, config):
     if pdf is None:
         return "No PDF file uploaded."
 
     try:
-        # Load the PDF using PyMuPDFLoader directly from the uploaded file object
-        loader = PyMuPDFLoader(pdf)
-        docs = loader.load()
-
-        # Add the loaded documents to the retriever
-        global retriever
-        retriever = setup_embedding(dynamic_urls, folder_path)
-
-        return f"PDF '{pdf.name}' uploaded and processed successfully."
+        from embedding_utils import index_file
+        # Gradio passes the path of the uploaded temp file; index it under its original file name
+        pdf_path = getattr(pdf, 'name', pdf)
+        result = index_file(pdf_path, source=os.path.basename(pdf_path))
+        if result is None:
+            return f"Error uploading PDF: could not read '{os.path.basename(pdf_path)}'."
+
+        return f"PDF '{os.path.basename(pdf_path)}' uploaded and processed successfully ({result[0]} new chunks)."
     except Exception as e:
         return f"Error uploading PDF: {str(e)}"
 
 def set_model_and_retriever(model_name, config):
-    global selected_model, retriever
+    global selected_model
     selected_model = model_name
     set_model(model_name)
-    retriever = setup_embedding(dynamic_urls, folder_path)
-    return f"Model set to {model_name} and retriever updated."
+    # The retriever does not depend on the chat model, so the index is left as it is
+    return f"Model set to {model_name}."
 
 def add_url_or_pdf(url, pdf, config):
     if url:
@@ -2,16 +2,15 @@
 
 import os
 import json
-import keyboard
 import pyperclip
-from pynput.keyboard import Controller
-from helpers import typewrite, get_groq_response, update_json, generate_answer, setup_embedding
+from helpers import typewrite, get_groq_response, update_json, generate_answer
+from hotkey_dispatcher import get_dispatcher
+from jobs import Job, get_scheduler
 
 # Path to save hotkeys
 hotkeys_path = os.path.join('src', 'hotkeys.json')
 
 def setup_dynamic_hotkeys(config):
-    dynamic_hotkeys = load_hotkeys()
     while True:
         hotkey_name = input("Enter the name for the new hotkey (or press Enter to finish): ")
         if not hotkey_name:
@@ -23,68 +22,74 @@ def setup_dynamic_hotkeys(config):
         post_processing = input(f"Enter the post-processing command for '{hotkey_name}' (or press Enter to skip): ")
         action_type = input(f"Do you want to save the output to JSON or print it directly? (Enter 'json' or 'print'): ").strip().lower()
         
-        dynamic_hotkeys[hotkey_name] = {
-            'combination': hotkey_combination,
-            'post_processing': post_processing,
-            'action_type': action_type
-        }
-        
-        keyboard.add_hotkey(hotkey_combination, lambda name=hotkey_name: handle_hotkey_action(name, dynamic_hotkeys, config))
-        print(f"Hotkey '{hotkey_combination}' for '{hotkey_name}' set up successfully.")
-    save_hotkeys(dynamic_hotkeys)
-    return dynamic_hotkeys
+        print(create_hotkey(hotkey_name, hotkey_combination, post_processing, action_type, config))
+    return load_hotkeys()
 
-def handle_hotkey_action(hotkey_name, dynamic_hotkeys, config):
+def handle_hotkey_action(hotkey_name, config):
+    binding = get_dispatcher(config).get(hotkey_name)
+    if binding is None or binding.spec is None:
+        return None  # Removed (or replaced by a built-in binding) after the key press was dispatched
+    spec = binding.spec
     clipboard_content = pyperclip.paste()
-    post_processing_command = dynamic_hotkeys[hotkey_name]['post_processing']
-    action_type = dynamic_hotkeys[hotkey_name]['action_type']
+    post_processing_command = spec['post_processing']
+    action_type = spec['action_type']
     
     if post_processing_command:
         query = f"{post_processing_command} {clipboard_content}"
     else:
         query = clipboard_content
     
-    response = generate_answer(query)
+    def deliver(job, response):
+        if action_type == 'json':
+            update_json(os.path.join('src', 'data.json'), hotkey_name, response)
+            print(f"Saved response to '{hotkey_name}' in data.json")
+        else:
+            typewrite(response, interval=config['writing_key_press_delay'], recording_thread=job)
+        return response
     
-    if action_type == 'json':
-        update_json(os.path.join('src', 'data.json'), hotkey_name, response)
-        print(f"Saved response to '{hotkey_name}' in data.json")
-    else:
-        typewrite(response, interval=config['writing_key_press_delay'])
+    # Answered on the job workers so the keyboard hook returns at once
+    steps = {'generate': lambda job, query: generate_answer(query, config), 'output': deliver}
+    return get_scheduler(config).submit(Job(hotkey_name, steps, value=query))
 
-def create_hotkey(hotkey_name, hotkey_combination, post_processing, action_type, dynamic_hotkeys, config):
-    dynamic_hotkeys[hotkey_name] = {
-        'combination': hotkey_combination,
-        'post_processing': post_processing,
-        'action_type': action_type
-    }
-    keyboard.add_hotkey(hotkey_combination, lambda name=hotkey_name: handle_hotkey_action(name, dynamic_hotkeys, config))
-    save_hotkeys(dynamic_hotkeys)
+# Bind a user-defined hotkey; a second press while its answer is still being generated is ignored
+def bind_hotkey(hotkey_name, spec, config):
+    get_dispatcher(config).bind(hotkey_name, spec['combination'], lambda: handle_hotkey_action(hotkey_name, config),
+                                coalesce=True, spec=spec)
+
+def create_hotkey(hotkey_name, hotkey_combination, post_processing, action_type, config):
+    try:
+        bind_hotkey(hotkey_name, {
+            'combination': hotkey_combination,
+            'post_processing': post_processing,
+            'action_type': action_type
+        }, config)
+    except ValueError as e:
+        return f"Hotkey not created: {e}."
     return f"Hotkey '{hotkey_combination}' for '{hotkey_name}' set up successfully."
 
 def update_hotkey(hotkey_name, new_combination, new_post_processing, new_action_type, config):
-    dynamic_hotkeys = load_hotkeys()
-    if hotkey_name in dynamic_hotkeys:
-        if new_combination:
-            dynamic_hotkeys[hotkey_name]['combination'] = new_combination
-            keyboard.add_hotkey(new_combination, lambda name=hotkey_name: handle_hotkey_action(name, dynamic_hotkeys, config))
-        if new_post_processing:
-            dynamic_hotkeys[hotkey_name]['post_processing'] = new_post_processing
-        if new_action_type:
-            dynamic_hotkeys[hotkey_name]['action_type'] = new_action_type
-        save_hotkeys(dynamic_hotkeys)  # Save the updated hotkeys
-        return f"Hotkey '{hotkey_name}' updated successfully."
-    return f"Hotkey '{hotkey_name}' not found."
+    binding = get_dispatcher(config).get(hotkey_name)
+    if binding is None or binding.spec is None:
+        return f"Hotkey '{hotkey_name}' not found."
+    spec = dict(binding.spec)
+    if new_combination:
+        spec['combination'] = new_combination
+    if new_post_processing:
+        spec['post_processing'] = new_post_processing
+    if new_action_type:
+        spec['action_type'] = new_action_type
+    try:
+        bind_hotkey(hotkey_name, spec, config)  # Replaces the old binding, including its old combination
+    except ValueError as e:
+        return f"Hotkey '{hotkey_name}' not updated: {e}."
+    return f"Hotkey '{hotkey_name}' updated successfully."
 
-def save_hotkeys(hotkeys):
-    with open(hotkeys_path, 'w') as file:
-        json.dump(hotkeys, file, indent=2)
+# Write hotkeys.json now; changes are otherwise saved shortly after they are made
+def save_hotkeys():
+    get_dispatcher().save()
 
 def load_hotkeys():
-    if os.path.exists(hotkeys_path):
-        with open(hotkeys_path, 'r') as file:
-            return json.load(file)
-    return {}
+    return get_dispatcher().specs()
 
 def get_current_hotkeys():
-    return json.dumps(load_hotkeys(), indent=2)
\ No newline at end of file
+    return json.dumps(load_hotkeys(), indent=2)
@@ -0,0 +1,175 @@
+# hotkey_dispatcher.py
+#
+# Owns every hotkey binding, built-in and user-defined, in memory: by name and by key combination, so looking one up
+# or replacing it does not touch the keyboard hook's other bindings or the disk. Rebinding a name removes its old
+# combination from the keyboard hook first; a user-defined binding may not take a built-in one's name or combination.
+# Triggers of a binding that arrive within the debounce window of the previous one (key auto-repeat, a double press)
+# are dropped, and a binding marked coalesce is not run again while the job it started last is unfinished, so
+# repeated key events cannot start duplicate LLM requests. User-defined bindings are written to hotkeys.json a moment
+# after the last change, and at exit.
+
+import atexit
+import os
+import threading
+import time
+
+SAVE_DELAY = 1.0  # Seconds after the last change before hotkeys.json is written
+
+def normalize_combination(combination):
+    # 'Alt+Ctrl+V' and 'ctrl + alt + v' are the same hotkey
+    return '+'.join(sorted(part.strip().lower() for part in combination.split('+') if part.strip()))
+
+class Binding:
+    def __init__(self, name, combination, callback, coalesce=False, spec=None):
+        self.name = name
+        self.combination = combination
+        self.callback = callback
+        self.coalesce = coalesce
+        self.spec = spec  # Settings of a user-defined hotkey, as saved in hotkeys.json; None for built-in ones
+        self.handle = None  # What keyboard.add_hotkey returned, needed to remove it
+        self.last_trigger = 0.0
+        self.last_result = None
+        self.triggers = 0
+        self.dropped = 0
+
+class HotkeyDispatcher:
+    def __init__(self, path=None, debounce_seconds=0.3, print_to_terminal=False):
+        self.path = path
+        self.debounce_seconds = debounce_seconds
+        self.print_to_terminal = print_to_terminal
+        self.bindings = {}  # name -> Binding
+        self.combinations = {}  # normalized combination -> name
+        self.lock = threading.RLock()
+        self.timer = None
+
+    def bind(self, name, combination, callback, coalesce=False, spec=None):
+        """
+        Bind combination to callback() under name, replacing the name's previous binding and whatever else was
+        bound to the same combination. A user-defined binding (one with a spec) may not replace a built-in one by
+        name or by combination; that raises ValueError and leaves the bindings as they were.
+        """
+        import keyboard
+        key = normalize_combination(combination)
+        with self.lock:
+            if spec is not None:
+                for other in (self.bindings.get(name), self.lookup(combination)):
+                    if other is not None and other.spec is None:
+                        raise ValueError(f"'{combination}' for '{name}' conflicts with the built-in hotkey "
+                                         f"'{other.name}' ({other.combination})")
+            self._remove(name)
+            if key in self.combinations:
+                self._remove(self.combinations[key])
+            binding = Binding(name, combination, callback, coalesce, spec)
+            binding.handle = keyboard.add_hotkey(combination, lambda: self.trigger(name))
+            self.bindings[name] = binding
+            self.combinations[key] = name
+            if spec is not None:
+                self._schedule_save()
+        return binding
+
+    def unbind(self, name):
+        with self.lock:
+            binding = self._remove(name)
+            if binding is not None and binding.spec is not None:
+                self._schedule_save()
+        return binding
+
+    def _remove(self, name):
+        # Called with self.lock held
+        binding = self.bindings.pop(name, None)
+        if binding is None:
+            return None
+        self.combinations.pop(normalize_combination(binding.combination), None)
+        if binding.handle is not None:
+            import keyboard
+            try:
+                keyboard.remove_hotkey(binding.handle)
+            except (KeyError, ValueError):
+                pass  # Already gone from the hook
+        return binding
+
+    def get(self, name):
+        return self.bindings.get(name)
+
+    def lookup(self, combination):
+        name = self.combinations.get(normalize_combination(combination))
+        return self.bindings.get(name) if name is not None else None
+
+    def trigger(self, name):
+        """
+        Run a binding's callback unless the trigger is a repeat. Called from the keyboard hook, so callbacks must
+        return quickly (they submit jobs). Returns the callback's result, or None if the trigger was dropped.
+        """
+        now = time.monotonic()
+        with self.lock:
+            binding = self.bindings.get(name)
+            if binding is None:
+                return None
+            binding.triggers += 1
+            repeat = now - binding.last_trigger < self.debounce_seconds
+            busy = binding.coalesce and getattr(binding.last_result, 'is_alive', lambda: False)()
+            if repeat or busy:
+                binding.dropped += 1
+                if self.print_to_terminal:
+                    print(f"Hotkey '{name}' ignored ({'repeated' if repeat else 'still running'}).")
+                return None
+            binding.last_trigger = now
+        result = binding.callback()
+        binding.last_result = result
+        return result
+
+    def specs(self):
+        """
+        The user-defined hotkeys as saved in hotkeys.json, from memory.
+        """
+        with self.lock:
+            return {name: dict(binding.spec) for name, binding in self.bindings.items() if binding.spec is not None}
+
+    def stats(self):
+        with self.lock:
+            return {name: {'triggers': binding.triggers, 'dropped': binding.dropped}
+                    for name, binding in self.bindings.items()}
+
+    def _schedule_save(self):
+        # Called with self.lock held
+        if self.path is None:
+            return
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = threading.Timer(SAVE_DELAY, self.save)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def save(self):
+        from data_store import export_save
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if self.path is not None:
+                export_save(self.path, self.specs())
+
+    def flush(self):
+        # Write hotkeys.json now if a save is pending
+        with self.lock:
+            if self.timer is not None:
+                self.save()
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+"""
+Return the process-wide HotkeyDispatcher, creating it from config on first use (the saved config if none is given).
+"""
+def get_dispatcher(config=None):
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            if config is None:
+                from config_utils import load_config_with_defaults
+                config = load_config_with_defaults()
+            _dispatcher = HotkeyDispatcher(path=os.path.join('src', 'hotkeys.json'),
+                                           debounce_seconds=config['hotkey_debounce_seconds'],
+                                           print_to_terminal=config['print_to_terminal'])
+            atexit.register(_dispatcher.flush)
+        return _dispatcher
@@ -0,0 +1,98 @@
+# ingestion.py
+#
+# Concurrent loading of the documents behind the retriever. URLs are fetched on a bounded thread pool and PDFs are
+# parsed on a process pool; results are yielded as each source finishes, so chunking and embedding of one source
+# overlaps with fetching and parsing of the others. Each source has its own timeout and a failure only affects it.
+
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+URL_WORKERS = 8
+FILE_WORKERS = max((os.cpu_count() or 2) - 1, 1)
+SOURCE_TIMEOUT = 30  # Seconds allowed for fetching or parsing a single source
+# Parse PDFs in worker processes. Spawned workers re-import the entry script, so main.py keeps its setup under a
+# __main__ guard and defers heavy imports
+PARSE_IN_PROCESSES = True
+
+# docs is None when the source was skipped as unchanged; error is set when it failed
+IngestResult = namedtuple('IngestResult', ['source', 'source_hash', 'docs', 'error', 'seconds'])
+
+# Fetch one web page as LangChain documents
+def fetch_url(url, timeout=SOURCE_TIMEOUT):
+    from langchain_community.document_loaders import WebBaseLoader
+    return WebBaseLoader(url, requests_kwargs={'timeout': timeout}).load()
+
+# Parse one PDF or text file as LangChain documents (runs in a worker process for PDFs)
+def parse_file(file_path):
+    from langchain_community.document_loaders import PyMuPDFLoader, TextLoader
+    if file_path.endswith(".pdf"):
+        return PyMuPDFLoader(file_path).load()
+    elif file_path.endswith(".txt"):
+        return TextLoader(file_path).load()
+    return []
+
+"""
+Load every URL and file concurrently and yield an IngestResult per source as soon as it is ready.
+`file_hash(path)` and `url_hash(docs)` compute source hashes; `is_unchanged(source, source_hash)` lets the caller skip
+sources it has already indexed (files are checked before parsing, URLs after fetching).
+"""
+def ingest(urls, file_paths, file_hash, url_hash, is_unchanged=lambda source, source_hash: False,
+           url_workers=URL_WORKERS, file_workers=FILE_WORKERS, timeout=SOURCE_TIMEOUT, use_processes=PARSE_IN_PROCESSES):
+    thread_pool = ThreadPoolExecutor(max_workers=url_workers, thread_name_prefix='ingest')
+    process_pool = None
+    pending = {}  # future -> [source, source_hash, is_url]
+    started = {}  # future -> time it started running; queued sources are not on the clock yet
+    try:
+        for url in urls:
+            pending[thread_pool.submit(fetch_url, url, timeout)] = [url, None, True]
+
+        for file_path in file_paths:
+            source_hash = file_hash(file_path)
+            if is_unchanged(file_path, source_hash):
+                yield IngestResult(file_path, source_hash, None, None, 0.0)
+                continue
+            if file_path.endswith(".pdf") and use_processes:
+                if process_pool is None:
+                    process_pool = ProcessPoolExecutor(max_workers=file_workers)
+                future = process_pool.submit(parse_file, file_path)
+            else:
+                future = thread_pool.submit(parse_file, file_path)
+            pending[future] = [file_path, source_hash, False]
+
+        while pending:
+            now = time.monotonic()
+            for future in pending:
+                if future not in started and (future.running() or future.done()):
+                    started[future] = now
+            deadlines = [started[future] + timeout for future in pending if future in started]
+            poll = min(min(deadlines, default=now + 0.5) - now, 0.5)
+            done, _ = wait(pending, timeout=max(poll, 0), return_when=FIRST_COMPLETED)
+
+            now = time.monotonic()
+            for future in done:
+                source, source_hash, is_url = pending.pop(future)
+                seconds = now - started.pop(future, now)
+                try:
+                    docs = future.result()
+                except Exception as e:
+                    yield IngestResult(source, source_hash, None, f'{type(e).__name__}: {e}', seconds)
+                    continue
+                if is_url:
+                    source_hash = url_hash(docs)
+                    if is_unchanged(source, source_hash):
+                        yield IngestResult(source, source_hash, None, None, seconds)
+                        continue
+                yield IngestResult(source, source_hash, docs, None, seconds)
+
+            # Give up on sources that ran past their timeout; the rest keep going
+            now = time.monotonic()
+            for future in [future for future in pending if future in started and now - started[future] >= timeout]:
+                source, source_hash, _ = pending.pop(future)
+                future.cancel()
+                yield IngestResult(source, source_hash, None, f'timed out after {timeout}s', now - started.pop(future))
+    finally:
+        thread_pool.shutdown(wait=False, cancel_futures=True)
+        if process_pool is not None:
+            process_pool.shutdown(wait=False, cancel_futures=True)
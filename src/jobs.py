@@ -0,0 +1,199 @@
+# jobs.py
+#
+# Runs hotkey requests as jobs, off the keyboard hook thread. A job passes through the stages record, transcribe,
+# retrieve, generate and output, each served by its own worker thread. One job can be recording while the previous
+# one is still typing, and output keeps the order in which jobs were submitted. A job only runs the stages it has
+# steps for; a step receives the job and the previous step's value and returns the value for the next one, or None
+# to end the job early. What happens to a job submitted while another one is unfinished is decided by the policy:
+#   'reject'  - drop the new job
+#   'queue'   - run it after the jobs ahead of it, up to max_jobs unfinished jobs
+#   'preempt' - cancel every unfinished job and run the new one
+# Outcomes go to the status bus: 'error' for a failed job, 'cancel' for a cancelled one, 'idle' once no job is left.
+
+import itertools
+import queue
+import threading
+import time
+import traceback
+
+import tracing
+
+STAGES = ('record', 'transcribe', 'retrieve', 'generate', 'output')
+JOB_POLICIES = ('reject', 'queue', 'preempt')
+
+_job_ids = itertools.count(1)
+
+class Job:
+    """
+    Exposes the same stop()/is_alive()/join()/stop_transcription interface as ResultThread, so code that cancels or
+    waits for a recording thread works with a job too.
+    """
+    def __init__(self, kind, steps, value=None, on_finish=None):
+        self.id = next(_job_ids)
+        self.kind = kind
+        self.steps = steps  # stage -> step(job, value)
+        self.value = value
+        self.on_finish = on_finish
+        self.state = 'queued'  # 'queued', the current stage, or 'done', 'cancelled', 'failed', 'rejected'
+        self.error = None
+        self.timings = {}  # stage -> seconds spent in it
+        self.trace = tracing.Trace(kind)  # Spans of the work done for the job, in every stage
+        self.submitted_at = time.perf_counter()
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+
+    def cancel_flag(self):
+        return self.cancelled.is_set()
+
+    @property
+    def stop_transcription(self):
+        return self.cancelled.is_set()
+
+    @property
+    def result(self):
+        return self.value if self.state == 'done' else None
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def stop(self):
+        self.cancel()
+
+    def is_alive(self):
+        return not self.finished.is_set()
+
+    def join(self, timeout=None):
+        return self.finished.wait(timeout)
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.state}>'
+
+class JobScheduler:
+    def __init__(self, policy='queue', max_jobs=4, print_to_terminal=False, status_bus=None):
+        if policy not in JOB_POLICIES:
+            raise ValueError(f'Unknown job policy {policy!r}, expected one of {JOB_POLICIES}')
+        self.policy = policy
+        self.max_jobs = max_jobs
+        self.print_to_terminal = print_to_terminal
+        self.status_bus = status_bus
+        self.queues = {stage: queue.Queue() for stage in STAGES}
+        self.jobs = []  # Unfinished jobs, oldest first
+        self.lock = threading.Lock()
+        self.workers = []
+
+    def _start_workers(self):
+        # Called with self.lock held
+        if self.workers:
+            return
+        for index, stage in enumerate(STAGES):
+            worker = threading.Thread(target=self._work, args=(index,), name=f'job-{stage}', daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def submit(self, job):
+        """
+        Hand a job to the pipeline according to the policy and return at once. Returns the job, with state
+        'rejected' (and finished) if the policy turned it away.
+        """
+        with self.lock:
+            if self.jobs and (self.policy == 'reject' or (self.policy == 'queue' and len(self.jobs) >= self.max_jobs)):
+                job.state = 'rejected'
+                job.finished.set()
+                print(f'{job!r} rejected, {len(self.jobs)} jobs unfinished.') if self.print_to_terminal else ''
+                return job
+            if self.policy == 'preempt':
+                for running in self.jobs:
+                    running.cancel()
+            self.jobs.append(job)
+            self._start_workers()
+        self.queues[STAGES[0]].put(job)
+        return job
+
+    def cancel_all(self):
+        with self.lock:
+            jobs = list(self.jobs)
+        for job in jobs:
+            job.cancel()
+        return jobs
+
+    def active_jobs(self):
+        with self.lock:
+            return list(self.jobs)
+
+    def _work(self, index):
+        stage = STAGES[index]
+        while True:
+            job = self.queues[stage].get()
+            if job.cancelled.is_set():
+                self._finish(job, 'cancelled')
+                continue
+
+            step = job.steps.get(stage)
+            if step is not None:
+                job.state = stage
+                started = time.perf_counter()
+                try:
+                    with tracing.activate(job.trace), tracing.span(f'stage.{stage}'):
+                        job.value = step(job, job.value)
+                except Exception as e:
+                    traceback.print_exc()
+                    job.error = e
+                    self._finish(job, 'failed')
+                    continue
+                finally:
+                    job.timings[stage] = time.perf_counter() - started
+                if job.cancelled.is_set():
+                    self._finish(job, 'cancelled')
+                    continue
+                if job.value is None:
+                    self._finish(job, 'done')  # Nothing left to do, e.g. nothing was said
+                    continue
+
+            if index + 1 < len(STAGES):
+                self.queues[STAGES[index + 1]].put(job)
+            else:
+                self._finish(job, 'done')
+
+    def _finish(self, job, state):
+        if state != 'done' and hasattr(job.value, 'close'):
+            job.value.close()  # An unread response stream; closing it ends the request
+        job.state = state
+        with self.lock:
+            if job in self.jobs:
+                self.jobs.remove(job)
+            remaining = len(self.jobs)
+        job.finished.set()
+        tracing.finish_trace(job.trace, state)
+        if self.status_bus is not None:
+            if state == 'failed':
+                self.status_bus.put(('error', 'Error'))
+            elif state == 'cancelled':
+                self.status_bus.put(('cancel', ''))
+            elif not remaining:
+                self.status_bus.put(('idle', ''))
+        if self.print_to_terminal:
+            timings = ', '.join(f'{stage} {seconds:.2f}s' for stage, seconds in job.timings.items())
+            print(f'{job!r} after {time.perf_counter() - job.submitted_at:.2f}s ({timings}).')
+        if job.on_finish is not None:
+            try:
+                job.on_finish(job)
+            except Exception:
+                traceback.print_exc()
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+"""
+Return the process-wide JobScheduler, creating it from config on first use (the saved config if none is given).
+"""
+def get_scheduler(config=None):
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            if config is None:
+                from config_utils import load_config_with_defaults
+                config = load_config_with_defaults()
+            from status_bus import get_status_bus
+            _scheduler = JobScheduler(policy=config['job_policy'], max_jobs=config['max_jobs'],
+                                      print_to_terminal=config['print_to_terminal'], status_bus=get_status_bus())
+        return _scheduler
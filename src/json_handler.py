@@ -1,6 +1,9 @@
 import os
 import json
 
+# update_json is still imported from here; data.json updates go through the DataStore
+from data_store import update_json
+
 # Load JSON file
 def load_json(file_path):
     try:
@@ -14,12 +17,6 @@ def save_json(file_path, data):
     with open(file_path, 'w') as file:
         json.dump(data, file, indent=2)
 
-# Update JSON data with a key-value pair
-def update_json(file_path, key, value):
-    data = load_json(file_path)
-    data[key] = value
-    save_json(file_path, data)
-
 # Load resume content from resume.json (read-only)
 def load_resume_json(file_path):
     with open(file_path, 'r') as file:
@@ -0,0 +1,87 @@
+# listener.py
+#
+# Continuous listening for hands-free mode. A ContinuousListener keeps one input stream and one VAD for the whole
+# session. An UtteranceSegmenter (see transcription.py) cuts the frames into utterances at pauses, as it does for
+# record() in voice_activity_detection mode. Each utterance is handed on to be transcribed and answered while
+# listening goes on, so speech that starts during or right after an answer is not lost to reopening the stream. While
+# a response is spoken the microphone is ignored (suppress_while_speaking), or speech interrupts it.
+
+import contextlib
+import threading
+import traceback
+
+import webrtcvad
+
+from speech import is_speaking, stop_speaking
+from transcription import UtteranceSegmenter, capture_frames, frame_is_speech, trim_recording
+
+class ContinuousListener(threading.Thread):
+    def __init__(self, config, on_utterance, status_queue=None):
+        threading.Thread.__init__(self, name='listener', daemon=True)
+        self.config = config
+        self.on_utterance = on_utterance  # Called with the int16 samples of every utterance
+        self.status_queue = status_queue
+        self.stopped = threading.Event()
+        self.utterances = 0
+        self.suppressed_frames = 0
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        config = self.config
+        sample_rate = config['sample_rate']
+        vad = webrtcvad.Vad(3)  # Aggressiveness mode: 3 (highest)
+        segmenter = UtteranceSegmenter(sample_rate, config['pre_roll_duration'], config['silence_duration'],
+                                       config['min_utterance_duration'])
+        print('Listening continuously...') if config['print_to_terminal'] else ''
+        try:
+            with contextlib.closing(capture_frames(self.stopped.is_set, config)) as frames:
+                for frame in frames:
+                    if config['suppress_while_speaking'] and is_speaking():
+                        # The microphone hears the response being spoken; drop it, and any utterance it started
+                        if segmenter.active:
+                            segmenter.reset()
+                        segmenter.pre_roll.clear()
+                        self.suppressed_frames += 1
+                        continue
+                    is_speech = frame_is_speech(vad, frame, sample_rate, config)
+                    if is_speech and not segmenter.active:
+                        stop_speaking()  # Barge-in
+                        if self.status_queue is not None:
+                            self.status_queue.put(('recording', 'Listening...'))
+                    was_active = segmenter.active
+                    utterance = segmenter.push(frame, is_speech)
+                    if utterance is not None:
+                        self.utterances += 1
+                        utterance = trim_recording(utterance, config)
+                        if len(utterance):
+                            self.on_utterance(utterance)
+                    elif was_active and not segmenter.active and self.status_queue is not None:
+                        self.status_queue.put(('idle', ''))  # Too short to be an utterance, e.g. a cough
+        except Exception:
+            traceback.print_exc()
+            if self.status_queue is not None:
+                self.status_queue.put(('error', 'Error'))
+        print('Stopped listening.') if config['print_to_terminal'] else ''
+
+_listener = None
+_listener_lock = threading.Lock()
+
+"""
+Start listening continuously, unless already listening, and return the listener.
+"""
+def start_listening(config, on_utterance, status_queue=None):
+    global _listener
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = ContinuousListener(config, on_utterance, status_queue)
+            _listener.start()
+        return _listener
+
+def stop_listening():
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -1,70 +1,36 @@
 # main.py
 
+import startup  # First, so startup.elapsed() counts from launch
 import os
-import json
 import queue
 import threading
 import time
 import keyboard
 import pyperclip
 from pynput import keyboard as pynput_keyboard
-from audioplayer import AudioPlayer
-from transcription import create_local_model, record_and_transcribe
-from groq_integration import get_groq_response, send_latest_text_to_groq, update_json, set_model, setup_embedding  # Import the new Groq integration
-import gradio as gr
-from pynput.keyboard import Controller
+from model_manager import get_model_manager
+from groq_integration import get_groq_response, send_latest_text_to_groq, update_json, set_model, reset_data, get_retriever  # Import the new Groq integration
+from output_engine import get_output_engine
+from response_cache import get_response_cache
+from jobs import get_scheduler
+from api_clients import prewarm
+from status_bus import get_status_bus
+from speech import get_speech_worker
+import tracing
 from helpers import (
     ResultThread, load_config_with_defaults, clear_status_queue, stop_recording, on_shortcut, on_hands_free_shortcut,
     typewrite, format_keystrokes, on_groq_shortcut, chat_with_bot, add_url, upload_pdf, set_model_and_retriever
 )
 from hotkey import setup_dynamic_hotkeys, update_hotkey, get_current_hotkeys, create_hotkey
+from hotkey_dispatcher import get_dispatcher
 
 # Global variables for chat history, selected model, and dynamic URLs
 chat_history = []
 selected_model = "llama3-8b-8192"
 dynamic_urls = []
 folder_path = os.path.join('src', 'upload')  # Define folder_path globally
-# Clear hotkeys.json on app start
 hotkeys_path = os.path.join('src', 'hotkeys.json')
-with open(hotkeys_path, 'w') as file:
-    json.dump({}, file)
-
-# Main script
-config = load_config_with_defaults()
-
-model_method = 'OpenAI\'s API' if config['use_api'] else 'a local model'
-print(f'Script activated. Whisper is set to run using {model_method}. To change this, modify the "use_api" value in the src\\config.json file.')
-
-# Set up local model if needed
-local_model = None
-if not config['use_api']:
-    print('Creating local model...')
-    local_model = create_local_model(config)
-    print('Local model created.')
-
-print(f'WhisperWriter is set to record using {config["recording_mode"]}. To change this, modify the "recording_mode" value in the src\\config.json file.')
-print(f'The activation key combo is set to {format_keystrokes(config["activation_key"])}.', end='')
-if config['recording_mode'] == 'voice_activity_detection':
-    print(' When it is pressed, recording will start, and will stop when you stop speaking.')
-elif config['recording_mode'] == 'press_to_toggle':
-    print(' When it is pressed, recording will start, and will stop when you press the key combo again.')
-# elif config['recording_mode'] == 'hold_to_record':
-#     print(' When it is pressed, recording will start, and will stop when you release the key combo.')
-print('Press alt+C on the terminal window to quit.')
-
-# Set up status queue and keyboard listener
-status_queue = queue.Queue()
-pyinput_keyboard = Controller()
-recording_thread = None  # Initialize recording_thread
-
-keyboard.add_hotkey(config['activation_key'], lambda: on_shortcut(config, status_queue, local_model, recording_thread))
-keyboard.add_hotkey('ctrl+alt+space', lambda: on_shortcut(config, status_queue, local_model, recording_thread))  # Add new hotkey for Groq integration
-keyboard.add_hotkey('alt+c', lambda: stop_recording(recording_thread))  # Add hotkey to stop recording
-keyboard.add_hotkey('ctrl+alt+v', lambda: on_groq_shortcut(config))  # Add hotkey to paste clipboard content
-keyboard.add_hotkey('ctrl+alt+f', lambda: on_hands_free_shortcut(config, status_queue, local_model, recording_thread))
-keyboard.add_hotkey('ctrl+alt+i', lambda: stop_recording(recording_thread))
-# Set up dynamic hotkeys
-dynamic_hotkeys = setup_dynamic_hotkeys(config)
+status_check_seconds = 30  # How often an idle status page hands control back to Gradio, which ends it once closed
 
 # Function to add URL or PDF
 def add_url_or_pdf(url, pdf, config):
@@ -75,61 +41,155 @@ def add_url_or_pdf(url, pdf, config):
     else:
         return "Please provide a URL or PDF."
 
-# Gradio UI
-with gr.Blocks() as demo:
-    gr.Markdown("# WhisperWriter with Gradio UI")
-    
-    with gr.Tab("Chat with Bot"):
-        model_selector = gr.Dropdown(["llama3-8b-8192", "llama3-70b-8192", "mixtral-8x7b-32768"], label="Select Model", value="llama3-8b-8192")
-        model_selector.change(lambda model_name: set_model_and_retriever(model_name, config), inputs=model_selector, outputs=None)
-        
-        chat_output = gr.Chatbot(label="Chat History")
-        query = gr.Textbox(label="Your Query", placeholder="Type your message here...")
-        chat_button = gr.Button("Chat")
-        
-        chat_button.click(lambda query: chat_with_bot(query, config), inputs=[query], outputs=[chat_output, gr.Textbox(label="Details")])
-    
-    with gr.Tab("Manage Hotkeys"):
-        
-        with gr.Row():
-            with gr.Column():
-                hotkeys_list = gr.Textbox(label="Current Hotkeys", value=get_current_hotkeys(), interactive=False)         
-            with gr.Column():
-                gr.Markdown("### Create/Update Hotkey")
-                hotkey_name = gr.Textbox(label="Hotkey Name")
-                ctrl_button = gr.Checkbox(label="Ctrl")
-                alt_button = gr.Checkbox(label="Alt")
-                shift_button = gr.Checkbox(label="Shift")
-                key_input = gr.Textbox(label="Key")
-                post_processing = gr.Textbox(label="Post-Processing Command")
-                action_type = gr.Radio(["json", "print"], label="Action Type")
-                create_button = gr.Button("Create Hotkey")
-                create_output = gr.Textbox(label="Output")
-                
-                def create_hotkey_ui(hotkey_name, key_input, ctrl, alt, shift, post_processing, action_type):
-                    combination = '+'.join([key for key, selected in zip(['ctrl', 'alt', 'shift'], [ctrl, alt, shift]) if selected])
-                    if key_input:
-                        combination += f"+{key_input}"
-                    result = create_hotkey(hotkey_name, combination, post_processing, action_type, dynamic_hotkeys, config)
-                    updated_hotkeys = get_current_hotkeys()
-                    return result, updated_hotkeys
-                
-                create_button.click(create_hotkey_ui, inputs=[hotkey_name, key_input, ctrl_button, alt_button, shift_button, post_processing, action_type], outputs=[create_output, hotkeys_list])
-            
-
-        
-    with gr.Tab("Add URL or PDF"):
-        url_input = gr.Textbox(label="Enter URL")
-        pdf_input = gr.File(label="Upload PDF", file_types=[".pdf"])
-        add_url_button = gr.Button("Add URL or PDF")
-        add_url_output = gr.Textbox(label="Output")
-        
-        add_url_button.click(lambda url, pdf: add_url_or_pdf(url, pdf, config), inputs=[url_input, pdf_input], outputs=add_url_output)
-
-demo.launch()
-
-try:
-    keyboard.wait()  # Keep the script running to listen for the shortcut
-except KeyboardInterrupt:
-    print('\nExiting the script...')
-    os.system('exit')
+# Stream status updates to a page of the UI while it is open, starting with the current one. Without updates the
+# status is repeated every status_check_seconds: Gradio only notices a closed page when the generator yields, and
+# then closes it, which unsubscribes it from the bus.
+def follow_status():
+    updates = queue.Queue()
+    unsubscribe = get_status_bus().subscribe(lambda status, text: updates.put((status, text)))
+    try:
+        status, text = get_status_bus().latest
+        while True:
+            yield f'{status}: {text}' if text else status
+            try:
+                status, text = updates.get(timeout=status_check_seconds)
+            except queue.Empty:
+                pass
+    finally:
+        unsubscribe()
+
+# Gradio UI, imported and built on a background thread after the hotkeys are live
+def build_ui(config, dynamic_hotkeys):
+    import gradio as gr
+
+    with gr.Blocks() as demo:
+        gr.Markdown("# WhisperWriter with Gradio UI")
+        status_box = gr.Textbox(label="Status", interactive=False)
+        demo.load(follow_status, outputs=status_box, concurrency_limit=None)  # Every open page follows the bus
+
+        with gr.Tab("Chat with Bot"):
+            model_selector = gr.Dropdown(["llama3-8b-8192", "llama3-70b-8192", "mixtral-8x7b-32768"], label="Select Model", value="llama3-8b-8192")
+            model_selector.change(lambda model_name: set_model_and_retriever(model_name, config), inputs=model_selector, outputs=None)
+
+            chat_output = gr.Chatbot(label="Chat History")
+            query = gr.Textbox(label="Your Query", placeholder="Type your message here...")
+            chat_button = gr.Button("Chat")
+
+            chat_button.click(lambda query: chat_with_bot(query, config), inputs=[query], outputs=[chat_output, gr.Textbox(label="Details")])
+
+        with gr.Tab("Manage Hotkeys"):
+
+            with gr.Row():
+                with gr.Column():
+                    hotkeys_list = gr.Textbox(label="Current Hotkeys", value=get_current_hotkeys(), interactive=False)         
+                with gr.Column():
+                    gr.Markdown("### Create/Update Hotkey")
+                    hotkey_name = gr.Textbox(label="Hotkey Name")
+                    ctrl_button = gr.Checkbox(label="Ctrl")
+                    alt_button = gr.Checkbox(label="Alt")
+                    shift_button = gr.Checkbox(label="Shift")
+                    key_input = gr.Textbox(label="Key")
+                    post_processing = gr.Textbox(label="Post-Processing Command")
+                    action_type = gr.Radio(["json", "print"], label="Action Type")
+                    create_button = gr.Button("Create Hotkey")
+                    create_output = gr.Textbox(label="Output")
+
+                    def create_hotkey_ui(hotkey_name, key_input, ctrl, alt, shift, post_processing, action_type):
+                        combination = '+'.join([key for key, selected in zip(['ctrl', 'alt', 'shift'], [ctrl, alt, shift]) if selected])
+                        if key_input:
+                            combination += f"+{key_input}"
+                        result = create_hotkey(hotkey_name, combination, post_processing, action_type, config)
+                        updated_hotkeys = get_current_hotkeys()
+                        return result, updated_hotkeys
+
+                    create_button.click(create_hotkey_ui, inputs=[hotkey_name, key_input, ctrl_button, alt_button, shift_button, post_processing, action_type], outputs=[create_output, hotkeys_list])
+
+
+
+        with gr.Tab("Add URL or PDF"):
+            url_input = gr.Textbox(label="Enter URL")
+            pdf_input = gr.File(label="Upload PDF", file_types=[".pdf"])
+            add_url_button = gr.Button("Add URL or PDF")
+            add_url_output = gr.Textbox(label="Output")
+
+            add_url_button.click(lambda url, pdf: add_url_or_pdf(url, pdf, config), inputs=[url_input, pdf_input], outputs=add_url_output)
+
+        with gr.Tab("Performance"):
+            # Latency percentiles per span over recent requests, and the spans of the latest requests
+            percentiles = gr.Dataframe(headers=["Span", "Count", "p50 (ms)", "p95 (ms)", "p99 (ms)"], label="Latency")
+            traces = gr.JSON(label="Recent Requests")
+            refresh_button = gr.Button("Refresh")
+
+            refresh_button.click(lambda: (tracing.percentile_table(), tracing.recent_traces()), outputs=[percentiles, traces])
+    return demo
+
+def launch_ui(config, dynamic_hotkeys):
+    demo = build_ui(config, dynamic_hotkeys)
+    demo.launch(prevent_thread_lock=True)
+    return demo
+
+def main():
+    reset_data()
+
+    # Main script
+    config = load_config_with_defaults()
+    get_dispatcher(config).save()  # Clear hotkeys.json on app start
+
+    model_method = 'OpenAI\'s API' if config['use_api'] else 'a local model'
+    print(f'Script activated. Whisper is set to run using {model_method}. To change this, modify the "use_api" value in the src\\config.json file.')
+
+    print(f'WhisperWriter is set to record using {config["recording_mode"]}. To change this, modify the "recording_mode" value in the src\\config.json file.')
+    print(f'The activation key combo is set to {format_keystrokes(config["activation_key"])}.', end='')
+    if config['recording_mode'] == 'voice_activity_detection':
+        print(' When it is pressed, recording will start, and will stop when you stop speaking.')
+    elif config['recording_mode'] == 'press_to_toggle':
+        print(' When it is pressed, recording will start, and will stop when you press the key combo again.')
+    # elif config['recording_mode'] == 'hold_to_record':
+    #     print(' When it is pressed, recording will start, and will stop when you release the key combo.')
+    print('Press alt+C on the terminal window to quit.')
+
+    # Status updates are published on the bus; the status window, the Gradio UI and the traces subscribe to it
+    status_queue = get_status_bus()
+    get_output_engine(config)  # Shared keyboard controller and output mode for every response
+    get_response_cache(config)
+    get_scheduler(config)  # Hotkey handlers only queue jobs; the scheduler's workers do the recording and answering
+    tracing.configure(config)  # Trace log and metrics endpoint, see tracing.py
+    status_queue.subscribe(tracing.on_status)
+    if not config['hide_status_window']:
+        from status_window import StatusWindow
+        StatusWindow(status_queue, on_close=lambda: get_scheduler(config).cancel_all()).start()
+    recording_thread = None  # Initialize recording_thread
+
+    # Every hotkey goes through the dispatcher, which drops repeated triggers (see hotkey_dispatcher.py)
+    dispatcher = get_dispatcher(config)
+    dispatcher.bind('activation', config['activation_key'], lambda: on_shortcut(config, status_queue, recording_thread))
+    dispatcher.bind('groq dictation', 'ctrl+alt+space', lambda: on_shortcut(config, status_queue, recording_thread))  # Add new hotkey for Groq integration
+    dispatcher.bind('stop', 'alt+c', lambda: stop_recording(recording_thread))  # Add hotkey to stop recording
+    dispatcher.bind('clipboard', 'ctrl+alt+v', lambda: on_groq_shortcut(config), coalesce=True)  # Add hotkey to paste clipboard content
+    dispatcher.bind('hands-free', 'ctrl+alt+f', lambda: on_hands_free_shortcut(config, status_queue, recording_thread), coalesce=True)
+    dispatcher.bind('stop hands-free', 'ctrl+alt+i', lambda: stop_recording(recording_thread))
+    print(f'Hotkeys ready {startup.mark("hotkeys"):.2f}s after launch.')
+
+    # Everything slow happens in the background; readiness is printed and posted to the status queue
+    if not config['use_api']:
+        startup.start('whisper model', lambda: get_model_manager(config).get(config), status_queue, config['print_to_terminal'])
+    startup.start('document index', get_retriever, status_queue, config['print_to_terminal'])
+    # Open the API connections now so the first request does not pay for the TLS handshake
+    startup.start('groq client', lambda: prewarm('groq', config), status_queue, config['print_to_terminal'])
+    if config['use_api']:
+        startup.start('openai client', lambda: prewarm('openai', config), status_queue, config['print_to_terminal'])
+    if config['speak_responses']:
+        startup.start('speech engine', lambda: get_speech_worker(config).ready.wait(), status_queue, config['print_to_terminal'])
+
+    # Set up dynamic hotkeys
+    dynamic_hotkeys = setup_dynamic_hotkeys(config)
+    startup.start('gradio ui', lambda: launch_ui(config, dynamic_hotkeys), status_queue, config['print_to_terminal'])
+
+    try:
+        keyboard.wait()  # Keep the script running to listen for the shortcut
+    except KeyboardInterrupt:
+        print('\nExiting the script...')
+        os.system('exit')
+
+if __name__ == '__main__':
+    main()
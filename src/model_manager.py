@@ -0,0 +1,205 @@
+# model_manager.py
+
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+# Approximate resident size (MB) of each model at float16; used to keep loaded variants under the memory budget
+MODEL_SIZES_MB = {
+    'tiny': 75, 'tiny.en': 75,
+    'base': 145, 'base.en': 145,
+    'small': 485, 'small.en': 485,
+    'medium': 1530, 'medium.en': 1530,
+    'large-v1': 3090, 'large-v2': 3090, 'large-v3': 3090, 'large': 3090,
+}
+COMPUTE_TYPE_SCALE = {'float32': 2.0, 'int8': 0.5, 'int8_float16': 0.5, 'int8_float32': 0.5, 'int8_bfloat16': 0.5}
+
+"""
+Create a local model using the faster_whisper library. num_workers > 1 makes a long-form variant that runs that many
+transcribe() calls at once.
+"""
+def create_local_model(config, num_workers=1):
+    # Imported here so that starting the app does not pay for them; ctranslate2 (which faster_whisper runs on)
+    # answers the CUDA question without importing torch
+    import ctranslate2
+    from faster_whisper import WhisperModel
+
+    model_options = config['local_model_options']
+    cpu_threads = model_options.get('cpu_threads', 0)
+    if num_workers > 1 and not cpu_threads:
+        # One worker per long-form chunk transcribed at once, with the cores split between the workers
+        cpu_threads = max((os.cpu_count() or 1) // num_workers, 1)
+    if ctranslate2.get_cuda_device_count() > 0 and model_options['device'] != 'cpu':
+        try:
+            model = WhisperModel(model_options['model'],
+                                 device=model_options['device'],
+                                 compute_type=model_options['compute_type'],
+                                 num_workers=num_workers)
+        except Exception as e:
+            print(f'Error initializing WhisperModel with CUDA: {e}') if config['print_to_terminal'] else ''
+            print('Falling back to CPU.') if config['print_to_terminal'] else ''
+            model = WhisperModel(model_options['model'],
+                                 device='cpu',
+                                 compute_type=model_options['compute_type'],
+                                 cpu_threads=cpu_threads,
+                                 num_workers=num_workers)
+    else:
+        print('CUDA not available, using CPU.') if config['print_to_terminal'] else ''
+        model = WhisperModel(model_options['model'],
+                             device='cpu',
+                             compute_type=model_options['compute_type'],
+                             cpu_threads=cpu_threads,
+                             num_workers=num_workers)
+
+    return model
+
+"""
+Estimate the memory (MB) a model variant needs, falling back to the size of 'small' for unknown names.
+"""
+def estimate_model_mb(model_name, compute_type):
+    return MODEL_SIZES_MB.get(model_name, MODEL_SIZES_MB['small']) * COMPUTE_TYPE_SCALE.get(compute_type, 1.0)
+
+def describe_key(key):
+    model_name, compute_type, workers = key
+    return f'{model_name} ({compute_type}, {workers} workers)' if workers > 1 else f'{model_name} ({compute_type})'
+
+class ModelManager:
+    """
+    Owns every local WhisperModel. Variants are keyed by (model, compute_type, workers) and kept in an LRU that is
+    trimmed to memory_budget_mb; a variant unused for idle_unload_seconds is unloaded. Requests use the single-worker
+    variant, long-form transcription one with a worker per chunk transcribed at once. A variant is loaded by the first
+    get() for it (the app starts one on a background thread at startup) and warmed up with a short silent clip in the
+    configured language, so the first real request does not pay for lazy init.
+    """
+    def __init__(self, config, factory=create_local_model):
+        self.config = config
+        self.factory = factory
+        self.memory_budget_mb = config['model_memory_budget_mb']
+        self.idle_unload_seconds = config['model_idle_unload_seconds']
+        self.warmup = config['model_warmup']
+        self.models = OrderedDict()  # key -> model, least recently used first
+        self.last_used = {}
+        self.loading = {}  # key -> threading.Event set once the load finishes
+        self.lock = threading.Lock()
+        self.reaper = None
+
+    def key_for(self, config=None, workers=1):
+        model_options = (config or self.config)['local_model_options']
+        return (model_options['model'], model_options['compute_type'], workers)
+
+    def get(self, config=None, workers=1):
+        """
+        Return the model for config with workers workers, waiting for an in-flight background load or loading it on
+        this thread.
+        """
+        config = config or self.config
+        key = self.key_for(config, workers)
+        while True:
+            with self.lock:
+                if key in self.models:
+                    self.models.move_to_end(key)
+                    self.last_used[key] = time.monotonic()
+                    return self.models[key]
+                event = self.loading.get(key)
+                if event is None:
+                    event = self.loading[key] = threading.Event()
+                    break
+            # Another thread is loading this variant; wait for it and look again
+            event.wait()
+
+        try:
+            model = self._load(config, key)
+        finally:
+            with self.lock:
+                del self.loading[key]
+            event.set()
+        return model
+
+    def _load(self, config, key):
+        print(f'Loading model {describe_key(key)}...') if config['print_to_terminal'] else ''
+        started = time.perf_counter()
+        model = self.factory(config, key[2])
+        if self.warmup:
+            self._warm_up(model, config)
+        print(f'Model {key[0]} ready in {time.perf_counter() - started:.1f}s.') if config['print_to_terminal'] else ''
+
+        with self.lock:
+            self.models[key] = model
+            self.last_used[key] = time.monotonic()
+            self._evict_over_budget(keep=key)
+            self._start_reaper()
+        return model
+
+    def _warm_up(self, model, config):
+        silence = np.zeros(16000 // 2, dtype=np.float32)  # 0.5s at 16kHz
+        try:
+            # The configured language, so warm-up takes the same path as requests (None detects the language)
+            segments, _ = model.transcribe(audio=silence, language=config['local_model_options']['language'])
+            list(segments)
+        except Exception as e:
+            print(f'Model warm-up failed: {e}') if config['print_to_terminal'] else ''
+
+    def _evict_over_budget(self, keep):
+        # Called with self.lock held
+        while len(self.models) > 1 and self.loaded_mb() > self.memory_budget_mb:
+            victim = next(key for key in self.models if key != keep)
+            self._unload_locked(victim)
+
+    def _unload_locked(self, key):
+        self.models.pop(key, None)
+        self.last_used.pop(key, None)
+        print(f'Unloaded model {describe_key(key)}.') if self.config['print_to_terminal'] else ''
+
+    def unload(self, key):
+        with self.lock:
+            self._unload_locked(key)
+        gc.collect()
+
+    def unload_idle(self):
+        """
+        Unload every variant that has not been used for idle_unload_seconds.
+        """
+        now = time.monotonic()
+        with self.lock:
+            idle = [key for key, used in self.last_used.items() if now - used >= self.idle_unload_seconds]
+            for key in idle:
+                self._unload_locked(key)
+        if idle:
+            gc.collect()
+        return idle
+
+    def loaded_mb(self):
+        return sum(estimate_model_mb(model_name, compute_type) for model_name, compute_type, _ in self.models)
+
+    def _start_reaper(self):
+        # Called with self.lock held
+        if not self.idle_unload_seconds or self.reaper is not None:
+            return
+        self.reaper = threading.Thread(target=self._reap, daemon=True)
+        self.reaper.start()
+
+    def _reap(self):
+        interval = max(min(self.idle_unload_seconds / 4, 30), 0.05)
+        while True:
+            time.sleep(interval)
+            self.unload_idle()
+            with self.lock:
+                if not self.models:
+                    self.reaper = None
+                    return
+
+_model_manager = None
+_model_manager_lock = threading.Lock()
+
+"""
+Return the process-wide ModelManager, creating it from config on first use.
+"""
+def get_model_manager(config):
+    global _model_manager
+    with _model_manager_lock:
+        if _model_manager is None:
+            _model_manager = ModelManager(config)
+        return _model_manager
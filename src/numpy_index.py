@@ -0,0 +1,235 @@
+# numpy_index.py
+#
+# A small in-process vector store for corpora of a few thousand chunks. Chunk embeddings are normalized and kept in
+# one contiguous float32 (or float16) matrix saved as a .npy file and memory-mapped on open, so a query is one
+# matrix-vector product and a top-k partition. New chunks are appended: the matrix file has spare rows (doubled when
+# they run out) and the chunk texts are a JSON-lines file, so adding a page costs about its own size. Only replacing
+# or deleting chunks rewrites the files. It answers the subset of the Chroma API that embedding_utils uses (get,
+# add_documents, delete, as_retriever), so either store can sit behind get_retriever().
+
+import json
+import os
+import threading
+import numpy as np
+
+VECTORS_FILE = 'vectors.npy'
+CHUNKS_FILE = 'chunks.jsonl'
+LEGACY_CHUNKS_FILE = 'chunks.json'  # One JSON list, as indexes were written before chunks were appended
+MIN_CAPACITY = 1024  # Rows the matrix file holds at least once it is grown
+BLOCK_ROWS = 8192  # Rows upcast at a time when searching a float16 matrix
+
+def normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+"""
+Indices and scores of the k largest entries of each row of scores, best first.
+"""
+def top_k(scores, k):
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        empty = np.empty(scores.shape[:-1] + (0,))
+        return empty.astype(np.int64), empty
+    indices = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    top_scores = np.take_along_axis(scores, indices, axis=-1)
+    order = np.argsort(-top_scores, axis=-1)
+    return np.take_along_axis(indices, order, axis=-1), np.take_along_axis(top_scores, order, axis=-1)
+
+class NumpyVectorStore:
+    """
+    Chunks live in `directory`: vectors.npy holds the normalized embeddings (one row per chunk, followed by unused
+    rows) and chunks.jsonl the id, text and metadata of each row, one per line. Rows only count once their line is
+    written, so an append cut short by a crash is ignored. Replacing or deleting chunks rewrites both files
+    atomically and re-maps the matrix.
+    """
+    def __init__(self, directory, embedding_function, dtype='float32'):
+        self.directory = directory
+        self.embedding_function = embedding_function
+        self.dtype = np.dtype(dtype)
+        self.lock = threading.RLock()
+        self.matrix = None  # The memory-mapped matrix file, spare rows included
+        self.vectors = None  # Its (rows, dim) part in use, or None while empty
+        self.chunks = []  # [{'id', 'text', 'metadata'}] in row order
+        self.row_of = {}  # id -> row
+        self._migrate()
+        self._open()
+
+    def _open(self):
+        self.chunks, self.matrix, self.vectors = [], None, None
+        torn = False
+        try:
+            with open(os.path.join(self.directory, CHUNKS_FILE), 'r') as file:
+                for line in file:
+                    try:
+                        self.chunks.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        torn = True  # The last line of an append that did not finish
+                        break
+            if self.chunks:
+                self.matrix = np.load(os.path.join(self.directory, VECTORS_FILE), mmap_mode='r+')
+        except FileNotFoundError:
+            self.chunks = []
+        if self.matrix is not None and len(self.matrix) < len(self.chunks):
+            print(f'Vector index in {self.directory} is inconsistent; starting empty.')
+            self.chunks, self.matrix = [], None
+        self.vectors = self.matrix[:len(self.chunks)] if self.matrix is not None else None
+        self.row_of = {chunk['id']: row for row, chunk in enumerate(self.chunks)}
+        if torn:
+            self._write(self.vectors if self.vectors is not None else np.empty((0, 0)), self.chunks)
+
+    def _migrate(self):
+        legacy_path = os.path.join(self.directory, LEGACY_CHUNKS_FILE)
+        if not os.path.exists(legacy_path) or os.path.exists(os.path.join(self.directory, CHUNKS_FILE)):
+            return
+        try:
+            with open(legacy_path, 'r') as file:
+                chunks = json.load(file)
+            vectors = np.load(os.path.join(self.directory, VECTORS_FILE)) if chunks else np.empty((0, 0))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self._write(vectors, chunks)
+        os.remove(legacy_path)
+
+    def _write(self, vectors, chunks):
+        os.makedirs(self.directory, exist_ok=True)
+        vectors_path = os.path.join(self.directory, VECTORS_FILE)
+        chunks_path = os.path.join(self.directory, CHUNKS_FILE)
+        # np.save appends .npy to names without it, so the temporary name keeps the extension
+        np.save(vectors_path + '.tmp.npy', np.ascontiguousarray(vectors, dtype=self.dtype))
+        with open(chunks_path + '.tmp', 'w') as file:
+            file.writelines(json.dumps(chunk) + '\n' for chunk in chunks)
+        self.matrix = self.vectors = None  # Drop the old mapping before replacing the file under it
+        os.replace(vectors_path + '.tmp.npy', vectors_path)
+        os.replace(chunks_path + '.tmp', chunks_path)
+        self._open()
+
+    def _grow(self, min_rows, dim):
+        # Called with self.lock held. Copies the matrix into a file with at least twice the rows, so appending n rows
+        # costs O(n) amortized.
+        os.makedirs(self.directory, exist_ok=True)
+        vectors_path = os.path.join(self.directory, VECTORS_FILE)
+        rows = len(self.chunks)
+        capacity = max(min_rows, 2 * len(self.matrix) if self.matrix is not None else 0, MIN_CAPACITY)
+        grown = np.lib.format.open_memmap(vectors_path + '.tmp.npy', mode='w+', dtype=self.dtype, shape=(capacity, dim))
+        if rows:
+            grown[:rows] = self.matrix[:rows]
+        grown.flush()
+        del grown
+        self.matrix = self.vectors = None
+        os.replace(vectors_path + '.tmp.npy', vectors_path)
+        self.matrix = np.load(vectors_path, mmap_mode='r+')
+
+    def _append(self, vectors, chunks):
+        # Called with self.lock held. The rows are written into spare rows of the matrix first and only count once
+        # their chunks are appended to chunks.jsonl.
+        rows = len(self.chunks)
+        if self.matrix is None or rows + len(vectors) > len(self.matrix):
+            self._grow(rows + len(vectors), vectors.shape[1])
+        self.matrix[rows:rows + len(vectors)] = vectors
+        self.matrix.flush()
+        with open(os.path.join(self.directory, CHUNKS_FILE), 'a') as file:
+            file.writelines(json.dumps(chunk) + '\n' for chunk in chunks)
+            file.flush()
+            os.fsync(file.fileno())
+        for row, chunk in enumerate(chunks, start=rows):
+            self.row_of[chunk['id']] = row
+        self.chunks.extend(chunks)
+        self.vectors = self.matrix[:len(self.chunks)]
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def get(self, ids=None, where=None, limit=None, include=('documents', 'metadatas')):
+        """
+        Chroma-style lookup by ids and/or an equality filter on metadata. Returns {'ids', 'documents', 'metadatas'}.
+        """
+        with self.lock:
+            rows = [self.row_of[chunk_id] for chunk_id in ids if chunk_id in self.row_of] if ids is not None \
+                else range(len(self.chunks))
+            if where:
+                rows = [row for row in rows
+                        if all(self.chunks[row]['metadata'].get(field) == value for field, value in where.items())]
+            rows = list(rows)[:limit] if limit is not None else list(rows)
+            result = {'ids': [self.chunks[row]['id'] for row in rows]}
+            if 'documents' in include:
+                result['documents'] = [self.chunks[row]['text'] for row in rows]
+            if 'metadatas' in include:
+                result['metadatas'] = [self.chunks[row]['metadata'] for row in rows]
+            return result
+
+    def add_documents(self, documents, ids):
+        embeddings = self.embedding_function.embed_documents([doc.page_content for doc in documents])
+        self.add_embeddings(embeddings, [doc.page_content for doc in documents],
+                            [dict(doc.metadata) for doc in documents], ids)
+        return ids
+
+    def add_embeddings(self, embeddings, texts, metadatas, ids):
+        new_vectors = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        new_chunks = [{'id': chunk_id, 'text': text, 'metadata': metadata}
+                      for chunk_id, text, metadata in zip(ids, texts, metadatas)]
+        with self.lock:
+            replaced = set(ids)
+            if not replaced.intersection(self.row_of):
+                self._append(new_vectors, new_chunks)
+                return
+            # Replacing an existing id drops its old row first, which moves the rows after it: rewrite the index
+            keep = [row for row, chunk in enumerate(self.chunks) if chunk['id'] not in replaced]
+            chunks = [self.chunks[row] for row in keep] + new_chunks
+            vectors = np.concatenate([self.vectors[keep], new_vectors]) if self.vectors is not None else new_vectors
+            self._write(vectors, chunks)
+
+    def delete(self, ids):
+        with self.lock:
+            drop = set(ids)
+            keep = [row for row, chunk in enumerate(self.chunks) if chunk['id'] not in drop]
+            if len(keep) == len(self.chunks):
+                return
+            self._write(self.vectors[keep] if keep else np.empty((0, 0)), [self.chunks[row] for row in keep])
+
+    def search_vectors(self, query_vectors, k):
+        """
+        Cosine top-k for a (dim,) query or a (queries, dim) batch. Returns (rows, scores) with the same leading shape.
+        """
+        with self.lock:
+            vectors = self.vectors
+            if vectors is None:
+                shape = np.shape(query_vectors)[:-1] + (0,)
+                return np.empty(shape, dtype=np.int64), np.empty(shape)
+            queries = normalize_rows(np.asarray(query_vectors, dtype=np.float32))
+            if vectors.dtype == np.float32:
+                scores = queries @ vectors.T if queries.ndim == 2 else vectors @ queries
+            else:
+                # NumPy has no fast float16 matrix product; upcast a block of rows at a time instead
+                scores = np.empty(queries.shape[:-1] + (len(vectors),), dtype=np.float32)
+                for start in range(0, len(vectors), BLOCK_ROWS):
+                    block = np.asarray(vectors[start:start + BLOCK_ROWS], dtype=np.float32)
+                    scores[..., start:start + len(block)] = queries @ block.T if queries.ndim == 2 else block @ queries
+            return top_k(scores, k)
+
+    def similarity_search(self, query, k=4):
+        return self.similarity_search_batch([query], k)[0]
+
+    def similarity_search_batch(self, queries, k=4):
+        from langchain_core.documents import Document
+        query_vectors = np.asarray([self.embedding_function.embed_query(query) for query in queries], dtype=np.float32)
+        with self.lock:  # Held across scoring and lookup, so a concurrent write cannot shift the rows in between
+            rows, _ = self.search_vectors(query_vectors, k)
+            return [[Document(page_content=self.chunks[row]['text'], metadata=self.chunks[row]['metadata'])
+                     for row in query_rows] for query_rows in rows]
+
+    def as_retriever(self, search_kwargs=None):
+        return NumpyRetriever(self, **(search_kwargs or {}))
+
+class NumpyRetriever:
+    """
+    The part of the LangChain retriever interface the app calls: invoke(query) and batch(queries).
+    """
+    def __init__(self, store, k=4):
+        self.store = store
+        self.k = k
+
+    def invoke(self, query):
+        return self.store.similarity_search(query, self.k)
+
+    def batch(self, queries):
+        return self.store.similarity_search_batch(queries, self.k)
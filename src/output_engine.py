@@ -0,0 +1,194 @@
+# output_engine.py
+#
+# Puts generated text into the focused application. Three modes:
+#   'paste'     - copy the text to the clipboard, send the paste shortcut and restore the previous clipboard
+#   'chunked'   - type several characters per burst, pausing between bursts only as long as the target app needs
+#   'character' - one key press per character with a fixed delay (the original behaviour, kept as a fallback)
+# One keyboard controller is shared by every write, and each write records its throughput.
+
+import sys
+import threading
+import time
+
+OUTPUT_MODES = ('paste', 'chunked', 'character')
+
+class OutputStats:
+    def __init__(self, mode):
+        self.mode = mode
+        self.chars = 0
+        self.seconds = 0.0
+        self.cancelled = False
+
+    @property
+    def chars_per_second(self):
+        return self.chars / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return f'{self.chars} chars in {self.seconds * 1000:.1f} ms via {self.mode} ({self.chars_per_second:.0f} chars/sec)'
+
+class OutputEngine:
+    """
+    Writes text with the configured mode. `interval` is the per-character delay of 'character' mode and the upper
+    bound on the pause between bursts in 'chunked' mode; the pause grows when a burst takes longer to deliver than
+    expected (the target app is falling behind) and shrinks back when it keeps up.
+    """
+    def __init__(self, mode='paste', interval=0.008, chunk_size=24, paste_restore_delay=0.15, controller=None,
+                 print_to_terminal=False):
+        if mode not in OUTPUT_MODES:
+            raise ValueError(f'Unknown output mode {mode!r}, expected one of {OUTPUT_MODES}')
+        self.mode = mode
+        self.interval = interval
+        self.chunk_size = max(chunk_size, 1)
+        self.paste_restore_delay = paste_restore_delay
+        self.print_to_terminal = print_to_terminal
+        self._controller = controller
+        self.pause = 0.0  # Current pause between bursts in 'chunked' mode
+        self.last_stats = None
+        self.lock = threading.Lock()  # Two writes at once would interleave their keystrokes
+
+    @property
+    def controller(self):
+        if self._controller is None:
+            from pynput.keyboard import Controller
+            self._controller = Controller()
+        return self._controller
+
+    def write(self, text, cancel_flag=lambda: False, mode=None, interval=None):
+        """
+        Write text and return its OutputStats. Stops early (between characters or bursts) once cancel_flag() is true.
+        """
+        stats = self._write(text, cancel_flag, mode or self.mode, self.interval if interval is None else interval)
+        self.last_stats = stats
+        print(f'Output: {stats}') if self.print_to_terminal else ''
+        return stats
+
+    def _write(self, text, cancel_flag, mode, interval):
+        stats = OutputStats(mode)
+        started = time.perf_counter()
+        with self.lock:
+            if mode == 'paste':
+                self._paste(text, stats, cancel_flag, interval)
+            elif mode == 'chunked':
+                self._type_chunked(text, stats, cancel_flag, interval)
+            else:
+                self._type_characters(text, stats, cancel_flag, interval)
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+    def write_stream(self, tokens, cancel_flag=lambda: False, interval=None):
+        """
+        Write tokens as they arrive and return the text written. Paste mode collects tokens into bursts of at least
+        chunk_size characters (or the end of a sentence) so the clipboard is not swapped for every token. The token
+        stream is closed when writing ends, early or not.
+        """
+        interval = self.interval if interval is None else interval
+        written = []
+        pending = ''
+        total = OutputStats(self.mode)
+        started = time.perf_counter()
+        try:
+            for token in tokens:
+                if cancel_flag():
+                    total.cancelled = True
+                    break
+                pending += token
+                if self.mode == 'paste' and len(pending) < self.chunk_size and not pending.rstrip().endswith(('.', '!', '?', '\n')):
+                    continue
+                stats = self._write(pending, cancel_flag, self.mode, interval)
+                written.append(pending[:stats.chars])
+                total.chars += stats.chars
+                pending = ''
+                if stats.cancelled:
+                    total.cancelled = True
+                    break
+            if pending and not total.cancelled:
+                stats = self._write(pending, cancel_flag, self.mode, interval)
+                written.append(pending[:stats.chars])
+                total.chars += stats.chars
+        finally:
+            if hasattr(tokens, 'close'):
+                tokens.close()
+        total.seconds = time.perf_counter() - started  # Includes the time spent waiting for tokens
+        self.last_stats = total
+        print(f'Output: {total}') if self.print_to_terminal else ''
+        return ''.join(written)
+
+    def _type_characters(self, text, stats, cancel_flag, interval):
+        controller = self.controller
+        for letter in text:
+            if cancel_flag():
+                stats.cancelled = True
+                return
+            controller.press(letter)
+            controller.release(letter)
+            stats.chars += 1
+            time.sleep(interval)
+
+    def _type_chunked(self, text, stats, cancel_flag, interval):
+        controller = self.controller
+        for start in range(0, len(text), self.chunk_size):
+            if cancel_flag():
+                stats.cancelled = True
+                return
+            chunk = text[start:start + self.chunk_size]
+            burst_started = time.perf_counter()
+            for letter in chunk:
+                controller.press(letter)
+                controller.release(letter)
+            stats.chars += len(chunk)
+            # A burst that took longer than a fixed per-key cost means events are queueing up; back off, else speed up
+            slow = time.perf_counter() - burst_started > len(chunk) * 0.001
+            self.pause = min(max(self.pause * 2, interval / 4), interval) if slow else self.pause / 2
+            if self.pause > 0.0005:
+                time.sleep(self.pause)
+
+    def _paste(self, text, stats, cancel_flag, interval):
+        import pyperclip
+        from pynput.keyboard import Key
+
+        if cancel_flag():
+            stats.cancelled = True
+            return
+        try:
+            previous = pyperclip.paste()
+        except Exception:
+            previous = None
+        try:
+            pyperclip.copy(text)
+        except Exception as e:
+            # No clipboard available (e.g. no xclip on Linux); typing still works
+            print(f'Clipboard unavailable ({e}), typing instead.') if self.print_to_terminal else ''
+            self._type_chunked(text, stats, cancel_flag, interval)
+            return
+
+        modifier = Key.cmd if sys.platform == 'darwin' else Key.ctrl
+        controller = self.controller
+        controller.press(modifier)
+        controller.press('v')
+        controller.release('v')
+        controller.release(modifier)
+        stats.chars += len(text)
+
+        if previous is not None:
+            # The target app reads the clipboard asynchronously; give it time before putting the old content back
+            time.sleep(self.paste_restore_delay)
+            pyperclip.copy(previous)
+
+_output_engine = None
+_output_engine_lock = threading.Lock()
+
+"""
+Return the process-wide OutputEngine, creating it from config on first use (the saved config if none is given).
+"""
+def get_output_engine(config=None):
+    global _output_engine
+    with _output_engine_lock:
+        if _output_engine is None:
+            if config is None:
+                from config_utils import load_config_with_defaults
+                config = load_config_with_defaults()
+            _output_engine = OutputEngine(mode=config['output_mode'],
+                                          interval=config['writing_key_press_delay'],
+                                          chunk_size=config['output_chunk_size'],
+                                          print_to_terminal=config['print_to_terminal'])
+        return _output_engine
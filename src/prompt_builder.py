@@ -0,0 +1,143 @@
+# prompt_builder.py
+#
+# Builds the chat prompt within a per-model token budget. Token counts are computed once per item: for document
+# chunks when they are indexed (stored in the chunk metadata) and for data.json entries when they are updated. Only
+# the data.json entries that share words with the query are included, most relevant first, and retrieved chunks are
+# added in rank order while they fit.
+
+import json
+import re
+import threading
+
+SYSTEM_PROMPT = "You are an AI assistant that helps the user with any tasks. YOU will answer any question as If I was answering it myself. Make sure that none of your response have any buffer text and shouldn't sound AI generated. Answer directly and to the point, as if you were the user."
+
+# Words that say nothing about which data.json entry a query is about
+STOPWORDS = {'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does', 'for', 'from', 'how', 'i', 'in',
+             'is', 'it', 'me', 'my', 'of', 'on', 'or', 'please', 'the', 'this', 'to', 'was', 'what', 'when', 'where',
+             'which', 'who', 'why', 'will', 'with', 'you', 'your'}
+
+encoding = None
+encoding_lock = threading.Lock()
+encoding_error = None  # Why tiktoken could not be loaded, until build_prompt has reported it
+entry_token_counts = {}  # data.json key -> (serialized entry, tokens), kept current by on_data_change
+
+def get_encoding():
+    global encoding, encoding_error
+    with encoding_lock:
+        if encoding is None:
+            try:
+                import tiktoken
+                encoding = tiktoken.get_encoding('cl100k_base')
+            except Exception as e:
+                # The Groq models use their own tokenizers anyway; about four characters per token is close enough
+                encoding_error = type(e).__name__
+                encoding = False
+        return encoding
+
+def count_tokens(text):
+    enc = get_encoding()
+    return len(enc.encode(text, disallowed_special=())) if enc else (len(text) + 3) // 4
+
+def serialize_entry(key, value):
+    return json.dumps({key: value})[1:-1]
+
+# Token count of one data.json entry as it appears in the prompt; cached per key until the entry changes
+def entry_tokens(key, value):
+    text = serialize_entry(key, value)
+    cached = entry_token_counts.get(key)
+    if cached is None or cached[0] != text:
+        cached = entry_token_counts[key] = (text, count_tokens(text))
+    return cached[1]
+
+# DataStore subscriber: count a new entry's tokens when it is set rather than when the next prompt is built, and
+# forget the counts of removed entries
+def on_data_change(op, key, value):
+    if op == 'set':
+        entry_tokens(key, value)
+    elif op == 'delete':
+        entry_token_counts.pop(key, None)
+    elif op == 'clear':
+        entry_token_counts.clear()
+
+# Token count of a retrieved chunk; stored in its metadata at indexing time, counted here for older chunks
+def chunk_tokens(doc):
+    tokens = doc.metadata.get('tokens')
+    return tokens if tokens is not None else count_tokens(doc.page_content)
+
+def words(text):
+    return {word for word in re.findall(r'[a-z0-9]+', text.lower()) if word not in STOPWORDS}
+
+def split_key(key):
+    # 'phone_number' and 'phoneNumber' both match a query about a "phone number"
+    return words(re.sub(r'([a-z])([A-Z])', r'\1 \2', key).replace('_', ' ').replace('-', ' '))
+
+"""
+Pick the data.json entries that share words with the query, best match first (a word in the key counts more than
+one in the value, later entries win ties), while they fit in budget. Returns (entries, tokens).
+"""
+def select_data(query, json_data, budget):
+    query_words = words(query)
+    scored = []
+    for position, (key, value) in enumerate(json_data.items()):
+        value_text = value if isinstance(value, str) else json.dumps(value)
+        score = 3 * len(query_words & split_key(key)) + len(query_words & words(value_text))
+        if score:
+            scored.append((score, position, key, value))
+
+    selected, used = {}, 0
+    for _, _, key, value in sorted(scored, reverse=True):
+        tokens = entry_tokens(key, value)
+        if used + tokens <= budget:
+            selected[key] = value
+            used += tokens
+    return selected, used
+
+"""
+Keep retrieved chunks in rank order while they fit in budget. Returns (docs, tokens).
+"""
+def select_chunks(docs, budget):
+    selected, used = [], 0
+    for doc in docs:
+        tokens = chunk_tokens(doc)
+        if used + tokens <= budget:
+            selected.append(doc)
+            used += tokens
+    return selected, used
+
+# Prompt token budget for a model from the config ('default' for models without their own entry)
+def token_budget(model, config):
+    budgets = config['prompt_token_budgets']
+    return budgets.get(model, budgets.get('default', 2000))
+
+"""
+Build the chat messages for query within the model's token budget. Half of what is left after the instructions
+and the query goes to data.json entries and the rest (plus whatever the entries did not use) to document chunks.
+Returns (messages, prompt token count).
+"""
+def build_prompt(query, json_data, docs, model, config, budget=None):
+    global encoding_error
+    budget = token_budget(model, config) if budget is None else budget
+    fixed = count_tokens(SYSTEM_PROMPT) + count_tokens(query) + 16  # 16 for the glue text and message framing
+    if encoding_error is not None:
+        print(f'tiktoken unavailable ({encoding_error}); estimating token counts.') if config['print_to_terminal'] else ''
+        encoding_error = None
+    remaining = max(budget - fixed, 0)
+
+    data, data_tokens = select_data(query, json_data, remaining // 2)
+    chunks, chunk_tokens_used = select_chunks(docs, remaining - data_tokens)
+    context = "\n\n".join(doc.page_content for doc in chunks)
+
+    messages = [
+        {
+            "role": "system",
+            "content": SYSTEM_PROMPT + " Here is the user's data " + json.dumps(data) + "Here is the context: " + context,
+        },
+        {
+            "role": "user",
+            "content": query,
+        }
+    ]
+    prompt_tokens = fixed + data_tokens + chunk_tokens_used
+    print(f"Prompt for {model}: ~{prompt_tokens} tokens of {budget} ({len(data)}/{len(json_data)} data entries, "
+          f"{len(chunks)}/{len(docs)} chunks).") if config['print_to_terminal'] else ''
+    return messages, prompt_tokens
@@ -0,0 +1,115 @@
+# response_cache.py
+#
+# Cache of LLM responses for repeated questions. A key covers everything the answer depends on: the normalized
+# query, the model, the IDs of the retrieved chunks and a hash of the user's data (DataStore.digest()). Re-indexing
+# a document changes the IDs of its chunks and editing data.json changes its hash, so entries built on old content
+# are never matched again and age out of the LRU. Entries also expire after ttl_seconds. The cache can be saved to
+# disk to survive restarts.
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_PATH = os.path.join('src', 'response_cache.json')
+
+# Lowercase, collapse whitespace and drop trailing punctuation, so "What's my email?" and "what's my email" match
+def normalize_query(query):
+    return re.sub(r'\s+', ' ', query).strip().lower().rstrip('?!.,; ')
+
+def make_key(query, model, chunk_ids, data_hash):
+    digest = hashlib.sha256()
+    for part in (normalize_query(query), model, *sorted(chunk_ids), data_hash):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+class ResponseCache:
+    """
+    LRU + TTL map from make_key() keys to responses, optionally persisted to `path` after every change.
+    """
+    def __init__(self, max_entries=256, ttl_seconds=86400, path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.entries = OrderedDict()  # key -> (time.time() when stored, response), least recently used first
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        if path:
+            self._load()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl_seconds and time.time() - entry[0] > self.ttl_seconds:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, response):
+        with self.lock:
+            self.entries[key] = (time.time(), response)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self._save()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self._save()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as file:
+                stored = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        now = time.time()
+        for key, stored_at, response in stored:
+            if not self.ttl_seconds or now - stored_at <= self.ttl_seconds:
+                self.entries[key] = (stored_at, response)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _save(self):
+        # Called with self.lock held
+        if not self.path:
+            return
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump([[key, stored_at, response] for key, (stored_at, response) in self.entries.items()], file)
+        os.replace(temp_path, self.path)
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+"""
+Return the process-wide ResponseCache, or None if caching is turned off in the config.
+"""
+def get_response_cache(config=None):
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            if config is None:
+                from config_utils import load_config_with_defaults
+                config = load_config_with_defaults()
+            _response_cache = ResponseCache(max_entries=config['response_cache_size'],
+                                            ttl_seconds=config['response_cache_ttl_seconds'],
+                                            path=CACHE_PATH if config['response_cache_persist'] else None) \
+                if config['response_cache'] else False
+        return _response_cache or None
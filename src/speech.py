@@ -0,0 +1,155 @@
+# speech.py
+#
+# Spoken responses. One long-lived worker thread owns the text-to-speech engine (pyttsx3 engines are created once and
+# used only from the thread that created them) and speaks sentences from a queue. A response is queued sentence by
+# sentence as its tokens arrive, so speech starts with the first sentence instead of after the whole answer. cancel()
+# drops everything queued and stops the sentence being spoken at the next word, for barge-in.
+
+import contextvars
+import queue
+import re
+import threading
+import time
+import traceback
+
+import tracing
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n+')
+
+"""
+Yield the sentences of a text that arrives in pieces (tokens, or a single string in a list) as soon as each is complete.
+"""
+def split_sentences(tokens):
+    buffer = ''
+    for token in tokens:
+        buffer += token
+        parts = SENTENCE_END.split(buffer)
+        for sentence in parts[:-1]:
+            if sentence.strip():
+                yield sentence.strip()
+        buffer = parts[-1]
+    if buffer.strip():
+        yield buffer.strip()
+
+class Pyttsx3Backend:
+    """
+    Speaks through pyttsx3. The 'started-word' callback runs on the speaking thread, which is where the engine may
+    be stopped from.
+    """
+    def __init__(self):
+        import pyttsx3
+        self.engine = pyttsx3.init()
+        self.should_stop = lambda: False
+        self.engine.connect('started-word', self.on_word)
+
+    def on_word(self, name, location, length):
+        if self.should_stop():
+            self.engine.stop()
+
+    def speak(self, text, should_stop):
+        self.should_stop = should_stop
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+class Utterance:
+    def __init__(self, text, generation):
+        self.text = text
+        self.generation = generation
+        self.context = contextvars.copy_context()  # Spoken in the trace of the request that queued it
+        self.started_at = None
+        self.done = threading.Event()
+
+class SpeechWorker(threading.Thread):
+    def __init__(self, backend_factory=Pyttsx3Backend, print_to_terminal=False):
+        threading.Thread.__init__(self, name='speech', daemon=True)
+        self.backend_factory = backend_factory
+        self.print_to_terminal = print_to_terminal
+        self.utterances = queue.Queue()
+        self.generation = 0  # cancel() moves it on; utterances queued under an older one are skipped
+        self.ready = threading.Event()
+        self.backend = None
+        self.current = None  # The utterance being spoken
+
+    def run(self):
+        try:
+            self.backend = self.backend_factory()
+        except Exception:
+            traceback.print_exc()
+            print('Text-to-speech unavailable; responses will not be spoken.')
+        self.ready.set()
+        while True:
+            utterance = self.utterances.get()
+            if self.backend is not None and utterance.generation == self.generation:
+                utterance.started_at = time.perf_counter()
+                self.current = utterance
+                try:
+                    utterance.context.run(self.speak, utterance)
+                except Exception:
+                    traceback.print_exc()
+                self.current = None
+            utterance.done.set()
+
+    def speak(self, utterance):
+        with tracing.span('speak', chars=len(utterance.text)):
+            self.backend.speak(utterance.text, lambda: utterance.generation != self.generation)
+
+    def say(self, text):
+        utterance = Utterance(text, self.generation)
+        self.utterances.put(utterance)
+        return utterance
+
+    def is_speaking(self):
+        return self.current is not None or not self.utterances.empty()
+
+    def cancel(self):
+        self.generation += 1
+        print('Speech cancelled.') if self.print_to_terminal else ''
+
+    def speak_stream(self, tokens, cancel_flag=lambda: False):
+        """
+        Queue each sentence of tokens as soon as it is complete, then wait until the last one has been spoken.
+        cancel_flag() or cancel() ends it early. Returns the text of the sentences that were queued.
+        """
+        generation = self.generation
+        queued = []
+        last = None
+        try:
+            for sentence in split_sentences(tokens):
+                if cancel_flag() or generation != self.generation:
+                    break
+                last = self.say(sentence)
+                queued.append(sentence)
+        finally:
+            if hasattr(tokens, 'close'):
+                tokens.close()  # A barge-in leaves the rest of the response unread
+        # Waiting on the last sentence, with cancel_flag checked in between
+        while last is not None and not last.done.wait(0.05):
+            if cancel_flag():
+                self.cancel()
+                break
+        return ' '.join(queued)
+
+_speech_worker = None
+_speech_worker_lock = threading.Lock()
+
+"""
+Return the process-wide SpeechWorker, starting it (and creating its engine) on first use.
+"""
+def get_speech_worker(config=None):
+    global _speech_worker
+    with _speech_worker_lock:
+        if _speech_worker is None:
+            if config is None:
+                from config_utils import load_config_with_defaults
+                config = load_config_with_defaults()
+            _speech_worker = SpeechWorker(print_to_terminal=config['print_to_terminal'])
+            _speech_worker.start()
+        return _speech_worker
+
+# Barge-in: stop speaking now, without starting the worker if nothing was ever spoken
+def stop_speaking():
+    if _speech_worker is not None:
+        _speech_worker.cancel()
+
+def is_speaking():
+    return _speech_worker is not None and _speech_worker.is_speaking()
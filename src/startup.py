@@ -0,0 +1,83 @@
+# startup.py
+#
+# Background initializers for the slow parts of startup (model load, index build, UI). main.py registers the hotkeys
+# first and then starts each initializer here; readiness is printed and posted to the status queue as tasks finish.
+
+import threading
+import time
+import traceback
+
+started_at = time.perf_counter()
+tasks = {}
+milestones = {}
+lock = threading.Lock()
+
+class InitTask:
+    def __init__(self, name, func):
+        self.name = name
+        self.func = func
+        self.state = 'pending'  # 'pending', 'running', 'ready' or 'failed'
+        self.result = None
+        self.error = None
+        self.seconds = None
+        self.done = threading.Event()
+
+    def run(self, status_queue=None, print_to_terminal=True):
+        self.state = 'running'
+        task_started = time.perf_counter()
+        try:
+            self.result = self.func()
+            self.state = 'ready'
+        except Exception as e:
+            traceback.print_exc()
+            self.error = e
+            self.state = 'failed'
+        self.seconds = time.perf_counter() - task_started
+        self.done.set()
+
+        message = f'{self.name} {self.state} in {self.seconds:.1f}s'
+        print(f'[startup] {message} ({elapsed():.1f}s since launch)') if print_to_terminal else ''
+        if status_queue is not None:
+            status_queue.put(('startup', message))
+
+"""
+Run func on a daemon thread under the given name. Starting a name twice returns the existing task.
+"""
+def start(name, func, status_queue=None, print_to_terminal=True):
+    with lock:
+        if name in tasks:
+            return tasks[name]
+        task = tasks[name] = InitTask(name, func)
+    threading.Thread(target=task.run, args=(status_queue, print_to_terminal), name=f'init-{name}', daemon=True).start()
+    return task
+
+"""
+Block until the named task has finished (or timeout expires) and return its result, or None if it failed.
+"""
+def wait(name, timeout=None):
+    task = tasks.get(name)
+    if task is None or not task.done.wait(timeout):
+        return None
+    return task.result
+
+def is_ready(name):
+    task = tasks.get(name)
+    return task is not None and task.state == 'ready'
+
+def elapsed():
+    return time.perf_counter() - started_at
+
+"""
+Record how long after launch a point in startup was reached, e.g. 'hotkeys'.
+"""
+def mark(milestone):
+    milestones[milestone] = elapsed()
+    return milestones[milestone]
+
+def readiness():
+    return {name: {'state': task.state, 'seconds': task.seconds} for name, task in tasks.items()}
+
+def readiness_text():
+    lines = [f'{name}: {task.state}' + (f' ({task.seconds:.1f}s)' if task.seconds is not None else '')
+             for name, task in tasks.items()]
+    return '\n'.join(lines) or 'No background tasks.'
@@ -0,0 +1,56 @@
+# status_bus.py
+#
+# Publish/subscribe channel for the (status, text) updates of a request: 'recording', 'transcribing', 'partial',
+# 'answering', 'idle', 'error', 'cancel' and 'startup'. Producers call put((status, text)) just as they did on the
+# old status queue, so a queue.Queue still works wherever a bus is expected (the benchmarks pass one). Every
+# subscriber is called at once on the publishing thread, so a subscriber that needs its own thread (Tk, Gradio)
+# hands the update over itself. Nothing polls: with no updates, no thread wakes up.
+
+import threading
+import time
+import traceback
+
+class StatusBus:
+    def __init__(self):
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.latest = ('idle', '')
+        self.published_at = time.perf_counter()
+
+    def subscribe(self, callback):
+        """
+        Call callback(status, text) on every update. Returns a function that unsubscribes it.
+        """
+        with self.lock:
+            self.subscribers.append(callback)
+
+        def unsubscribe():
+            with self.lock:
+                if callback in self.subscribers:
+                    self.subscribers.remove(callback)
+        return unsubscribe
+
+    def publish(self, status, text=''):
+        with self.lock:
+            self.latest = (status, text)
+            self.published_at = time.perf_counter()
+            subscribers = list(self.subscribers)
+        for callback in subscribers:
+            try:
+                callback(status, text)
+            except Exception:
+                traceback.print_exc()  # One broken subscriber must not keep the update from the others
+
+    def put(self, update):
+        # The status queue interface
+        self.publish(*update)
+
+_status_bus = None
+_status_bus_lock = threading.Lock()
+
+def get_status_bus():
+    global _status_bus
+    with _status_bus_lock:
+        if _status_bus is None:
+            _status_bus = StatusBus()
+        return _status_bus
@@ -1,28 +1,43 @@
-import gc
+import collections
 import os
-import queue
 import tkinter as tk
 import threading
 from PIL import Image, ImageTk
 
+HIDDEN_STATUSES = ('idle', 'error', 'cancel')
+
 class StatusWindow(threading.Thread):
-    def __init__(self, status_queue):
-        threading.Thread.__init__(self)
-        self.status_queue = status_queue
+    """
+    The status window, built once and shown or hidden as requests start and end. It subscribes to the status bus;
+    each update is queued for the Tk thread, which a virtual event wakes to show it, so the window does not poll.
+    """
+    def __init__(self, status_bus, on_close=None):
+        threading.Thread.__init__(self, name='status-window', daemon=True)
+        self.status_bus = status_bus
+        self.on_close = on_close  # Called by the close button, e.g. to cancel the running jobs
+        self.pending = collections.deque()
         self.microphone_photo = None
         self.pencil_photo = None
 
-    def schedule_check(self, func):
-        if hasattr(self, 'window'):
-            self.window.after(100, func)
-
     def handle_close_button(self):
-        if hasattr(self, 'recording_thread'):
-            self.recording_thread.stop()
-        self.status_queue.put(('cancel', ''))
+        if self.on_close is not None:
+            self.on_close()
+        self.status_bus.put(('cancel', ''))
+
+    def on_status(self, status, text):
+        # Runs on the publishing thread; Tk may only be touched from its own thread
+        self.pending.append((status, text))
+        try:
+            self.window.event_generate('<<StatusChanged>>', when='tail')
+        except (RuntimeError, tk.TclError):
+            pass  # The interpreter is shutting down
 
     def run(self):
-        self.window = tk.Tk()
+        try:
+            self.window = tk.Tk()
+        except tk.TclError as e:
+            print(f'Status window unavailable: {e}')  # e.g. no display
+            return
         self.window.title('Status')
         self.window.configure(bg='#B0C4DE')
         self.window.attributes('-topmost', 1)
@@ -34,49 +49,50 @@ class StatusWindow(threading.Thread):
         x_coordinate = int((screen_width - 250) / 2)
         y_coordinate = int(screen_height - 100 - 20)  # 20 pixels above the taskbar
         self.window.geometry(f'250x65+{x_coordinate}+{y_coordinate}')
-        
+
         # Add the text
         title_label = tk.Label(self.window, text='WhisperWriter', font=('Indie Flower', 12, 'bold'), bg='#B0C4DE')
         title_label.place(x=125, y=10, anchor='center')
         self.label = tk.Label(self.window, text='', font=('Indie Flower', 14), bg='#B0C4DE')
         self.label.place(x=140, y=40, anchor='center')
 
-        # Load and display the icons
-        self.microphone_image = Image.open(os.path.join('assets', 'microphone.png'))
-        self.microphone_image = self.microphone_image.resize((32, 32), Image.ANTIALIAS)
-        self.microphone_image = ImageTk.PhotoImage(self.microphone_image)
-        self.pencil_image = Image.open(os.path.join('assets', 'pencil.png'))
-        self.pencil_image = self.pencil_image.resize((32, 32), Image.ANTIALIAS)
-        self.pencil_photo = ImageTk.PhotoImage(self.pencil_image)
-
-        # # Keep references to the images
-        # self.microphone_image_ref = self.microphone_image
-        # self.pencil_image_ref = self.pencil_image
-
-        # self.icon_label = tk.Label(self.window, image=self.microphone_photo, bg='#B0C4DE')
-        # self.icon_label.place(x=50, y=40, anchor='center')
+        # Load and display the icons; the PhotoImages are kept on self so Tk does not lose them
+        self.microphone_photo = self.load_icon('microphone.png')
+        self.pencil_photo = self.load_icon('pencil.png')
+        self.icon_label = tk.Label(self.window, image=self.microphone_photo, bg='#B0C4DE')
+        self.icon_label.place(x=50, y=40, anchor='center')
 
         # Close button
-        self.close_button = tk.Button(self.window, text='X', font=('Arial', 12, 'bold'), bg='#B0C4DE', 
+        self.close_button = tk.Button(self.window, text='X', font=('Arial', 12, 'bold'), bg='#B0C4DE',
                                       command=self.handle_close_button, bd=0, highlightthickness=0, relief='flat')
         self.close_button.place(x=235, y=15, anchor='center')
 
-        self.process_queue()
+        self.window.bind('<<StatusChanged>>', self.process_updates)
+        self.window.withdraw()  # Hidden until a request starts
+        self.status_bus.subscribe(self.on_status)
         self.window.mainloop()
 
-    def process_queue(self):
-        try:
-            status, text = self.status_queue.get_nowait()
-            if status in ('idle', 'error', 'cancel'):
-                self.window.quit()
-                self.window.destroy()
-                gc.collect()
-            elif status == 'recording' and hasattr(self, 'window'):
-                self.icon_label.config(image=self.microphone_photo)
-                self.label.config(text=text)
-            elif status == 'transcribing' and hasattr(self, 'window'):
-                self.icon_label.config(image=self.pencil_photo)
-                self.label.config(text=text)
-            self.window.after(100, self.process_queue)
-        except queue.Empty:
-            self.window.after(100, self.process_queue)
\ No newline at end of file
+    def load_icon(self, name):
+        image = Image.open(os.path.join('assets', name)).resize((32, 32), Image.LANCZOS)
+        return ImageTk.PhotoImage(image)
+
+    def process_updates(self, event=None):
+        # Updates that arrived together are applied in one go; only the last one is visible anyway
+        while self.pending:
+            self.show(*self.pending.popleft())
+
+    def show(self, status, text):
+        if status in HIDDEN_STATUSES:
+            self.window.withdraw()
+            return
+        if status == 'recording':
+            self.icon_label.config(image=self.microphone_photo)
+            self.label.config(text=text)
+        elif status in ('transcribing', 'answering'):
+            self.icon_label.config(image=self.pencil_photo)
+            self.label.config(text=text)
+        elif status == 'partial':
+            self.label.config(text=text[-24:])  # Show the tail of the running transcript
+        else:
+            return  # e.g. 'startup', which only the terminal and the UI show
+        self.window.deiconify()
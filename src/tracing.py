@@ -0,0 +1,221 @@
+# tracing.py
+#
+# Lightweight request tracing. Every hotkey job carries a Trace; while one of its steps runs, the trace is the
+# current one (a contextvar), and span() records how long each piece of work inside it took: the job stages, the
+# model or API transcription, retrieval, prompt building, API calls and typing. Every span also feeds a rolling
+# window per span name, from which p50/p95/p99 are computed. Finished traces are kept in memory for the UI, appended
+# to a JSONL file, and the percentiles can be scraped in the Prometheus text format. Status updates published while
+# a trace is current are marked in it, as zero-length 'status.<status>' spans.
+
+import contextvars
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+WINDOW = 1000  # Durations kept per span name for the percentiles
+RECENT_TRACES = 50  # Finished traces kept for the UI
+TRACE_LOG_MAX_BYTES = 5 * 2**20  # The JSONL file is rotated to <name>.1 beyond this
+
+current_trace = contextvars.ContextVar('current_trace', default=None)
+_trace_ids = itertools.count(1)
+
+class Trace:
+    def __init__(self, kind):
+        self.id = next(_trace_ids)
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.wall_started = time.time()
+        self.spans = []  # (name, start offset, duration, attributes)
+        self.state = None
+        self.duration = None
+        self.lock = threading.Lock()
+
+    def add(self, name, start, end, attrs):
+        with self.lock:
+            self.spans.append((name, start - self.started, end - start, attrs))
+
+    def to_dict(self):
+        with self.lock:
+            spans = sorted(self.spans, key=lambda span: span[1])
+        return {
+            'id': self.id, 'kind': self.kind, 'state': self.state,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.wall_started)),
+            'duration_ms': round(self.duration * 1000, 2) if self.duration is not None else None,
+            'spans': [dict({'name': name, 'start_ms': round(start * 1000, 2), 'duration_ms': round(duration * 1000, 2)},
+                           **attrs) for name, start, duration, attrs in spans],
+        }
+
+class Metrics:
+    """
+    Rolling window of durations, plus the all-time count and sum, per span name.
+    """
+    def __init__(self, window=WINDOW):
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+        self.counts = defaultdict(int)
+        self.sums = defaultdict(float)
+        self.lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self.lock:
+            self.samples[name].append(seconds)
+            self.counts[name] += 1
+            self.sums[name] += seconds
+
+    def percentiles(self):
+        """
+        name -> {'count', 'sum', 'p50', 'p95', 'p99'} in seconds, the percentiles over the window.
+        """
+        with self.lock:
+            stats = {}
+            for name, window in self.samples.items():
+                ordered = sorted(window)
+                pick = lambda q: ordered[max(math.ceil(len(ordered) * q) - 1, 0)]  # Nearest rank
+                stats[name] = {'count': self.counts[name], 'sum': self.sums[name],
+                               'p50': pick(0.5), 'p95': pick(0.95), 'p99': pick(0.99)}
+            return stats
+
+metrics = Metrics()
+recent = deque(maxlen=RECENT_TRACES)
+log_path = None
+log_lock = threading.Lock()
+metrics_server = None
+
+"""
+Set up the JSONL export (trace_log, '' for none) and the Prometheus endpoint (metrics_port, 0 for none).
+"""
+def configure(config):
+    global log_path
+    log_path = config['trace_log'] or None
+    if config['metrics_port']:
+        start_metrics_server(config['metrics_port'])
+
+def record_span(name, start, end, **attrs):
+    metrics.observe(name, end - start)
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add(name, start, end, attrs)
+
+@contextmanager
+def span(name, **attrs):
+    """
+    Time the block as a span of the current trace (if any) and in the metrics. Attributes added to the yielded
+    dict, e.g. sizes known only at the end, are stored with the span.
+    """
+    started = time.perf_counter()
+    try:
+        yield attrs
+    finally:
+        record_span(name, started, time.perf_counter(), **attrs)
+
+# Status bus subscriber
+def on_status(status, text):
+    trace = current_trace.get()
+    if trace is not None:
+        now = time.perf_counter()
+        trace.add(f'status.{status}', now, now, {})
+
+@contextmanager
+def activate(trace):
+    # Make trace the current one for the block, on this thread
+    token = current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        current_trace.reset(token)
+
+def finish_trace(trace, state):
+    trace.state = state
+    trace.duration = time.perf_counter() - trace.started
+    metrics.observe(f'trace.{trace.kind}', trace.duration)
+    recent.append(trace)
+    if log_path:
+        write_trace(trace)
+
+@contextmanager
+def trace(kind):
+    """
+    Run the block as a trace of its own, for work that is not a job (e.g. a chat message from the UI).
+    """
+    new_trace = Trace(kind)
+    with activate(new_trace):
+        try:
+            yield new_trace
+        except BaseException:
+            finish_trace(new_trace, 'failed')
+            raise
+    finish_trace(new_trace, 'done')
+
+def write_trace(trace):
+    line = json.dumps(trace.to_dict()) + '\n'
+    with log_lock:
+        try:
+            if os.path.exists(log_path) and os.path.getsize(log_path) > TRACE_LOG_MAX_BYTES:
+                os.replace(log_path, log_path + '.1')
+            with open(log_path, 'a') as file:
+                file.write(line)
+        except OSError as e:
+            print(f'Could not write trace to {log_path}: {e}')
+
+def recent_traces(limit=20):
+    return [trace.to_dict() for trace in list(recent)[-limit:]][::-1]
+
+"""
+Rows of (span, count, p50 ms, p95 ms, p99 ms) for display, slowest p95 first.
+"""
+def percentile_table():
+    rows = [(name, stats['count'], round(stats['p50'] * 1000, 1), round(stats['p95'] * 1000, 1),
+             round(stats['p99'] * 1000, 1)) for name, stats in metrics.percentiles().items()]
+    return sorted(rows, key=lambda row: row[3], reverse=True)
+
+def prometheus_text():
+    lines = ['# HELP whisper_span_seconds Duration of traced spans; trace.<kind> is a whole request.',
+             '# TYPE whisper_span_seconds summary']
+    for name, stats in sorted(metrics.percentiles().items()):
+        for quantile, key in (('0.5', 'p50'), ('0.95', 'p95'), ('0.99', 'p99')):
+            lines.append(f'whisper_span_seconds{{span="{name}",quantile="{quantile}"}} {stats[key]:.6f}')
+        lines.append(f'whisper_span_seconds_sum{{span="{name}"}} {stats["sum"]:.6f}')
+        lines.append(f'whisper_span_seconds_count{{span="{name}"}} {stats["count"]}')
+
+    import api_clients
+    api_stats = api_clients.latency_stats()
+    for counter, help_text in (('requests', 'API requests'), ('errors', 'API requests that failed'),
+                               ('retries', 'API request retries'), ('upload_bytes', 'Bytes uploaded to APIs')):
+        lines.append(f'# HELP whisper_api_{counter}_total {help_text}.')
+        lines.append(f'# TYPE whisper_api_{counter}_total counter')
+        for (backend, operation), stats in sorted(api_stats.items()):
+            lines.append(f'whisper_api_{counter}_total{{backend="{backend}",operation="{operation}"}} {stats[counter]}')
+    return '\n'.join(lines) + '\n'
+
+def start_metrics_server(port):
+    """
+    Serve prometheus_text() at http://127.0.0.1:<port>/metrics on a daemon thread.
+    """
+    global metrics_server
+    if metrics_server is not None:
+        return metrics_server
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = prometheus_text().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    metrics_server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    metrics_server.daemon_threads = True
+    threading.Thread(target=metrics_server.serve_forever, name='metrics', daemon=True).start()
+    return metrics_server
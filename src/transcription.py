@@ -1,149 +1,349 @@
+import collections
+import concurrent.futures
+import contextlib
+import contextvars
+import io
+import queue
+import threading
+import time
 import traceback
 import numpy as np
 import os
-import sounddevice as sd
 import tempfile
 import wave
 import webrtcvad
-from dotenv import load_dotenv
-from faster_whisper import WhisperModel
-from openai import OpenAI
-import keyboard
-import torch
 import keyboard
+from audio_buffer import RingBuffer, SampleAccumulator
+from audio_trim import is_silent, trim_silence, split_at_silences
+from config_utils import UPLOAD_CODECS
+from model_manager import get_model_manager
+import api_clients
+import tracing
+
+WHISPER_SAMPLE_RATE = 16000  # faster_whisper expects 16kHz mono input
+FRAME_DURATION = 30  # 30ms, supported values: 10, 20, 30
+
+"""
+Resample mono int16 or float32 samples to to_rate with PyAV's resampler (libswresample, low-pass filtered, the one
+faster_whisper decodes files with), keeping the sample type.
+"""
+def resample(audio_data, sample_rate, to_rate=WHISPER_SAMPLE_RATE):
+    if sample_rate == to_rate or audio_data.size == 0:
+        return audio_data
+    import av
+    sample_format, dtype = ('flt', np.float32) if np.issubdtype(audio_data.dtype, np.floating) else ('s16', np.int16)
+    resampler = av.AudioResampler(format=sample_format, layout='mono', rate=to_rate)
+    frame = av.AudioFrame.from_ndarray(np.ascontiguousarray(audio_data, dtype=dtype).reshape(1, -1),
+                                       format=sample_format, layout='mono')
+    frame.sample_rate = sample_rate
+    output = resampler.resample(frame) + resampler.resample(None)  # None flushes the filter's delay line
+    return np.concatenate([out.to_ndarray().reshape(-1) for out in output]) if output else audio_data[:0]
 
 """
-Create a local model using the faster_whisper library.
-"""
-def create_local_model(config):
-    if torch.cuda.is_available() and config['local_model_options']['device'] != 'cpu':
-        try:
-            model = WhisperModel(config['local_model_options']['model'],
-                                 device=config['local_model_options']['device'],
-                                 compute_type=config['local_model_options']['compute_type'])
-        except Exception as e:
-            print(f'Error initializing WhisperModel with CUDA: {e}') if config['print_to_terminal'] else ''
-            print('Falling back to CPU.') if config['print_to_terminal'] else ''
-            model = WhisperModel(config['local_model_options']['model'], 
-                                 device='cpu',
-                                 compute_type=config['local_model_options']['compute_type'])
+Convert recorded int16 samples into the float32 [-1, 1] array at 16kHz that faster_whisper expects,
+so the model can skip reading and decoding a WAV file. Float input is taken to be in [-1, 1] already.
+"""
+def to_whisper_input(audio_data, sample_rate):
+    if np.issubdtype(audio_data.dtype, np.floating):
+        audio = audio_data.astype(np.float32, copy=False)
     else:
-        print('CUDA not available, using CPU.') if config['print_to_terminal'] else ''
-        model = WhisperModel(config['local_model_options']['model'], 
-                             device='cpu',
-                             compute_type=config['local_model_options']['compute_type'])
-    
-    return model
+        audio = audio_data.astype(np.float32) / 32768.0
+    return resample(audio, sample_rate)
+
+"""
+Encode recorded int16 samples as an in-memory WAV file that can be uploaded like a file on disk.
+"""
+def to_wav_buffer(audio_data, sample_rate):
+    wav_buffer = io.BytesIO()
+    with wave.open(wav_buffer, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)  # 2 bytes (16 bits) per sample
+        wf.setframerate(sample_rate)
+        wf.writeframes(audio_data.tobytes())
+    wav_buffer.seek(0)
+    wav_buffer.name = 'audio.wav'  # The API infers the format from the file name
+    return wav_buffer
+
+"""
+Resample recorded samples to 16kHz int16 and encode them in memory for upload as codec: 'flac' (lossless, about
+half the size of WAV for speech), 'opus' (lossy, 24 kbit/s in an Ogg file) or 'wav'. Resampling and encoding use
+PyAV, which faster_whisper already depends on.
+"""
+def encode_for_upload(audio_data, sample_rate, codec='flac'):
+    if codec not in UPLOAD_CODECS:
+        raise ValueError(f'Unknown upload codec {codec!r}, expected one of {UPLOAD_CODECS}')
+    if np.issubdtype(audio_data.dtype, np.floating):
+        audio_data = np.clip(audio_data * 32768.0, -32768, 32767).astype(np.int16)
+    audio_data = resample(audio_data, sample_rate)
+    if codec == 'wav':
+        return to_wav_buffer(audio_data, WHISPER_SAMPLE_RATE)
+    import av
+
+    container_format, codec_name, extension = {'flac': ('flac', 'flac', 'flac'),
+                                               'opus': ('ogg', 'libopus', 'ogg')}[codec]
+    buffer = io.BytesIO()
+    with av.open(buffer, 'w', format=container_format) as container:
+        stream = container.add_stream(codec_name, rate=WHISPER_SAMPLE_RATE, layout='mono')
+        if codec == 'opus':
+            stream.bit_rate = 24000  # Plenty for speech
+        frame = av.AudioFrame.from_ndarray(audio_data.reshape(1, -1), format='s16', layout='mono')
+        frame.sample_rate = WHISPER_SAMPLE_RATE
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):  # Flush the encoder
+            container.mux(packet)
+    buffer.seek(0)
+    buffer.name = f'audio.{extension}'  # The API infers the format from the file name
+    return buffer
+
+"""
+Read a 16-bit WAV file written by save_temp_wav back into samples.
+"""
+def load_wav(path):
+    with wave.open(path, 'rb') as wf:
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16), wf.getframerate()
+
+"""
+Write recorded int16 samples to a temporary WAV file and return its path.
+"""
+def save_temp_wav(audio_data, sample_rate):
+    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio_file:
+        temp_audio_file.write(to_wav_buffer(audio_data, sample_rate).getvalue())
+    return temp_audio_file.name
 
 """
-Transcribe an audio file using a local model.
+Transcribe audio using a local model. The audio is either a sample array at sample_rate or the path of an audio file.
+initial_prompt overrides the configured prompt, e.g. with the text of the previous segment.
 """
-def transcribe_local(config, temp_audio_file, local_model=None):
+def transcribe_local(config, audio, local_model=None, initial_prompt=None):
     if not local_model:
-        print('Creating local model...') if config['print_to_terminal'] else ''
-        local_model = create_local_model(config)
-        print('Local model created.') if config['print_to_terminal'] else ''
-    model_options = config['local_model_options']
-    response = local_model.transcribe(audio=temp_audio_file,
-                                        language=model_options['language'],
-                                        initial_prompt=model_options['initial_prompt'],
-                                        condition_on_previous_text=model_options['condition_on_previous_text'],
-                                        temperature=model_options['temperature'],
-                                        vad_filter=model_options['vad_filter'],)
-    return ''.join([segment.text for segment in list(response[0])])
-
-"""
-Transcribe an audio file using the OpenAI API.
-"""
-def transcribe_api(config, temp_audio_file):
-    load_dotenv()
-    client = OpenAI(
-        api_key=os.getenv('OPENAI_API_KEY') if os.getenv('OPENAI_API_KEY') else None,
-        base_url=os.getenv('OPENAI_BASE_URL') if os.getenv('OPENAI_BASE_URL') else 'https://api.openai.com/v1',
-    )
+        local_model = get_model_manager(config).get(config)
+    with tracing.span('transcribe_local') as span:
+        if isinstance(audio, np.ndarray):
+            span['audio_seconds'] = round(len(audio) / config['sample_rate'], 2)
+            audio = to_whisper_input(audio, config['sample_rate'])
+        model_options = config['local_model_options']
+        response = local_model.transcribe(audio=audio,
+                                            language=model_options['language'],
+                                            initial_prompt=initial_prompt or model_options['initial_prompt'],
+                                            condition_on_previous_text=model_options['condition_on_previous_text'],
+                                            temperature=model_options['temperature'],
+                                            vad_filter=model_options['vad_filter'],)
+        return ''.join([segment.text for segment in list(response[0])])
+
+"""
+Transcribe audio using the OpenAI API. The audio is either an int16 sample array or the path of a WAV file.
+It is uploaded at 16kHz in the api_upload_codec format; the upload size and encode time are recorded per request.
+"""
+def transcribe_api(config, audio, initial_prompt=None):
+    # The shared client keeps its connection to the API open between transcriptions
+    client = api_clients.get_client('openai', config)
     api_options = config['api_options']
-    with open(temp_audio_file, 'rb') as audio_file:
-        response = client.audio.transcriptions.create(model=api_options['model'], 
-                                                        file=audio_file,
-                                                        language=api_options['language'],
-                                                        prompt=api_options['initial_prompt'],
-                                                        temperature=api_options['temperature'],)
+    if isinstance(audio, np.ndarray):
+        audio_data, sample_rate = audio, config['sample_rate']
+    else:
+        audio_data, sample_rate = load_wav(audio)
+    started = time.perf_counter()
+    with tracing.span('encode_upload', codec=config['api_upload_codec']) as span:
+        audio_file = encode_for_upload(audio_data, sample_rate, config['api_upload_codec'])
+        span['bytes'] = upload_bytes = audio_file.getbuffer().nbytes
+    encode_seconds = time.perf_counter() - started
+    api_clients.record_upload('openai', 'transcription', upload_bytes, encode_seconds)
+    if config['print_to_terminal']:
+        print(f'Uploading {upload_bytes / 1024:.1f} kB of {audio_file.name.rsplit(".", 1)[1]} '
+              f'({len(audio_data) / sample_rate:.2f}s of audio, encoded in {encode_seconds * 1000:.1f} ms).')
+
+    def request():
+        audio_file.seek(0)  # A retry uploads the audio again from the start
+        return client.audio.transcriptions.create(model=api_options['model'], 
+                                                  file=audio_file,
+                                                  language=api_options['language'],
+                                                  prompt=initial_prompt or api_options['initial_prompt'],
+                                                  temperature=api_options['temperature'],)
+
+    with audio_file:
+        response = api_clients.call('openai', 'transcription', request)
     return response.text
 
+"""
+Open the input stream (sound_device) and yield 30ms int16 frames until cancel_flag is set or the consumer
+stops iterating. Wrap in contextlib.closing() so the stream is closed as soon as the consumer breaks out.
+"""
+def capture_frames(cancel_flag, config):
+    import sounddevice as sd  # Imported on first use, like the other heavy dependencies, to keep startup fast
+
+    sound_device = config['sound_device'] if config else None
+    sample_rate = config['sample_rate'] if config else 16000  # 16kHz, supported values: 8kHz, 16kHz, 32kHz, 48kHz, 96kHz
+    ring_buffer_seconds = 5  # Audio the callback can get ahead of the recording loop before samples are dropped
+
+    frame_size = sample_rate * FRAME_DURATION // 1000
+    buffer = RingBuffer(sample_rate * ring_buffer_seconds)
+    try:
+        with sd.InputStream(samplerate=sample_rate, channels=1, dtype='int16', blocksize=frame_size,
+                            device=sound_device, callback=lambda indata, frames, time, status: buffer.write(indata[:, 0])):
+            while not cancel_flag():
+                # Block until the next frame arrives; the timeout keeps the cancel flag responsive
+                frame = buffer.read(frame_size, timeout=0.1)
+                if frame is None:
+                    continue
+                yield frame
+    finally:
+        buffer.close()
+        if buffer.overruns:
+            print(f'Audio buffer overrun, {buffer.overruns} samples dropped.') if config['print_to_terminal'] else ''
+
+"""
+Speech check for a frame: frames below energy_gate_dbfs are silence without asking webrtcvad.
+"""
+def frame_is_speech(vad, frame, sample_rate, config):
+    return not is_silent(frame, config['energy_gate_dbfs']) and vad.is_speech(frame.tobytes(), sample_rate)
+
+"""
+Cut silence from recorded audio before transcription (trim_silence in config) and print how much was removed.
+"""
+def trim_recording(audio_data, config):
+    if not config['trim_silence'] or len(audio_data) == 0:
+        return audio_data
+    with tracing.span('trim_silence') as span:
+        trimmed, removed = trim_silence(audio_data, config['sample_rate'], threshold_dbfs=config['energy_gate_dbfs'],
+                                        max_gap_ms=config['max_silence_gap'])
+        span['removed_seconds'] = round(removed, 2)
+    if config['print_to_terminal']:
+        print(f'Trimmed {removed:.2f}s of silence ({len(audio_data) / config["sample_rate"]:.2f}s -> '
+              f'{len(trimmed) / config["sample_rate"]:.2f}s).')
+    return trimmed
+
+class UtteranceSegmenter:
+    """
+    The voice activity rules for cutting speech out of a stream of frames, used by record(), streaming transcription
+    and the continuous listener. Frames are collected from the first speech frame, with up to pre_roll_ms of the
+    non-speech before it, until silence_ms of non-speech; push() then returns the utterance and starts over. Of the
+    non-speech inside an utterance, at most pre_roll_ms per pause is kept. An utterance with less than min_speech_ms
+    of speech is dropped (push() returns None).
+    keep_silence keeps every frame instead (the recording modes ended by a key), and silence_ms None never ends an
+    utterance. With pause_ms, on_segment(samples) is called with the part of the utterance since the previous call
+    whenever speech is followed by pause_ms of non-speech, and with the rest when the utterance ends.
+    """
+    def __init__(self, sample_rate, pre_roll_ms=300, silence_ms=900, min_speech_ms=200, pause_ms=None,
+                 on_segment=None, keep_silence=False):
+        self.sample_rate = sample_rate
+        self.num_silence_frames = silence_ms // FRAME_DURATION if silence_ms is not None else None
+        self.min_speech_frames = max(min_speech_ms // FRAME_DURATION, 1)
+        self.num_pause_frames = max(pause_ms // FRAME_DURATION, 1) if pause_ms is not None else None
+        self.on_segment = on_segment
+        self.keep_silence = keep_silence
+        self.pre_roll = collections.deque(maxlen=pre_roll_ms // FRAME_DURATION)
+        self.reset()
+
+    @property
+    def active(self):
+        return self.speech_frames > 0
+
+    def reset(self):
+        self.recording = SampleAccumulator(self.sample_rate * 30)
+        self.pre_roll.clear()
+        self.speech_frames = 0
+        self.num_silent_frames = 0
+        self.segment_start = 0  # Where the samples not yet passed to on_segment start
+        self.segment_has_speech = False
+
+    def push(self, frame, is_speech):
+        if is_speech or self.keep_silence:
+            while self.pre_roll:
+                self.recording.append(self.pre_roll.popleft())
+            self.recording.append(frame)
+        else:
+            self.pre_roll.append(frame)
+        if is_speech:
+            self.speech_frames += 1
+            self.segment_has_speech = True
+            self.num_silent_frames = 0
+            return None
+        if not self.active:
+            return None
+        self.num_silent_frames += 1
+        if self.num_silent_frames == self.num_pause_frames:
+            self.end_segment()
+        if self.num_silence_frames is None or self.num_silent_frames < self.num_silence_frames:
+            return None
+        return self.finish()
+
+    def end_segment(self):
+        if self.segment_has_speech and self.on_segment is not None:
+            self.on_segment(self.recording.to_array(self.segment_start))
+        self.segment_start = len(self.recording)
+        self.segment_has_speech = False
+
+    def finish(self):
+        """
+        End the utterance now, e.g. because the recording was stopped, and return it (None if it has too little
+        speech). The segment still open is passed to on_segment first.
+        """
+        self.end_segment()
+        utterance = self.recording.to_array() if self.speech_frames >= self.min_speech_frames else None
+        self.reset()
+        return utterance
+
 """
 Record audio from the microphone (sound_device). Recording stops when the activation_key is pressed (press_to_toggle),
 released (hold_to_record), or after silence_duration (voice_activity_detection).
+In voice_activity_detection mode an UtteranceSegmenter cuts the utterance out; the last pre_roll_duration of
+non-speech frames is prepended when speech starts, so the onset the VAD misses is not lost.
+Returns the int16 samples, the path of a temporary WAV file if spill_audio_to_disk is set, or None on cancel/error.
 """
 def record(status_queue, cancel_flag, config):
-    sound_device = config['sound_device'] if config else None
     sample_rate = config['sample_rate'] if config else 16000  # 16kHz, supported values: 8kHz, 16kHz, 32kHz, 48kHz, 96kHz
-    frame_duration = 30  # 30ms, supported values: 10, 20, 30
-    buffer_duration = 300  # 300ms
+    buffer_duration = config['pre_roll_duration'] if config else 300  # 300ms
     silence_duration = config['silence_duration'] if config else 900  # 900ms
 
     recording_mode = config['recording_mode']
     activation_key = config['activation_key']
 
     vad = webrtcvad.Vad(3)  # Aggressiveness mode: 3 (highest)
-    buffer = []
-    recording = []
-    num_silent_frames = 0
-    num_buffer_frames = buffer_duration // frame_duration
-    num_silence_frames = silence_duration // frame_duration
+    recording = SampleAccumulator(sample_rate * 30)  # Grows in blocks, starting at 30s of audio
+    segmenter = UtteranceSegmenter(sample_rate, buffer_duration, silence_duration, min_speech_ms=0)
+    utterance = None
     try:
         print('Recording...') if config['print_to_terminal'] else ''
-        with sd.InputStream(samplerate=sample_rate, channels=1, dtype='int16', blocksize=sample_rate * frame_duration // 1000,
-                            device=sound_device, callback=lambda indata, frames, time, status: buffer.extend(indata[:, 0])):
-            while not cancel_flag():
-                if len(buffer) < sample_rate * frame_duration // 1000:
-                    continue
-
-                frame = buffer[:sample_rate * frame_duration // 1000]
-                buffer = buffer[sample_rate * frame_duration // 1000:]
-                
+        with contextlib.closing(capture_frames(cancel_flag, config)) as frames:
+            for frame in frames:
                 if not cancel_flag():
                     if recording_mode == 'press_to_toggle':
                         if len(recording) > 0 and keyboard.is_pressed(activation_key):
                             break
                         else:
-                            recording.extend(frame)
+                            recording.append(frame)
                     if recording_mode == 'hold_to_record':
                         if keyboard.is_pressed(activation_key):
-                            recording.extend(frame)
+                            recording.append(frame)
                         else:
                             break
                     elif recording_mode == 'voice_activity_detection':
-                        is_speech = vad.is_speech(np.array(frame).tobytes(), sample_rate)
-                        if is_speech:
-                            recording.extend(frame)
-                            num_silent_frames = 0
-                        else:
-                            if len(recording) > 0:
-                                num_silent_frames += 1
-                            if num_silent_frames >= num_silence_frames:
-                                break
+                        utterance = segmenter.push(frame, frame_is_speech(vad, frame, sample_rate, config))
+                        if utterance is not None:
+                            break
 
         if cancel_flag():
             status_queue.put(('cancel', ''))
-            return ''
+            return None
         
-        audio_data = np.array(recording, dtype=np.int16)
+        if recording_mode == 'voice_activity_detection':
+            audio_data = utterance if utterance is not None else segmenter.finish()
+            audio_data = audio_data if audio_data is not None else recording.to_array()
+        else:
+            audio_data = recording.to_array()
         print('Recording finished. Size:', audio_data.size) if config['print_to_terminal'] else ''
+        audio_data = trim_recording(audio_data, config)
         
-        # Save the recorded audio as a temporary WAV file on disk
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio_file:
-            with wave.open(temp_audio_file.name, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)  # 2 bytes (16 bits) per sample
-                wf.setframerate(sample_rate)
-                wf.writeframes(audio_data.tobytes())
-                
-        return temp_audio_file.name
+        # Hand the samples over in memory unless configured to spill them to a temporary WAV file
+        if config['spill_audio_to_disk']:
+            return save_temp_wav(audio_data, sample_rate)
+        return audio_data
     
     except Exception as e:
         traceback.print_exc()
         status_queue.put(('error', 'Error'))
-        return ''  
+        return None
 
 """
 Apply post-processing to the transcription.
@@ -162,35 +362,191 @@ def post_process_transcription(transcription, config=None):
     return transcription
 
 """
-Transcribe an audio file using the OpenAI API or a local model, depending on config.
+Transcribe a long recording (over long_form_threshold seconds) as chunks of at most long_form_chunk_seconds, cut at
+pauses the VAD finds, on long_form_workers threads at once with a local model variant that has as many workers, so
+the chunks really run in parallel. The texts are joined in recording order.
+Chunk i is prompted with the end of the text of chunks 0 to i - workers, or the configured prompt for the first
+chunks. It is only started once those are done, so the prompt does not depend on which chunks happen to finish first.
 """
-def transcribe(status_queue, cancel_flag, config, audio_file, local_model=None):
-    if not audio_file:
+def transcribe_long(config, audio, local_model=None):
+    sample_rate = config['sample_rate']
+    frame_size = sample_rate * FRAME_DURATION // 1000
+    vad = webrtcvad.Vad(3)
+    speech = [frame_is_speech(vad, audio[start:start + frame_size], sample_rate, config)
+              for start in range(0, len(audio) - frame_size + 1, frame_size)]
+    boundaries = split_at_silences(speech, len(audio), sample_rate, config['long_form_chunk_seconds'])
+    chunks = [audio[start:end] for start, end in zip(boundaries, boundaries[1:])]
+    workers = min(config['long_form_workers'], len(chunks))
+    if not config['use_api'] and not local_model:
+        local_model = get_model_manager(config).get(config, workers=config['long_form_workers'])
+
+    texts = [None] * len(chunks)
+    configured_prompt = config['api_options' if config['use_api'] else 'local_model_options']['initial_prompt']
+
+    def transcribe_chunk(index):
+        context = ''.join(texts[:max(index - workers + 1, 0)])
+        prompt = context[-800:].strip() or configured_prompt  # Whisper reads at most 224 prompt tokens
+        if config['use_api']:
+            texts[index] = transcribe_api(config, chunks[index], initial_prompt=prompt)
+        else:
+            texts[index] = transcribe_local(config, chunks[index], local_model, initial_prompt=prompt)
+
+    print(f'Long recording: {len(audio) / sample_rate:.1f}s in {len(chunks)} chunks on {workers} workers.') if config['print_to_terminal'] else ''
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for index in range(len(chunks)):
+            if index >= workers:
+                futures[index - workers].result()  # Its text goes into this chunk's prompt
+            # Each chunk runs in a copy of this thread's context, so its spans land in the current trace
+            futures.append(pool.submit(contextvars.copy_context().run, transcribe_chunk, index))
+        for future in futures:
+            future.result()
+    return ''.join(texts)
+
+"""
+Transcribe recorded audio using the OpenAI API or a local model, depending on config.
+Temporary WAV files written in spill_audio_to_disk mode are deleted once transcribed.
+"""
+def transcribe(status_queue, cancel_flag, config, audio, local_model=None):
+    if audio is None or len(audio) == 0:
         return ''
     
     status_queue.put(('transcribing', 'Transcribing...'))
-    print('Transcribing audio file...') if config['print_to_terminal'] else ''
+    print('Transcribing audio...') if config['print_to_terminal'] else ''
     
-    # If configured, transcribe the temporary audio file using the OpenAI API
-    if config['use_api']:
-        transcription = transcribe_api(config, audio_file)
-        
-    # Otherwise, transcribe the temporary audio file using a local model
-    elif not config['use_api']:
-        transcription = transcribe_local(config, audio_file, local_model)
-        
-    else:
-        return ''
+    try:
+        # Long recordings are split into chunks that are transcribed in parallel
+        if (isinstance(audio, np.ndarray) and config['long_form_workers'] > 1
+                and len(audio) > config['long_form_threshold'] * config['sample_rate']):
+            transcription = transcribe_long(config, audio, local_model)
+
+        # If configured, transcribe the audio using the OpenAI API
+        elif config['use_api']:
+            transcription = transcribe_api(config, audio)
+            
+        # Otherwise, transcribe the audio using a local model
+        elif not config['use_api']:
+            transcription = transcribe_local(config, audio, local_model)
+            
+        else:
+            return ''
+    finally:
+        if isinstance(audio, str) and os.path.exists(audio):
+            os.remove(audio)
     
     print('Transcription:', transcription) if config['print_to_terminal'] else ''
     return post_process_transcription(transcription, config)
 
+"""
+Record audio and transcribe it segment by segment while the user is still speaking. The audio is cut at
+VAD pauses of streaming_pause_duration; each finished segment is transcribed on a worker thread (with the
+text so far as its prompt) and the running transcript is put on status_queue as a 'partial' status.
+Recording stops under the same rules as record(), after which only the last segment is left to transcribe.
+"""
+def record_and_transcribe_streaming(status_queue, cancel_flag, config, local_model=None):
+    sample_rate = config['sample_rate']
+    silence_duration = config['silence_duration']
+    pause_duration = config['streaming_pause_duration']
+
+    recording_mode = config['recording_mode']
+    activation_key = config['activation_key']
+
+    vad = webrtcvad.Vad(3)  # Aggressiveness mode: 3 (highest)
+
+    segments = queue.Queue()
+    texts = []
+    errors = []
+
+    def transcribe_segments():
+        nonlocal local_model
+        if not config['use_api'] and not local_model:
+            # Fetch the model once for all segments, while recording is already underway
+            try:
+                local_model = get_model_manager(config).get(config)
+            except Exception as e:
+                traceback.print_exc()
+                errors.append(e)
+                return
+        while True:
+            segment = segments.get()
+            if segment is None or cancel_flag():
+                return
+            segment = trim_recording(segment, config)
+            if len(segment) == 0:
+                continue
+            try:
+                prompt = ''.join(texts).strip() or None
+                if config['use_api']:
+                    text = transcribe_api(config, segment, initial_prompt=prompt)
+                else:
+                    text = transcribe_local(config, segment, local_model, initial_prompt=prompt)
+            except Exception as e:
+                traceback.print_exc()
+                errors.append(e)
+                return
+            texts.append(text)
+            status_queue.put(('partial', ''.join(texts).strip()))
+
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(transcribe_segments,), daemon=True)
+    worker.start()
+
+    num_segments = 0
+
+    def on_segment(segment):
+        nonlocal num_segments
+        segments.put(segment)  # A pause ends a segment; the worker transcribes it while recording goes on
+        num_segments += 1
+
+    # In the key-driven modes every frame is kept and only a key ends the recording
+    vad_mode = recording_mode == 'voice_activity_detection'
+    segmenter = UtteranceSegmenter(sample_rate, config['pre_roll_duration'], silence_duration if vad_mode else None,
+                                   min_speech_ms=0, pause_ms=pause_duration, on_segment=on_segment,
+                                   keep_silence=not vad_mode)
+    try:
+        print('Recording (streaming)...') if config['print_to_terminal'] else ''
+        with contextlib.closing(capture_frames(cancel_flag, config)) as frames:
+            for frame in frames:
+                if cancel_flag():
+                    break
+                is_speech = frame_is_speech(vad, frame, sample_rate, config)
+                if recording_mode == 'hold_to_record' and not keyboard.is_pressed(activation_key):
+                    break
+                if recording_mode == 'press_to_toggle' and len(segmenter.recording) > 0 and keyboard.is_pressed(activation_key):
+                    break
+                if segmenter.push(frame, is_speech) is not None:
+                    break
+
+        if not cancel_flag():
+            segmenter.finish()  # The last segment, unless the utterance already ended at a pause
+        print(f'Recording finished. Segments: {num_segments}') if config['print_to_terminal'] else ''
+        if num_segments:
+            status_queue.put(('transcribing', 'Transcribing...'))
+    except Exception as e:
+        traceback.print_exc()
+        errors.append(e)
+    finally:
+        segments.put(None)
+        worker.join()
+
+    if cancel_flag():
+        status_queue.put(('cancel', ''))
+        return ''
+    if errors:
+        status_queue.put(('error', 'Error'))
+        return ''
+
+    transcription = ''.join(texts)
+    print('Transcription:', transcription) if config['print_to_terminal'] else ''
+    return post_process_transcription(transcription, config) if transcription else ''
+
 """
 Record audio from the microphone and transcribe it using the OpenAI API or a local model, depending on config.
 """
 def record_and_transcribe(status_queue, cancel_flag, config, local_model=None):
-    audio_file = record(status_queue, cancel_flag, config)
+    if config['streaming_transcription']:
+        return record_and_transcribe_streaming(status_queue, cancel_flag, config, local_model)
+    audio = record(status_queue, cancel_flag, config)
     if cancel_flag():
         return ''
-    result = transcribe(status_queue, cancel_flag, config, audio_file, local_model)
+    result = transcribe(status_queue, cancel_flag, config, audio, local_model)
     return result